@@ -0,0 +1,14 @@
+"""
+基准测试共用的工具, 基准脚本所在目录在 sys.path 中, 直接 from _common import timeit
+"""
+import time
+
+
+def timeit(name, func, *args, **kwargs):
+    """
+    调用一次 func 并打印耗时, 返回 func 的结果
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"{name:<48}{time.perf_counter() - start:>10.4f}s")
+    return result
@@ -0,0 +1,71 @@
+"""
+BplusTree_t 与 dict + sorted / bisect 有序列表的对比
+
+python modules/core/benchmarks/bench_b_plus_tree.py [n]
+"""
+import random
+import sys
+from bisect import bisect_left, bisect_right, insort
+
+from _hydrogenlib_core.data_structures.b_plus_tree import BplusTree_t
+
+from _common import timeit
+
+
+def bench_bplus_tree(keys, lookups, ranges, t=64):
+    tree = BplusTree_t(t)
+    timeit(f"BplusTree_t(t={t}) insert", lambda: [tree.insert(k, k) for k in keys])
+    timeit(f"BplusTree_t(t={t}) get", lambda: [tree.get(k) for k in lookups])
+    timeit(f"BplusTree_t(t={t}) iter_range", lambda: [sum(1 for _ in tree.iter_range(a, b)) for a, b in ranges])
+
+
+def bench_bulk_load(keys, t=64):
+    ordered = sorted(keys)
+    tree = BplusTree_t(t)
+    timeit(f"BplusTree_t(t={t}) insert sorted", lambda: [tree.insert(k, k) for k in ordered])
+    timeit(f"BplusTree_t(t={t}) bulk_load sorted", lambda: BplusTree_t(t).bulk_load((k, k) for k in ordered))
+    timeit(f"BplusTree_t(t={t}) bulk_load unsorted", lambda: BplusTree_t(t).bulk_load((k, k) for k in keys))
+
+
+def bench_dict_sorted(keys, lookups, ranges):
+    dct = {}
+    timeit("dict insert", lambda: [dct.__setitem__(k, k) for k in keys])
+    timeit("dict get", lambda: [dct.get(k) for k in lookups])
+
+    def range_scan():
+        ordered = sorted(dct)  # dict 无序, 每次范围查询前都要排序
+        return [sum(1 for k in ordered if a <= k <= b) for a, b in ranges[:10]]
+
+    timeit("dict + sorted range (10 queries)", range_scan)
+
+
+def bench_bisect(keys, lookups, ranges):
+    lst = []
+    timeit("bisect.insort insert", lambda: [insort(lst, k) for k in keys])
+
+    def get(k):
+        i = bisect_left(lst, k)
+        return lst[i] if i < len(lst) and lst[i] == k else None
+
+    timeit("bisect get", lambda: [get(k) for k in lookups])
+    timeit("bisect range", lambda: [len(lst[bisect_left(lst, a):bisect_right(lst, b)]) for a, b in ranges])
+
+
+def main(n=200_000):
+    keys = random.sample(range(n * 10), n)
+    lookups = random.choices(keys, k=n)
+    ranges = []
+    for _ in range(1000):
+        a = random.randrange(n * 10)
+        ranges.append((a, a + 1000))
+
+    print(f"n = {n}")
+    bench_bplus_tree(keys, lookups, ranges, t=16)
+    bench_bplus_tree(keys, lookups, ranges, t=64)
+    bench_bulk_load(keys, t=64)
+    bench_dict_sorted(keys, lookups, ranges)
+    bench_bisect(keys, lookups, ranges)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,78 @@
+"""
+压缩位图 (CompressedBitmap) 与普通位图 (Bitmap) 的构建/集合运算/序列化对比
+
+python modules/core/benchmarks/bench_bitmap.py [n]
+"""
+import random
+import sys
+
+from _hydrogenlib_core.typefunc import Bitmap, CompressedBitmap
+
+from _common import timeit
+
+
+def dense(indices):
+    bitmap = Bitmap()
+    bitmap.set_bit(max(indices))
+    bitmap.bits[indices] = 1
+    return bitmap
+
+
+def dense_op(a: Bitmap, b: Bitmap, op):
+    x, y = a.bits.copy(), b.bits.copy()
+    size = max(len(x), len(y))
+    x.extend([0] * (size - len(x)))
+    y.extend([0] * (size - len(y)))
+    return op(x, y).count()
+
+
+def check_unpack_copy_on_write():
+    # 从可写的 bytearray 解包后修改位图, 不应写入源数据
+    bitmap = CompressedBitmap.from_indices(list(range(0, 1 << 17, 2)) + list(range(1 << 17, (1 << 17) + 100)))
+    packed = bitmap.pack()
+    source = bytearray(packed)
+    unpacked = CompressedBitmap.unpack(source)
+    for i in (1, 3, (1 << 16) + 1, (1 << 17) + 200):
+        unpacked.add(i)
+    unpacked.discard(0)
+    assert source == packed
+    assert CompressedBitmap.unpack(source).cardinality() == bitmap.cardinality()
+    assert unpacked.cardinality() == bitmap.cardinality() + 3
+
+
+def main(n=1_000_000):
+    check_unpack_copy_on_write()
+    universe = 400_000_000  # 稀疏: 4 亿的范围内 n 个 ID
+    a = random.sample(range(universe), n)
+    b = random.sample(range(universe), n) + a[:n // 2]
+    runs = [i for start in range(0, universe, universe // 100) for i in range(start, start + 50_000)]
+
+    for name, left, right in (("sparse", a, b), ("runs", runs, a)):
+        print(f"{name}: {len(left)} / {len(right)} ids")
+        ca = timeit("compressed build", CompressedBitmap.from_indices, left)
+        cb = CompressedBitmap.from_indices(right)
+        if name == "runs":
+            timeit("compressed run_optimize", ca.run_optimize)
+
+        da = timeit("dense build", dense, left)
+        db = dense(right)
+
+        timeit("compressed and", lambda: (ca & cb).cardinality())
+        timeit("compressed or", lambda: (ca | cb).cardinality())
+        timeit("compressed xor", lambda: (ca ^ cb).cardinality())
+        timeit("compressed andnot", lambda: (ca - cb).cardinality())
+        timeit("dense and", dense_op, da, db, lambda x, y: x & y)
+        timeit("dense or", dense_op, da, db, lambda x, y: x | y)
+
+        probes = random.sample(range(universe), 100_000)
+        timeit("compressed 100k lookups", lambda: sum(ca[i] for i in probes))
+        timeit("dense 100k lookups", lambda: sum(da[i] for i in probes))
+        timeit("compressed 100k rank", lambda: [ca.rank(i) for i in probes])
+
+        packed = timeit("compressed pack", ca.pack)
+        timeit("compressed unpack (zero-copy)", CompressedBitmap.unpack, packed)
+        print(f"{'':<4}compressed size: {len(packed) / 1024:.1f} KiB, dense size: {len(da.pack()) / 1024:.1f} KiB")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
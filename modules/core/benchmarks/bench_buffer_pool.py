@@ -0,0 +1,87 @@
+"""
+缓冲区池: 流式哈希时 read() 与 readinto() + 缓冲区池的分配次数和耗时
+
+python modules/core/benchmarks/bench_buffer_pool.py [size_mb]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from _hydrogenlib_core.hash import Hash
+from _hydrogenlib_core.utils import BufferPool, buffer_pool
+
+from _common import timeit
+
+
+def measure(name, func, *args):
+    """
+    返回 (分配的块数, 峰值内存)
+    """
+    tracemalloc.start()
+    allocations = timeit(name, func, *args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'':<4}chunk allocations: {allocations:<10} peak traced memory: {peak / 1024:.1f} KiB")
+
+
+def hash_read(path, chunk_size):
+    obj = hashlib.sha256()
+    allocations = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            allocations += 1  # 每次 read() 都会分配新的 bytes
+            obj.update(chunk)
+    return allocations
+
+
+def hash_readinto_fresh(path, chunk_size):
+    obj = hashlib.sha256()
+    allocations = 0
+    with open(path, 'rb') as f:
+        while True:
+            buffer = bytearray(chunk_size)  # 每块都分配新的缓冲区
+            allocations += 1
+            n = f.readinto(buffer)
+            if not n:
+                break
+            obj.update(memoryview(buffer)[:n])
+    return allocations
+
+
+def hash_pooled(path, chunk_size, repeat):
+    before = buffer_pool.allocations
+    for _ in range(repeat):
+        Hash.sha256.compute_from_file(path, chunk_size)
+    return buffer_pool.allocations - before
+
+
+def pool_churn(n):
+    pool = BufferPool()
+    sizes = [4096 << (i % 8) for i in range(n)]
+    for size in sizes:
+        with pool.borrow(size):
+            pass
+    return pool.allocations
+
+
+def main(size_mb=64):
+    chunk_size = 1 << 16
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1 << 20))
+        path = f.name
+
+    try:
+        measure(f"sha256 {size_mb} MiB, read()", hash_read, path, chunk_size)
+        measure(f"sha256 {size_mb} MiB, readinto fresh", hash_readinto_fresh, path, chunk_size)
+        measure(f"sha256 {size_mb} MiB x4, pooled readinto", hash_pooled, path, chunk_size, 4)
+    finally:
+        os.remove(path)
+
+    measure("borrow 100000 buffers (4K ~ 512K)", pool_churn, 100_000)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
@@ -0,0 +1,74 @@
+"""
+有向图: 不同规模下的 SCC / 拓扑分层 / 遍历, GraphBase (dict) 与 CSRGraph 快照对比
+
+python modules/core/benchmarks/bench_graph.py [max_vertices]
+"""
+import random
+import sys
+
+from _hydrogenlib_core.data_structures import GraphBase, WeightedGraph
+
+from _common import timeit
+
+
+def dependency_graph(n, degree=3):
+    """
+    随机 DAG: 每个顶点依赖若干个编号更小的顶点
+    """
+    graph = GraphBase()
+    graph.add_vertex(*range(n))
+    for i in range(1, n):
+        for _ in range(degree):
+            graph.add_edge(random.randrange(i), i)
+    return graph
+
+
+def weighted(side=316):
+    """
+    side x side 的网格, 边权随机, 比较 Dijkstra / 双向 Dijkstra / A*
+    """
+    graph = WeightedGraph()
+    for x in range(side):
+        for y in range(side):
+            for nx, ny in ((x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1)):
+                if 0 <= nx < side and 0 <= ny < side:
+                    graph.add_weighted_edge((x, y), (nx, ny), random.uniform(1, 2))
+
+    def manhattan(vertex, target):
+        return abs(vertex[0] - target[0]) + abs(vertex[1] - target[1])
+
+    source, target = (0, 0), (side - 1, side // 2)
+    print(f"weighted grid: {side * side} vertices")
+    timeit("freeze (weighted CSR)", graph.freeze)
+    timeit("dijkstra", graph.shortest_path, source, target)
+    timeit("bidirectional dijkstra", lambda: graph.shortest_path(source, target, bidirectional=True))
+    timeit("bidirectional dijkstra (reverse cached)", lambda: graph.shortest_path(source, target, bidirectional=True))
+    timeit("a* (manhattan)", lambda: graph.shortest_path(source, target, heuristic=manhattan))
+    timeit("is_reachable x 1000 (cached)", lambda: [graph.is_reachable(source, (i % side, 0)) for i in range(1000)])
+
+
+def main(max_vertices=1_000_000):
+    n = 10_000
+    while n <= max_vertices:
+        graph = dependency_graph(n)
+        print(f"{n} vertices, {sum(len(c) for c in graph.graph.values())} edges")
+        timeit("edges", graph.edges)
+        timeit("dfs (all vertices)", lambda: sum(1 for _ in graph.dfs()))
+        levels = timeit("topological_levels", graph.topological_levels)
+        print(f"{'':<4}{len(levels)} levels")
+        timeit("strongly_connected_components", graph.strongly_connected_components)
+
+        csr = timeit("freeze (CSR snapshot)", graph.freeze)
+        timeit("csr topological_levels", csr.topological_levels)
+        timeit("csr strongly_connected_components", csr.strongly_connected_components)
+        timeit("csr reachable from 10 roots", lambda: [csr.reachable(i) for i in range(10)])
+
+        graph.add_edge(n - 1, 0)  # 制造一个大环
+        timeit("circles (one big cycle)", lambda: graph.circles)
+        n *= 10
+
+    weighted()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,68 @@
+"""
+文件哈希: 逐个文件逐个算法计算 vs hash_many (单次读取 + 线程池) vs tree_hash, 以及 DigestCache
+
+python modules/core/benchmarks/bench_hash.py [files] [file_size_kb]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from _hydrogenlib_core.hash import DigestCache, Hash, hash_many, tree_hash
+
+
+def timeit(name, func, *args, total_bytes=0):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<48}{elapsed:>10.4f}s{total_bytes / elapsed / (1 << 20):>10.1f} MiB/s")
+    return result
+
+
+def sequential(paths, algorithms):
+    for path in paths:
+        for algorithm in algorithms:
+            algorithm.compute_from_file(path)
+
+
+def main(files=2000, file_size_kb=256):
+    algorithms = [Hash.sha256, Hash.md5]
+    workers = os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(files):
+            path = os.path.join(root, f"{i}.bin")
+            with open(path, 'wb') as f:
+                f.write(os.urandom(file_size_kb * 1024))
+            paths.append(path)
+        total = files * file_size_kb * 1024
+
+        print(f"{files} files x {file_size_kb} KiB, algorithms: {[a.name for a in algorithms]}")
+        timeit("compute_from_file per algorithm", sequential, paths, algorithms, total_bytes=total)
+        timeit("hash_many workers=1", hash_many, paths, algorithms, 1, total_bytes=total)
+        timeit(f"hash_many workers={workers}", hash_many, paths, algorithms, workers, total_bytes=total)
+
+        print("DigestCache, sha256")
+        with DigestCache(os.path.join(root, "digests.sqlite"), Hash.sha256, racy_ns=0) as cache:
+            timeit("DigestCache.digests cold", cache.digests, paths, None, workers, total_bytes=total)
+            timeit("DigestCache.digests cached", cache.digests, paths, None, workers, total_bytes=total)
+            removed = paths[:files // 10]
+            for path in removed:
+                os.remove(path)
+            assert cache.forget() == len(removed) and len(cache) == files - len(removed)
+
+        big = os.path.join(root, "big.bin")
+        with open(big, 'wb') as f:
+            for _ in range(256):
+                f.write(os.urandom(1 << 20))
+        total = 256 << 20
+
+        print("single 256 MiB file, sha256")
+        timeit("compute_from_file", Hash.sha256.compute_from_file, big, total_bytes=total)
+        timeit("tree_hash workers=1", tree_hash, big, Hash.sha256, 1 << 22, 1, total_bytes=total)
+        timeit(f"tree_hash workers={workers}", tree_hash, big, Hash.sha256, 1 << 22, workers, total_bytes=total)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
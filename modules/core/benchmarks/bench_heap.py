@@ -0,0 +1,88 @@
+"""
+优先队列: heapq / Heap / IndexedHeap (二叉与 4 叉) 的入队出队, 以及频繁修改优先级的调度场景
+
+python modules/core/benchmarks/bench_heap.py [n]
+"""
+import heapq
+import itertools
+import random
+import sys
+
+from _hydrogenlib_core.data_structures import Heap, IndexedHeap
+
+from _common import timeit
+
+
+def heapq_push_pop(values):
+    heap = []
+    for v in values:
+        heapq.heappush(heap, v)
+    return [heapq.heappop(heap) for _ in range(len(heap))]
+
+
+def heap_push_pop(values, arity):
+    heap = Heap(arity=arity)
+    for v in values:
+        heap.insert(v)
+    return heap.pop_many(len(heap))
+
+
+def heap_batch(values, arity):
+    heap = Heap(arity=arity)
+    heap.push_many(values)
+    return heap.pop_many(len(heap))
+
+
+def indexed_push_pop(values, arity):
+    heap = IndexedHeap(arity=arity)
+    for i, v in enumerate(values):
+        heap.push(i, v)
+    return heap.pop_many(len(heap))
+
+
+def heapq_lazy_updates(values, updates):
+    """
+    heapq 常见的做法: 标记旧条目失效后重新插入
+    """
+    heap, entries, counter = [], {}, itertools.count()
+    for i, v in enumerate(values):
+        entry = [v, next(counter), i, True]
+        entries[i] = entry
+        heapq.heappush(heap, entry)
+    for key, priority in updates:
+        entries[key][3] = False
+        entry = entries[key] = [priority, next(counter), key, True]
+        heapq.heappush(heap, entry)
+    result = []
+    while heap:
+        entry = heapq.heappop(heap)
+        if entry[3]:
+            result.append(entry[0])
+    return result
+
+
+def indexed_updates(values, updates, arity):
+    heap = IndexedHeap(enumerate(values), arity=arity)
+    for key, priority in updates:
+        heap.update_priority(key, priority)
+    return [p for _, p in heap.pop_many(len(heap))]
+
+
+def main(n=200_000):
+    values = [random.random() for _ in range(n)]
+    updates = [(random.randrange(n), random.random()) for _ in range(n * 2)]
+    print(f"{n} items, {len(updates)} priority updates")
+
+    timeit("heapq push + pop", heapq_push_pop, values)
+    for arity in (2, 4):
+        timeit(f"Heap(arity={arity}) insert + pop_many", heap_push_pop, values, arity)
+        timeit(f"Heap(arity={arity}) push_many + pop_many", heap_batch, values, arity)
+        timeit(f"IndexedHeap(arity={arity}) push + pop_many", indexed_push_pop, values, arity)
+
+    expected = timeit("heapq lazy invalidation updates", heapq_lazy_updates, values, updates)
+    for arity in (2, 4):
+        assert timeit(f"IndexedHeap(arity={arity}) update_priority", indexed_updates, values, updates, arity) == expected
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
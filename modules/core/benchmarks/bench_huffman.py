@@ -0,0 +1,54 @@
+"""
+范式 Huffman 编解码: MB 级数据的压缩/解压吞吐量
+
+python modules/core/benchmarks/bench_huffman.py [size_mb]
+"""
+import io
+import random
+import sys
+import time
+
+from _hydrogenlib_core.data_structures import HuffmanCodec, huffman_compress, huffman_decompress
+
+
+def timeit(name, func, *args, size=0):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<40}{elapsed:>10.4f}s{size / elapsed / (1 << 20):>10.1f} MiB/s")
+    return result
+
+
+def stream_roundtrip(codec, data):
+    compressed = io.BytesIO()
+    codec.compress_stream(io.BytesIO(data), compressed)
+    compressed.seek(0)
+    out = io.BytesIO()
+    HuffmanCodec.decompress_stream(compressed, out)
+    return out.getvalue()
+
+
+def main(size_mb=8):
+    size = size_mb << 20
+    weights = [1 / (i + 1) for i in range(256)]  # 近似 Zipf 分布的字节
+    samples = {
+        'zipf bytes': bytes(random.choices(range(256), weights=weights, k=size)),
+        'text': ''.join(random.choices('etaoin shrdlu\ncmfwyp', k=size)),
+    }
+
+    for name, data in samples.items():
+        print(f"{name}, {size_mb} MiB")
+        codec = timeit("build codec (count + heap)", HuffmanCodec.from_data, data, size=size)
+        compressed = timeit("compress", codec.compress, data, size=size)
+        print(f"{'':<4}ratio: {len(compressed) / len(data.encode() if isinstance(data, str) else data):.3f}")
+        result = timeit("decompress", huffman_decompress, compressed, size=size)
+        assert result == data
+
+        if isinstance(data, bytes):
+            assert timeit("stream round trip (1 MiB chunks)", stream_roundtrip, codec, data, size=size) == data
+
+    timeit("huffman_compress 1 MiB (one shot)", huffman_compress, samples['zipf bytes'][:1 << 20], size=1 << 20)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,79 @@
+"""
+导入耗时: hydrogenlib.core 的惰性导入与原来的全部星号导入, 用 python -X importtime 在子进程中测量
+
+python modules/core/benchmarks/bench_import.py [n] [budget_ms]
+
+n 为每种情况的重复次数, 取最小值; 给出 budget_ms 时 import hydrogenlib.core 超过预算则以状态码 1 退出, 可用于 CI
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+SRC = ROOT / 'modules' / 'core' / 'src'
+
+SUBMODULES = [
+    'typefunc', 'utils', 'hash', 'json', 'data_structures', 'fsutil', 'std_extends',
+    'threading_methods', 'async_methods', 'atexit', 'const', 'dataclasses_methods',
+    'decorators', 'descriptor', 'environ_parser', 'import_plus', 'io_addons', 'network',
+    'nio', 'output_methods', 'process', 'sys_plus', 'time_', 'trasyncio',
+]
+
+CASES = {
+    'import hydrogenlib.core': 'import hydrogenlib.core',
+    'from hydrogenlib.core import Heap': 'from hydrogenlib.core import Heap',
+    'from hydrogenlib.core import TTLCache': 'from hydrogenlib.core import TTLCache',
+    'eager star imports (before)': '; '.join(f'from _hydrogenlib_core.{m} import *' for m in SUBMODULES),
+}
+
+
+def importtime(code):
+    """
+    :return: [(自身耗时 us, 累计耗时 us, 模块名)]
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), str(ROOT), os.environ.get('PYTHONPATH', '')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative), name.strip()))
+    return rows
+
+
+def measure(code, n):
+    """
+    重复 n 次, 返回总耗时最小的一次
+    """
+    return min((importtime(code) for _ in range(n)), key=lambda rows: sum(r[0] for r in rows))
+
+
+def report(name, rows):
+    total = sum(r[0] for r in rows) / 1000
+    print(f"{name:<48}{total:>10.1f}ms{len(rows):>8} modules")
+    return total
+
+
+def main(n=5, budget=None):
+    print(f"{'case':<48}{'time':>12}{'imported':>16}")
+    results = {name: measure(code, n) for name, code in CASES.items()}
+    totals = {name: report(name, rows) for name, rows in results.items()}
+
+    for name in ('import hydrogenlib.core', 'eager star imports (before)'):
+        print(f"\nslowest modules ({name}):")
+        for self_us, _, module in sorted(results[name], reverse=True)[:10]:
+            print(f"    {module:<44}{self_us / 1000:>10.1f}ms")
+
+    if budget is not None and totals['import hydrogenlib.core'] > budget:
+        print(f"\nimport hydrogenlib.core exceeds the budget of {budget}ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        float(sys.argv[2]) if len(sys.argv) > 2 else None,
+    )
@@ -0,0 +1,105 @@
+"""
+InstanceMapping 及其使用者 (lazy_property / SyncResource / anydantic.Field) 的属性访问吞吐量
+
+python modules/core/benchmarks/bench_instance_mapping.py [n]
+anydantic 不在 PYTHONPATH 中时跳过 Field 的测试
+"""
+import gc
+import sys
+import time
+
+from _hydrogenlib_core.threading_methods.sync import SyncResource
+from _hydrogenlib_core.utils import InstanceMapping, lazy_property
+
+try:
+    from _hydrogenlib_anydantic.base import Field
+except ImportError:
+    Field = None
+
+
+def timeit(name, func, *args, count=0):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    rate = f"{count / elapsed / 1e6:>10.2f} M/s" if count else ""
+    print(f"{name:<48}{elapsed:>10.4f}s{rate}")
+    return result
+
+
+class Obj:
+    def __init__(self):
+        self.plain = 1
+
+    @lazy_property
+    def value(self):
+        return 1
+
+    lock = SyncResource(None)
+
+    if Field is not None:
+        field = Field('field', int, 0)
+
+
+class Slotted:
+    __slots__ = ('_lazy_value',)
+
+    @lazy_property
+    def value(self):
+        return 1
+
+
+def mapping_set(mapping, objs):
+    for o in objs:
+        mapping[o] = 1
+
+
+def mapping_get(mapping, objs, rounds):
+    for _ in range(rounds):
+        for o in objs:
+            mapping[o]
+
+
+def mapping_contains(mapping, objs, rounds):
+    for _ in range(rounds):
+        for o in objs:
+            o in mapping
+
+
+def attribute(objs, name, rounds):
+    for _ in range(rounds):
+        for o in objs:
+            getattr(o, name)
+
+
+def field_set(objs):
+    for i, o in enumerate(objs):
+        o.field = i
+
+
+def main(n=100_000):
+    rounds = 10
+    objs = [Obj() for _ in range(n)]
+    mapping = InstanceMapping()
+
+    timeit("InstanceMapping set", mapping_set, mapping, objs, count=n)
+    timeit("InstanceMapping get", mapping_get, mapping, objs, rounds, count=n * rounds)
+    timeit("InstanceMapping contains", mapping_contains, mapping, objs, rounds, count=n * rounds)
+    timeit("InstanceMapping items", mapping.items, count=n)
+
+    timeit("lazy_property first access", attribute, objs, 'value', 1, count=n)
+    timeit("lazy_property cached access", attribute, objs, 'value', rounds, count=n * rounds)
+    timeit("plain attribute access", attribute, objs, 'plain', rounds, count=n * rounds)
+    slotted = [Slotted() for _ in range(n)]
+    timeit("lazy_property (__slots__) cached access", attribute, slotted, 'value', rounds, count=n * rounds)
+    timeit("SyncResource __get__", attribute, objs, 'lock', rounds, count=n * rounds)
+    if Field is not None:
+        timeit("anydantic Field __set__", field_set, objs, count=n)
+        timeit("anydantic Field __get__", attribute, objs, 'field', rounds, count=n * rounds)
+
+    del objs
+    timeit("release instances (weakref cleanup)", gc.collect)
+    print(f"{'':<4}entries left after release: {len(mapping)}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,61 @@
+"""
+进程池并行: 纯 Python 的 Huffman 压缩与 safe_eval (解释执行) 在不同进程数下的扩展性, 以及大结果经共享内存与 pickle 返回的对比
+
+python modules/core/benchmarks/bench_parallel.py [blocks] [block_kb]
+"""
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from _hydrogenlib_core.data_structures import huffman_compress
+from _hydrogenlib_core.parallel import parallel_map, parallel_starmap
+from _hydrogenlib_core.typefunc.safe_eval import literal_eval
+
+from _common import timeit
+
+
+def evaluate(expression, x):
+    return literal_eval(expression, {'x': x}, compiled=False)
+
+
+def make_block(size, seed):
+    rnd = random.Random(seed)
+    return bytes(rnd.choices(range(32), weights=range(1, 33), k=size))
+
+
+def make_result(size):
+    # 只有结果很大, 用于比较结果的返回方式
+    return bytes(size)
+
+
+def main(blocks=32, block_kb=256):
+    cpus = os.cpu_count() or 1
+    data = [make_block(block_kb * 1024, i) for i in range(blocks)]
+    expressions = [('(x * 2 + 1) % 7 - x // 3 < x ** 2 and x or -x', i) for i in range(20000)]
+    print(f"{blocks} blocks x {block_kb} KiB, {len(expressions)} expressions, {cpus} cpus")
+
+    expected = timeit("huffman_compress serial", list, map(huffman_compress, data))
+    processes = 1
+    while processes <= cpus:
+        with ProcessPoolExecutor(processes) as pool:
+            pool.submit(int).result()  # 启动进程不计入时间
+            result = timeit(f"huffman_compress parallel_map x{processes}", parallel_map, huffman_compress, data, pool=pool)
+            assert result == expected
+            timeit(f"safe_eval parallel_starmap x{processes}", parallel_starmap, evaluate, expressions, pool=pool)
+        processes *= 2
+
+    with ProcessPoolExecutor(min(cpus, 4)) as pool:
+        pool.submit(int).result()
+        for size in (1 << 20, 1 << 25):
+            sizes = [size] * ((1 << 28) // size)
+            timeit(f"{len(sizes)} x {size >> 20} MiB results via pickle", parallel_map, make_result, sizes, pool=pool)
+            timeit(f"{len(sizes)} x {size >> 20} MiB results via shared_memory", parallel_map, make_result, sizes,
+                   pool=pool, shared_memory_threshold=1 << 16)
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 256,
+    )
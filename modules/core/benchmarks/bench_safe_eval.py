@@ -0,0 +1,61 @@
+"""
+受限表达式求值: 逐节点解释 (compiled=False) vs compile_safe 缓存的代码对象 vs evaluate_many
+
+python modules/core/benchmarks/bench_safe_eval.py [rows]
+"""
+import random
+import sys
+import time
+
+from _hydrogenlib_core.typefunc import compile_safe, literal_eval
+
+RULES = [
+    "price * quantity > 100 and region in allowed",
+    "score >= 60 and score < 90 or vip",
+    "max(a, b, c) - min(a, b, c)",
+    "[x * factor for x in values if x > threshold]",
+]
+
+
+def timeit(name, func, *args, count=0):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<40}{elapsed:>10.4f}s{count / elapsed / 1e3:>10.1f} K/s")
+    return result
+
+
+def make_row():
+    return {
+        'price': random.uniform(1, 50), 'quantity': random.randint(1, 10), 'region': random.choice('ABCD'),
+        'allowed': ('A', 'B'), 'score': random.randint(0, 100), 'vip': random.random() < 0.1,
+        'a': random.random(), 'b': random.random(), 'c': random.random(),
+        'values': [random.randint(0, 10) for _ in range(8)], 'factor': 2, 'threshold': 5,
+    }
+
+
+def interpreted(rule, rows):
+    return [literal_eval(rule, locals=row, builtins=True, compiled=False) for row in rows]
+
+
+def literal(rule, rows):
+    return [literal_eval(rule, locals=row, builtins=True, compiled=True) for row in rows]
+
+
+def compiled(expression, rows):
+    return [expression(locals=row, builtins=True) for row in rows]
+
+
+def main(rows=20_000):
+    data = [make_row() for _ in range(rows)]
+    for rule in RULES:
+        print(rule)
+        expected = timeit("literal_eval(compiled=False)", interpreted, rule, data, count=rows)
+        assert timeit("literal_eval (cached compile)", literal, rule, data, count=rows) == expected
+        expression = compile_safe(rule)
+        assert timeit("compile_safe(...)(locals=row)", compiled, expression, data, count=rows) == expected
+        assert timeit("evaluate_many", expression.evaluate_many, data, None, True, count=rows) == expected
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,82 @@
+"""
+ThreadEventLoop: 从同步代码向后台事件循环提交协程, 每个协程一次 run_coroutine_threadsafe 与批量唤醒的 submit / submit_many
+
+python modules/core/benchmarks/bench_thread_event_loop.py [n] [producers]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from _hydrogenlib_core.async_methods import ThreadEventLoop
+
+
+def timeit(name, func, loop, n, producers):
+    loop.stats.max_lag = 0.0
+    start = time.perf_counter()
+    result = func(loop, n, producers)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<48}{elapsed:>10.4f}s{n / elapsed / 1000:>10.1f} k/s{loop.stats.max_lag * 1000:>10.1f}ms lag")
+    return result
+
+
+async def job(i):
+    return i
+
+
+def in_threads(producers, func):
+    threads = [threading.Thread(target=func) for _ in range(producers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def threadsafe(loop, n, producers):
+    def produce():
+        futures = [asyncio.run_coroutine_threadsafe(job(i), loop._loop) for i in range(n // producers)]
+        for f in futures:
+            f.result()
+    in_threads(producers, produce)
+
+
+def submit(loop, n, producers):
+    def produce():
+        futures = [loop.submit(job(i)) for i in range(n // producers)]
+        for f in futures:
+            f.result()
+    in_threads(producers, produce)
+
+
+def submit_many(loop, n, producers):
+    def produce():
+        for f in loop.submit_many(job(i) for i in range(n // producers)):
+            f.result()
+    in_threads(producers, produce)
+
+
+def main(n=100000, producers=4):
+    print(f"n = {n}")
+    loop = ThreadEventLoop()
+    loop.start()
+    for p in (1, producers):
+        timeit(f"run_coroutine_threadsafe x{p} threads", threadsafe, loop, n, p)
+        timeit(f"submit x{p} threads", submit, loop, n, p)
+        timeit(f"submit_many x{p} threads", submit_many, loop, n, p)
+
+    bounded = ThreadEventLoop(max_in_flight=1000)
+    bounded.start()
+    timeit(f"submit max_in_flight=1000 x{producers} threads", submit, bounded, n, producers)
+    bounded.stop()
+
+    stats = loop.stats.snapshot()
+    loop.stop()
+    print(f"batches {stats['batches']}, mean batch {stats['submitted'] / max(stats['batches'], 1):.1f}, "
+          f"max batch {stats['max_batch']}")
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
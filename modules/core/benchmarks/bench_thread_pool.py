@@ -0,0 +1,78 @@
+"""
+线程池: 每次调用新建线程 (原来的 run_in_thread) 与共享的 BoundedExecutor, 以及批量执行的 map / imap / map_unordered
+
+python modules/core/benchmarks/bench_thread_pool.py [n]
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+
+from _hydrogenlib_core.threading_methods import BoundedExecutor, run_in_thread, run_with_timeout
+
+from _common import timeit
+
+
+def task(x):
+    return x * x
+
+
+def io_task(x):
+    time.sleep(0.001)
+    return x
+
+
+def thread_per_call(n):
+    # 原来的实现: 每次调用一个线程和一个队列
+    results = []
+    for i in range(n):
+        queue = Queue()
+        thread = threading.Thread(target=lambda i=i: queue.put(task(i)))
+        thread.start()
+        results.append(queue)
+    return [queue.get() for queue in results]
+
+
+def pool_per_call(n):
+    futures = [run_in_thread(task, i) for i in range(n)]
+    return [f.result() for f in futures]
+
+
+def with_timeout(n):
+    return [run_with_timeout(task, 1, i) for i in range(n)]
+
+
+def executor_map(pool, func, n):
+    return list(pool.map(func, range(n)))
+
+
+def pool_imap(pool, func, n):
+    return list(pool.imap(func, range(n)))
+
+
+def pool_map_unordered(pool, func, n):
+    return list(pool.map_unordered(func, range(n)))
+
+
+def main(n=20000):
+    print(f"n = {n}")
+    timeit("thread per call (before)", thread_per_call, n)
+    timeit("run_in_thread (shared pool)", pool_per_call, n)
+    timeit("run_with_timeout (shared pool)", with_timeout, n)
+
+    m = n // 20
+    with ThreadPoolExecutor(32) as executor, BoundedExecutor(32, max_pending=256) as pool:
+        timeit("ThreadPoolExecutor.map cpu", executor_map, executor, task, n)
+        timeit("BoundedExecutor.imap cpu", pool_imap, pool, task, n)
+        timeit("BoundedExecutor.map_unordered cpu", pool_map_unordered, pool, task, n)
+        timeit(f"ThreadPoolExecutor.map io x{m}", executor_map, executor, io_task, m)
+        timeit(f"BoundedExecutor.imap io x{m}", pool_imap, pool, io_task, m)
+        timeit(f"BoundedExecutor.map_unordered io x{m}", pool_map_unordered, pool, io_task, m)
+        stats = pool.stats.snapshot()
+    print(f"latency: mean wait {stats['mean_wait'] * 1e6:.1f}us, "
+          f"p50 run {stats['p50_run'] * 1e6:.1f}us, p99 run {stats['p99_run'] * 1e6:.1f}us")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,40 @@
+"""
+分层时间轮: 大量挂起任务下的添加/推进/取消开销
+
+python modules/core/benchmarks/bench_timer_wheel.py [n]
+"""
+import random
+import sys
+
+from _hydrogenlib_core.utils.timer_wheel import Wheel
+
+from _common import timeit
+
+
+def noop():
+    pass
+
+
+def main(n=1_000_000):
+    wheel = Wheel(256, 1, levels=4)
+    start = wheel.core.start_time
+    delays = [random.randrange(1, 3_600_000) for _ in range(n)]  # 1ms ~ 1h
+
+    tasks = timeit(f"add {n} tasks", lambda: [wheel.add_task(noop, delay=d) for d in delays])
+    print(f"pending: {wheel.pending}")
+
+    # 以 1ms 的粒度推进 10 秒, 统计每个 tick 的平均开销
+    ticks = 10_000
+    elapsed = timeit(f"advance {ticks} ticks", lambda: [wheel.advance(start + i) for i in range(1, ticks + 1)])
+    fired = n - wheel.pending
+    print(f"fired: {fired}")
+
+    timeit(f"cancel {n // 2} tasks", lambda: [task.cancel() for task in tasks[:n // 2]])
+    print(f"pending: {wheel.pending}")
+
+    timeit("advance 1 hour", wheel.advance, start + 3_600_000)
+    print(f"pending: {wheel.pending}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
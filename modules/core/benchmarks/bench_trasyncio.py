@@ -0,0 +1,96 @@
+"""
+有界并发: asyncio.gather (不限并发 / asyncio.Semaphore 限制) 与 gather_bounded / as_completed_bounded / Nursery(max_concurrency),
+以及 CancelScope 与 asyncio.timeout 的开销
+
+python modules/core/benchmarks/bench_trasyncio.py [n] [limit]
+"""
+import asyncio
+import sys
+import time
+
+from _hydrogenlib_core.trasyncio import CancelScope, as_completed_bounded, create_nursery, gather_bounded
+
+
+async def timeit(name, func, *args):
+    start = time.perf_counter()
+    result = await func(*args)
+    print(f"{name:<48}{time.perf_counter() - start:>10.4f}s")
+    return result
+
+
+async def job(i):
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return i
+
+
+async def io_job(i):
+    await asyncio.sleep(0.001)
+    return i
+
+
+async def raw_gather(func, n, limit):
+    return await asyncio.gather(*(func(i) for i in range(n)))
+
+
+async def semaphore_gather(func, n, limit):
+    semaphore = asyncio.Semaphore(limit)
+
+    async def limited(i):
+        async with semaphore:
+            return await func(i)
+
+    return await asyncio.gather(*(limited(i) for i in range(n)))
+
+
+async def bounded_gather(func, n, limit):
+    return await gather_bounded((func(i) for i in range(n)), limit)
+
+
+async def bounded_as_completed(func, n, limit):
+    return [r async for r in as_completed_bounded((func(i) for i in range(n)), limit)]
+
+
+async def nursery(func, n, limit):
+    async with create_nursery(max_concurrency=limit) as nursery:
+        tasks = [nursery.start_soon(func(i)) for i in range(n)]
+    return [t.result() for t in tasks]
+
+
+async def cancel_scopes(n):
+    for i in range(n):
+        async with CancelScope(timeout=10):
+            await job(i)
+
+
+async def asyncio_timeouts(n):
+    for i in range(n):
+        async with asyncio.timeout(10):
+            await job(i)
+
+
+async def no_timeouts(n):
+    for i in range(n):
+        await job(i)
+
+
+async def main(n=50000, limit=100):
+    print(f"n = {n}, limit = {limit}")
+    for label, func, count in (('cpu', job, n), ('io 1ms', io_job, n // 5)):
+        expected = list(range(count))
+        assert await timeit(f"asyncio.gather unbounded {label}", raw_gather, func, count, limit) == expected
+        assert await timeit(f"asyncio.gather + Semaphore {label}", semaphore_gather, func, count, limit) == expected
+        assert await timeit(f"gather_bounded {label}", bounded_gather, func, count, limit) == expected
+        assert sorted(await timeit(f"as_completed_bounded {label}", bounded_as_completed, func, count, limit)) == expected
+        assert await timeit(f"Nursery(max_concurrency) {label}", nursery, func, count, limit) == expected
+
+    await timeit("no timeout", no_timeouts, n)
+    await timeit("CancelScope(timeout)", cancel_scopes, n)
+    await timeit("asyncio.timeout", asyncio_timeouts, n)
+
+
+if __name__ == '__main__':
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    ))
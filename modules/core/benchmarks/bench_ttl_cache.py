@@ -0,0 +1,75 @@
+"""
+过期键值存储: TTLCache 与 TimedDataManager 的写入/读取/清理, 以及大量短期键的内存回收
+
+python modules/core/benchmarks/bench_ttl_cache.py [n]
+"""
+import sys
+import time
+
+from _hydrogenlib_core.utils import TimedDataManager, TTLCache
+
+from _common import timeit
+
+
+def manager_add(manager, keys):
+    for key in keys:
+        manager.add_threadsafe(key, key)
+
+
+def manager_get(manager, keys):
+    return manager.get_multiple_threadsafe(keys)
+
+
+def cache_set(cache, keys):
+    for key in keys:
+        cache.set(key, key)
+
+
+def cache_get(cache, keys):
+    get = cache.get
+    return [get(key) for key in keys]
+
+
+def short_lived(cache, n, rounds):
+    """
+    每一轮写入 n 个短期键, 后台线程负责清理
+    """
+    peak = 0
+    for r in range(rounds):
+        cache.set_many((((r, i), i) for i in range(n)), ttl=0.05)
+        time.sleep(0.05)
+        peak = max(peak, len(cache))
+    return peak
+
+
+def main(n=1_000_000):
+    keys = list(range(n))
+    print(f"{n} keys")
+
+    manager = TimedDataManager(timeout=60)
+    timeit("TimedDataManager add_threadsafe", manager_add, manager, keys)
+    timeit("TimedDataManager get_multiple_threadsafe", manager_get, manager, keys)
+    timeit("TimedDataManager clean_up (nothing expired)", manager.clean_up)
+
+    cache = TTLCache(default_ttl=60)
+    timeit("TTLCache set", cache_set, cache, keys)
+    timeit("TTLCache get", cache_get, cache, keys)
+    cache.clear()
+    timeit("TTLCache set_many", cache.set_many, zip(keys, keys))
+    timeit("TTLCache get_many", cache.get_many, keys)
+    timeit("TTLCache expire (nothing expired)", cache.expire)
+
+    lru = TTLCache(default_ttl=60, max_entries=n // 10)
+    timeit("TTLCache(max_entries=n/10) set_many", lru.set_many, zip(keys, keys))
+    print(f"{'':<4}evicted: {lru.evicted}")
+
+    cache = TTLCache(resolution=0.01)
+    cache.start_expiry(interval=0.01)
+    peak = timeit(f"short-lived keys, 20 rounds of {n // 20}", short_lived, cache, n // 20, 20)
+    time.sleep(1)
+    print(f"{'':<4}peak entries: {peak}, after 1s: {len(cache)}, expired: {cache.expired}")
+    cache.stop_expiry()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,24 +1,398 @@
-from _hydrogenlib_core.typefunc import *
-from _hydrogenlib_core.utils import *
-from _hydrogenlib_core.hash import *
-from _hydrogenlib_core.json import *
-from _hydrogenlib_core.data_structures import *
-from _hydrogenlib_core.fsutil import *
-from _hydrogenlib_core.std_extends import *
-from _hydrogenlib_core.threading_methods import *
-from _hydrogenlib_core.async_methods import *
-from _hydrogenlib_core.atexit import *
-from _hydrogenlib_core.const import *
-from _hydrogenlib_core.dataclasses_methods import *
-from _hydrogenlib_core.decorators import *
-from _hydrogenlib_core.descriptor import *
-from _hydrogenlib_core.environ_parser import *
-from _hydrogenlib_core.import_plus import *
-from _hydrogenlib_core.io_addons import *
-from _hydrogenlib_core.network import *
-from _hydrogenlib_core.nio import *
-from _hydrogenlib_core.output_methods import *
-from _hydrogenlib_core.process import *
-from _hydrogenlib_core.sys_plus import *
-from _hydrogenlib_core.time_ import *
-from _hydrogenlib_core.trasyncio import *
\ No newline at end of file
+# 由 scripts/generate_lazy_exports.py 生成, 不要手动修改
+# 名称在第一次访问时才导入所在的子模块 (PEP 562)
+from _hydrogenlib_core.import_plus import lazy_exports
+
+_EXPORTS = {
+    '_hydrogenlib_core.typefunc': (
+        'Any',
+        'AsyncIO',
+        'AsyncIterator',
+        'AutoCompare',
+        'AutoInfo',
+        'AutoRepr',
+        'AutoSlots',
+        'AutoSlotsMeta',
+        'AutoStr',
+        'BST',
+        'Bitmap',
+        'Callable',
+        'CompressedBitmap',
+        'DefaultDict',
+        'EnhancedGenerator',
+        'Function',
+        'FunctionGroup',
+        'FunctionTypes',
+        'Generator',
+        'IterableOffsetFunction',
+        'Literal',
+        'MutableMapping',
+        'ObjectiveDict',
+        'Offset',
+        'OffsetFunction',
+        'Optional',
+        'Protocol',
+        'SafeExpression',
+        'Self',
+        'SingletonType',
+        'SubDict',
+        'Template',
+        'Tree',
+        'Union',
+        'abstractmethod',
+        'alias',
+        'array',
+        'as_address_string',
+        'as_aiter',
+        'ast_name_to_operator',
+        'bisect_left',
+        'bisect_right',
+        'bitarray',
+        'builtin_types',
+        'bytes_to_int',
+        'call_property',
+        'call_stack',
+        'compile_safe',
+        'concat',
+        'count_n',
+        'd1',
+        'd1_init',
+        'd2',
+        'd2_init',
+        'd3',
+        'd3_init',
+        'deepcopy',
+        'del_attr_by_path',
+        'deque',
+        'dict_get_as',
+        'enhanced_generator',
+        'extract_as_dict',
+        'fill_concat',
+        'final',
+        'get_args',
+        'get_attr_by_path',
+        'get_called_func',
+        'get_code',
+        'get_doc',
+        'get_module',
+        'get_name',
+        'get_origin',
+        'get_parameters',
+        'get_qualname',
+        'get_signature',
+        'get_source',
+        'get_subclass_counts',
+        'get_subclass_counts_recursion',
+        'get_subclasses',
+        'get_subclasses_recursion',
+        'get_type_name',
+        'get_vaild_data',
+        'groupby',
+        'hasindex',
+        'indexs_of',
+        'int_to_bytes',
+        'int_to_bytes_nonelength',
+        'is_error',
+        'is_function',
+        'is_function_type',
+        'is_instance',
+        'is_method',
+        'iter_annotations',
+        'iter_attributes',
+        'literal_eval',
+        'map',
+        'match',
+        'multi_get_item',
+        'oneshot',
+        'opers',
+        'parent',
+        'print_tree',
+        'print_tree_img',
+        'replace_concat',
+        'set_attr_by_path',
+        'split',
+        'split_type',
+        'sub',
+        'template_match',
+        'template_sort',
+        'template_sub',
+        'unpack_to_tuple',
+        'wraps',
+        'zeros',
+    ),
+    '_hydrogenlib_core.utils': (
+        'AsyncHook',
+        'BufferPool',
+        'Clock',
+        'Counter',
+        'Dotpath',
+        'DoubleDict',
+        'Event',
+        'Fraction',
+        'Histogram',
+        'Hook',
+        'InstanceMapping',
+        'InstanceMappingItem',
+        'KiB',
+        'LazyData',
+        'Lock',
+        'MiB',
+        'MultiSet',
+        'Namespace',
+        'OnceMessage',
+        'OrderedDict',
+        'Pool',
+        'PoolItem',
+        'PoolObject',
+        'PoolStats',
+        'ProbabilityCounter',
+        'Signal',
+        'SignalInstance',
+        'TTLCache',
+        'TimedData',
+        'TimedDataManager',
+        'UserDict',
+        'async_lazy_property',
+        'buffer_pool',
+        'count_bytes',
+        'iter_chunks',
+        'lazy_property',
+        'sleep',
+    ),
+    '_hydrogenlib_core.hash': (
+        'DigestCache',
+        'Hash',
+        'ThreadPoolExecutor',
+        'hash_file',
+        'hash_many',
+        'hash_stream',
+        'tree_hash',
+    ),
+    '_hydrogenlib_core.json': (
+        'Object',
+        'jsontypes',
+        'object_hook',
+    ),
+    '_hydrogenlib_core.data_structures': (
+        'BplusTree',
+        'BplusTreeStats',
+        'BplusTree_t',
+        'CSRGraph',
+        'GraphBase',
+        'GraphCycleError',
+        'Heap',
+        'HuffmanCodec',
+        'HuffmanNode',
+        'HuffmanTree',
+        'IndexedHeap',
+        'Iterable',
+        'MAX_CODE_LENGTH',
+        'Node',
+        'PagedBplusTree',
+        'PagedNode',
+        'RWLock',
+        'Range',
+        'SearchResult',
+        'Stack',
+        'UndirectedGraph',
+        'Visited',
+        'WeightedGraph',
+        'canonical_decode',
+        'chain',
+        'copy',
+        'frozenbitarray',
+        'get_probabilities',
+        'get_probabilities_dict',
+        'huffman_compress',
+        'huffman_decompress',
+        'inf',
+        'itemgetter',
+        'merge',
+    ),
+    '_hydrogenlib_core.std_extends': (
+        'frozendict',
+        'get_console',
+        'print',
+    ),
+    '_hydrogenlib_core.threading_methods': (
+        'BoundedExecutor',
+        'FuncWorker',
+        'LatencyStats',
+        'SyncResource',
+        'SyncResourceContextManager',
+        'Thread',
+        'ThreadWorker',
+        'default_pool',
+        'exit_thread',
+        'get_tid',
+        'run_in_thread',
+        'run_in_thread_with_timeout',
+        'run_new_daemon_thread',
+        'run_new_thread',
+        'run_with_timeout',
+        'set_default_pool',
+    ),
+    '_hydrogenlib_core.async_methods': (
+        'FutureFunction',
+        'LoopStats',
+        'ProtectedTask',
+        'ThreadEventLoop',
+        'new_event_loop',
+        'partial',
+        'run_in_existing_loop',
+        'run_in_new_loop',
+        'to_coro',
+        'wrap',
+    ),
+    '_hydrogenlib_core.atexit': (
+        'ExitContainer',
+        'ExitFunction',
+    ),
+    '_hydrogenlib_core.const': (
+        'BCR_ALL',
+        'BCR_BAD_REQUEST',
+        'BCR_CANNOT_FOUND',
+        'BCR_DISCONNECT',
+        'BCR_EXIST_NAME',
+        'BCR_GROUP',
+        'BCR_NAME_NOT_FOUND',
+        'BCR_OPERATOR',
+        'BCR_PERSON',
+        'BCR_RANGE',
+        'BCR_SEND',
+        'DBX_FUNC_TYPE_GET',
+        'DBX_FUNC_TYPE_MRO',
+        'ETY_TYPE_IV',
+        'ETY_TYPE_KEY',
+        'JSON_DECODE',
+        'JSON_ENCODE',
+        'PERM_ROLE_ALLOW',
+        'PERM_ROLE_DENY',
+        'UNKNOWN',
+        'link_constant',
+        'unlink_constant',
+        'zlibcon_logger',
+    ),
+    '_hydrogenlib_core.dataclasses_methods': (
+        'default_factory',
+    ),
+    '_hydrogenlib_core.decorators': (
+        'RetryLimitExceeded',
+        'retry',
+    ),
+    '_hydrogenlib_core.descriptor': (
+        'Descriptor',
+        'DescriptorInstance',
+        'annotations',
+        'get_descriptor_instance',
+    ),
+    '_hydrogenlib_core.environ_parser': (
+        'Environ',
+        'EnvironType',
+        'EnvironVar',
+        'TypeCallable',
+        'environ',
+        'environ_property',
+        'list_sep',
+        'pathlist',
+        'reset_environ',
+        'update_environ',
+        'with_environ',
+    ),
+    '_hydrogenlib_core.import_plus': (
+        'import_package',
+        'import_source',
+        'lazy_exports',
+        'load_package',
+        'load_source',
+        'load_source_noname',
+    ),
+    '_hydrogenlib_core.io_addons': (
+        'BlockingIOError',
+        'BufferedIOBase',
+        'BufferedRWPair',
+        'BufferedRandom',
+        'BufferedReader',
+        'BufferedWriter',
+        'BytesIO',
+        'DEFAULT_BUFFER_SIZE',
+        'FileIO',
+        'IOBase',
+        'IncrementalNewlineDecoder',
+        'RawIOBase',
+        'SEEK_CUR',
+        'SEEK_END',
+        'SEEK_SET',
+        'SocketIO',
+        'StringIO',
+        'TextIOBase',
+        'TextIOWrapper',
+        'UnsupportedOperation',
+        'open',
+        'open_code',
+        'text_encoding',
+    ),
+    '_hydrogenlib_core.network': (
+        'HostInfo',
+        'IPAddress',
+        'IPv4Address',
+        'IPv6Address',
+        'NamedTuple',
+        'RemoteAddr',
+        'host_to_ip',
+        'ip_class_range',
+        'ip_to_host',
+        'iter_ip_class_range',
+        'parse_remote_addr',
+        'ping',
+    ),
+    '_hydrogenlib_core.nio': (
+        'FileStatus',
+        'NeoIO',
+    ),
+    '_hydrogenlib_core.output_methods': (
+        'Cursor',
+        'Decimal',
+        'RedirectOutput',
+        'color_init',
+        'double',
+        'get_background',
+        'get_color_head',
+        'get_foreground',
+        'mapping',
+        'outputplus_logger',
+        'print_color',
+    ),
+    '_hydrogenlib_core.process': (
+        'Process',
+        'ProcessInfo',
+        'find_processes',
+        'kill_process_by_name',
+        'kill_process_by_pid',
+        'sys_process',
+        'to_info',
+    ),
+    '_hydrogenlib_core.sys_plus': (
+        'Runtime',
+    ),
+    '_hydrogenlib_core.time_': (
+        'DatetimeParser',
+        'IntervalRecorder',
+        'Stopwatch',
+        'Time',
+    ),
+    '_hydrogenlib_core.trasyncio': (
+        'CancelScope',
+        'Cancelled',
+        'Nursery',
+        'as_completed_bounded',
+        'create_nursery',
+        'gather_bounded',
+    ),
+    '_hydrogenlib_core.parallel': (
+        'parallel_map',
+        'parallel_starmap',
+    ),
+}
+
+__all__ = [name for names in _EXPORTS.values() for name in names]
+__getattr__, __dir__ = lazy_exports(globals(), _EXPORTS)
@@ -1,4 +1,7 @@
 import asyncio
+import concurrent.futures
+import threading
+from collections import deque
 from functools import partial
 
 from .threading_methods import run_new_thread
@@ -22,12 +25,19 @@ async def to_coro(func, *args, **kwargs):
 
 
 class FutureFunction:
+    """
+    在事件循环线程中调用的函数, 结果通过线程安全的 concurrent.futures.Future 传回调用方
+    """
+
     def __init__(self, func, *args, **kwargs):
         self._partial = partial(func, *args, **kwargs)
-        self._future = asyncio.Future()
+        self._future = concurrent.futures.Future()
 
     def __call__(self, *args, **kwargs):
-        self._future.set_result(self._partial(*args, **kwargs))
+        try:
+            self._future.set_result(self._partial(*args, **kwargs))
+        except BaseException as e:
+            self._future.set_exception(e)
 
     @property
     def done(self):
@@ -35,10 +45,13 @@ class FutureFunction:
 
     @property
     def result(self):
+        """
+        阻塞直到函数被调用
+        """
         return self._future.result()
 
     def __await__(self):
-        return self._future.__await__()
+        return asyncio.wrap_future(self._future).__await__()
 
 
 def wrap(func, *args, **kwargs):
@@ -58,20 +71,68 @@ class ProtectedTask:
         return self._task.done()
 
     def cancel(self):
-        self._loop.call_soon_threadsafe(self._task.cancel, ())
+        self._loop.call_soon_threadsafe(self._task.cancel)
 
     def __await__(self):
         return self._task.__await__()
 
 
+class LoopStats:
+    """
+    ThreadEventLoop 的统计
+
+    - lag: 心跳回调实际执行时间与计划时间之差 (秒), 反映事件循环被阻塞的程度
+    - batches / submitted: 唤醒事件循环的次数和提交的协程数, 两者之比为平均批大小
+    """
+
+    def __init__(self):
+        self.submitted = self.completed = self.batches = self.max_batch = 0
+        self.lag = self.max_lag = self.mean_lag = 0.0
+
+    def record_lag(self, lag):
+        self.lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.mean_lag += (lag - self.mean_lag) * 0.1
+
+    def snapshot(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'in_flight': self.submitted - self.completed,
+            'batches': self.batches,
+            'max_batch': self.max_batch,
+            'lag': self.lag,
+            'mean_lag': self.mean_lag,
+            'max_lag': self.max_lag,
+        }
+
+
 class ThreadEventLoop:
     """
     独立运行的事件循环,保证线程安全
+
+    submit 把协程放入待处理队列, 队列从空变为非空时才调用一次 call_soon_threadsafe,
+    事件循环被唤醒后一次取出队列中的所有协程创建任务, 因此高频提交时多个协程共用一次唤醒
     """
 
-    def __init__(self):
+    def __init__(self, max_in_flight=0, lag_interval=0.1, drain_limit=1024):
+        """
+        :param max_in_flight: 未完成的协程数的上限, 达到上限后 submit 阻塞, 0 表示不限制;
+            不要在事件循环线程中调用会阻塞的 submit
+        :param lag_interval: 测量事件循环延迟的心跳间隔 (秒), 0 表示不测量
+        :param drain_limit: 每次回调最多创建的任务数
+        """
         self._thread = None
         self._loop: asyncio.AbstractEventLoop = None
+        self._pending = deque()  # (协程, concurrent.futures.Future)
+        self._pending_lock = threading.Lock()
+        self._wakeup_scheduled = False
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._lag_interval = lag_interval
+        self._drain_limit = drain_limit
+        self._heartbeat = None
+        self.stats = LoopStats()
 
     def __run_threadsafe(self, func, *args, **kwargs):
         wraped_func = wrap(func, *args, **kwargs)
@@ -80,8 +141,120 @@ class ThreadEventLoop:
 
     def __thread_main(self):
         asyncio.set_event_loop(self._loop)
+        if self._lag_interval:
+            self._beat(self._loop.time())
         self._loop.run_forever()
 
+    def _beat(self, expected):
+        now = self._loop.time()
+        self.stats.record_lag(max(0.0, now - expected))
+        self._heartbeat = self._loop.call_at(now + self._lag_interval, self._beat, now + self._lag_interval)
+
+    def _drain(self):
+        """
+        在事件循环线程中执行, 为待处理队列中的所有协程创建任务
+        """
+        with self._pending_lock:
+            pending = self._pending
+            if len(pending) <= self._drain_limit:
+                batch, self._pending = pending, deque()
+                self._wakeup_scheduled = False
+            else:
+                # 剩余的在下一轮处理, 期间其他回调可以执行
+                batch = [pending.popleft() for _ in range(self._drain_limit)]
+                self._loop.call_soon(self._drain)
+        stats = self.stats
+        stats.batches += 1
+        if len(batch) > stats.max_batch:
+            stats.max_batch = len(batch)
+
+        loop = self._loop
+        for coro, future in batch:
+            if future.cancelled():
+                coro.close()
+                stats.completed += 1
+                self._release()
+                continue
+            task = loop.create_task(coro)
+            task.add_done_callback(partial(self._settle, future))
+            future.add_done_callback(partial(self._cancel_task, task))
+
+    def _settle(self, future, task):
+        self.stats.completed += 1
+        self._release()
+        try:
+            if task.cancelled():
+                future.cancel()
+            elif (exc := task.exception()) is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(task.result())
+        except concurrent.futures.InvalidStateError:  # 调用方已经取消
+            pass
+
+    def _cancel_task(self, task, future):
+        if future.cancelled() and not task.done() and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    def _release(self):
+        # 在任务结束 (或协程未开始就被关闭) 时释放, 而不是在调用方的 Future 被取消时
+        if self._slots is not None:
+            self._slots.release()
+
+    def _enqueue(self, items):
+        with self._pending_lock:
+            self._pending.extend(items)
+            self.stats.submitted += len(items)
+            if self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def _acquire(self, coro, timeout):
+        if not self._slots.acquire(timeout=timeout):
+            coro.close()
+            raise TimeoutError("too many coroutines in flight")
+
+    def submit(self, coro, timeout=None) -> concurrent.futures.Future:
+        """
+        在事件循环中运行协程, 可以在任意线程中调用
+        取消返回的 Future 会取消对应的任务
+        :param timeout: 达到 max_in_flight 时最多等待的秒数, 超时抛出 TimeoutError
+        """
+        if self._slots is not None:
+            self._acquire(coro, timeout)
+        future = concurrent.futures.Future()
+        self._enqueue(((coro, future),))
+        return future
+
+    def submit_many(self, coros, timeout=None) -> list[concurrent.futures.Future]:
+        """
+        批量提交, 每批只获取一次锁; 达到 max_in_flight 时先提交已有的部分再等待空位
+        等待超时抛出 TimeoutError, 此时已提交的协程被取消, 其余的协程被关闭
+        """
+        futures = []
+        batch = []
+        coros = iter(coros)
+        for coro in coros:
+            if self._slots is not None and not self._slots.acquire(blocking=False):
+                if batch:
+                    self._enqueue(batch)
+                    batch = []
+                try:
+                    self._acquire(coro, timeout)
+                except TimeoutError:
+                    for future in futures:
+                        future.cancel()
+                    for rest in coros:
+                        rest.close()
+                    raise
+            future = concurrent.futures.Future()
+            batch.append((coro, future))
+            futures.append(future)
+        if batch:
+            self._enqueue(batch)
+        return futures
+
     def start(self):
         self._loop = new_event_loop()
         self._thread = run_new_thread(self.__thread_main)
@@ -90,18 +263,41 @@ class ThreadEventLoop:
         return self._loop.is_running()
 
     def create_task(self, coro):
+        """
+        在事件循环线程中创建任务并等待创建完成, 高频提交时使用 submit
+        """
         task = self.__run_threadsafe(self._loop.create_task, coro)
-        return ProtectedTask(self._loop, task)
+        return ProtectedTask(task, self._loop)
 
     def run_until_complete(self, coro):
-        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return self.submit(coro).result()
 
     def run_coroutine(self, coro):
-        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return self.submit(coro)
 
     def all_task(self):
         return asyncio.all_tasks(self._loop)
 
-    def stop(self):
+    async def _cancel_all(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, cancel=True):
+        """
+        停止事件循环, 还未开始的协程被关闭, 它们的 Future 被取消
+        :param cancel: 是否先取消并等待事件循环中所有未完成的任务
+        """
+        if cancel:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result()
+        if self._heartbeat is not None:
+            self._loop.call_soon_threadsafe(self._heartbeat.cancel)
         self._loop.call_soon_threadsafe(self._loop.stop)
         self._thread.join()
+        with self._pending_lock:
+            batch, self._pending = self._pending, deque()
+        for coro, future in batch:
+            coro.close()
+            future.cancel()
+            self._release()
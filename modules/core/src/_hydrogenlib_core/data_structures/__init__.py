@@ -2,6 +2,7 @@ from .b_plus_tree import *
 from .graph import *
 from .heap import *
 from .huffman_tree import *
+from .paged_b_plus_tree import *
 from .stack import *
 from .tree import *
 from .wrappers import *
@@ -1,32 +1,42 @@
-import inspect
-import queue
+import dataclasses as dc
 import threading
 import time
-from typing import Union
+from bisect import bisect_left, bisect_right
+from collections import deque
+from heapq import merge
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Union
+
+from ..threading_methods import RWLock
+
+_INSERT, _REMOVE = 0, 1
 
 
 class Node:
+    __slots__ = ('leaf', 'keys', 'values', 'children', 'next')
+
     def __init__(self, leaf=True):
         self.leaf = leaf
-        self.n = 0
         self.keys = []
-        self.values = []
-        self.children = []
+        self.values = []  # Only used by leaf nodes
+        self.children = []  # Only used by internal nodes
+        self.next = None  # type: Node | None  # Right sibling (leaf nodes only)
 
-    def __del__(self):
-        for child in self.children:
-            del child
+    @property
+    def n(self):
+        return len(self.keys)
 
     def __str__(self):
         if self.leaf:
             return f"Leaf Node({dict(zip(self.keys, self.values))})"
         else:
-            return f"Internal Node({dict(zip(self.keys, [child.__str__() for child in self.children]))})"
+            return f"Internal Node(keys={self.keys}, children={[str(child) for child in self.children]})"
 
     def to_dict(self):
-        root = {
-            'keys': self.keys,
-            'values': self.values,
+        return {
+            'keys': list(self.keys),
+            'values': list(self.values),
             'leaf': self.leaf,
             'n': self.n,
             'children': [
@@ -36,15 +46,10 @@ class Node:
 
     @classmethod
     def from_dict(cls, bp_dict: dict):
-        node = cls()
-        node.keys, node.values = bp_dict['keys'], bp_dict['values']
-        node.leaf = bp_dict['leaf']
-        node.n = bp_dict['n']
-
-        node.children = []
-
-        for i in range(len(bp_dict['children'])):
-            node.children.append(cls.from_dict(bp_dict['children'][i]))
+        node = cls(leaf=bp_dict['leaf'])
+        node.keys, node.values = list(bp_dict['keys']), list(bp_dict['values'])
+        node.children = [cls.from_dict(child) for child in bp_dict['children']]
+        return node
 
 
 class SearchResult:
@@ -55,281 +60,548 @@ class SearchResult:
 
 
 class BplusTree_t:
+    """
+    B+ 树
+
+    - 每个节点最多保存 2t-1 个键, 非根节点至少保存 t-1 个键
+    - 节点内使用 bisect 查找
+    - 所有数据保存在叶子节点中, 叶子节点之间通过 next 链接, 范围查询为 "定位 + 顺序扫描"
+    - 重复插入同一个键会覆盖旧值
+    """
+
     def __init__(self, t):
-        self.root = Node()
+        if t < 2:
+            raise ValueError("t must be at least 2")
         self.t = t
+        self._max_keys = 2 * t - 1
+        self._min_keys = t - 1
+        self._size = 0
+        self.root = self._new_node()
+
+    # 节点访问钩子: 内存中的树直接保存节点对象, 子类 (如 PagedBplusTree) 可以将节点映射到外部存储
+    def _node(self, ref):
+        """
+        将 children/next 中保存的引用转换为节点
+        """
+        return ref
+
+    def _ref(self, node):
+        """
+        获取保存在 children/next 中的节点引用
+        """
+        return node
+
+    def _new_node(self, leaf=True):
+        return Node(leaf)
+
+    def _touch(self, node):
+        """
+        标记节点已被修改
+        """
+
+    def _free(self, node):
+        """
+        节点已从树中移除
+        """
+
+    def _find_leaf(self, k, path=None):
+        # 查找是最频繁的操作, 这里直接访问 children, 使用外部存储的子类需要重写
+        x = self.root
+        while not x.leaf:
+            i = bisect_right(x.keys, k)
+            if path is not None:
+                path.append((x, i))
+            x = x.children[i]
+        return x
 
-    def split_child(self, x, i):
-        y = x.children[i]
-        z = Node(leaf=y.leaf)
+    def _first_leaf(self):
+        x = self.root
+        while not x.leaf:
+            x = x.children[0]
+        return x
+
+    def _split(self, x, path):
+        while len(x.keys) > self._max_keys:
+            mid = len(x.keys) // 2
+            z = self._new_node(x.leaf)
+
+            if x.leaf:
+                z.keys = x.keys[mid:]
+                z.values = x.values[mid:]
+                del x.keys[mid:], x.values[mid:]
+
+                z.next = x.next
+                x.next = self._ref(z)
+                separator = z.keys[0]  # Copy the first key of the right leaf up
+            else:
+                separator = x.keys[mid]  # Move the middle key up
+                z.keys = x.keys[mid + 1:]
+                z.children = x.children[mid + 1:]
+                del x.keys[mid:], x.children[mid + 1:]
+
+            self._touch(x)
+            self._touch(z)
+
+            if not path:
+                root = self._new_node(False)
+                root.keys = [separator]
+                root.children = [self._ref(x), self._ref(z)]
+                self.root = root
+                return
+
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, self._ref(z))
+            self._touch(parent)
+            x = parent
+
+    def _rebalance(self, x, path):
+        min_keys = self._min_keys
+        while path and len(x.keys) < min_keys:
+            parent, i = path.pop()
+            left = self._node(parent.children[i - 1]) if i > 0 else None
+            right = self._node(parent.children[i + 1]) if i + 1 < len(parent.children) else None
+
+            if left is not None and len(left.keys) > min_keys:  # Borrow from left sibling
+                if x.leaf:
+                    x.keys.insert(0, left.keys.pop())
+                    x.values.insert(0, left.values.pop())
+                    parent.keys[i - 1] = x.keys[0]
+                else:
+                    x.keys.insert(0, parent.keys[i - 1])
+                    parent.keys[i - 1] = left.keys.pop()
+                    x.children.insert(0, left.children.pop())
+                self._touch(x)
+                self._touch(left)
+                self._touch(parent)
+                return
+
+            if right is not None and len(right.keys) > min_keys:  # Borrow from right sibling
+                if x.leaf:
+                    x.keys.append(right.keys.pop(0))
+                    x.values.append(right.values.pop(0))
+                    parent.keys[i] = right.keys[0]
+                else:
+                    x.keys.append(parent.keys[i])
+                    parent.keys[i] = right.keys.pop(0)
+                    x.children.append(right.children.pop(0))
+                self._touch(x)
+                self._touch(right)
+                self._touch(parent)
+                return
+
+            # Merge with a sibling, always merging the right node into the left one
+            if left is not None:
+                i -= 1
+            else:
+                left, x = x, right
 
-        # Initialize the new node z
-        z.n = self.t - 1
-        z.keys = y.keys[self.t:]
-        z.values = y.values[self.t:]
+            if left.leaf:
+                left.keys.extend(x.keys)
+                left.values.extend(x.values)
+                left.next = x.next
+            else:
+                left.keys.append(parent.keys[i])
+                left.keys.extend(x.keys)
+                left.children.extend(x.children)
 
-        y.keys = y.keys[:self.t]
-        y.values = y.values[:self.t]
+            del parent.keys[i], parent.children[i + 1]
+            self._touch(left)
+            self._touch(parent)
+            self._free(x)
+            x = parent
 
-        if not y.leaf:
-            z.children = y.children[self.t:]
-            y.children = y.children[:self.t]
+        root = self.root
+        if not root.leaf and not root.keys:
+            self.root = self._node(root.children[0])
+            self._free(root)
 
-        # Insert the new node z into x's children list at position i+1
-        x.children.insert(i + 1, z)
+    def insert(self, k, v):
+        path = []
+        x = self._find_leaf(k, path)
 
-        # Move the middle key up to the parent node x
-        x.keys.insert(i, y.keys[-1])
+        i = bisect_left(x.keys, k)
+        if i < len(x.keys) and x.keys[i] == k:
+            x.values[i] = v
+            self._touch(x)
+            return
 
-        # Increment the number of keys in x
-        x.n += 1
+        x.keys.insert(i, k)
+        x.values.insert(i, v)
+        self._touch(x)
+        self._size += 1
 
-    def insert_non_full(self, x, k, v):
-        i = x.n - 1
+        if len(x.keys) > self._max_keys:
+            self._split(x, path)
 
-        if x.leaf:
-            while i >= 0 and k < x.keys[i]:
-                print(x.keys(), i)
-                x.keys.insert(i + 1, x.keys[i])
-                x.values.insert(i + 1, x.values[i])
-                i -= 1
-            x.keys.insert(i + 1, k)
-            x.values.insert(i + 1, v)
-            x.n += 1
-        else:
-            while i >= 0 and k < x.keys[i]:
-                i -= 1
-            i += 1
+    def remove(self, k):
+        path = []
+        x = self._find_leaf(k, path)
 
-            if x.children[i].n == 2 * self.t - 1:
-                self.split_child(x, i)
-                if k > x.keys[i]:
-                    i += 1
+        i = bisect_left(x.keys, k)
+        if i == len(x.keys) or x.keys[i] != k:
+            return
 
-            self.insert_non_full(x.children[i], k, v)
+        del x.keys[i], x.values[i]
+        self._touch(x)
+        self._size -= 1
+
+        self._rebalance(x, path)
+
+    def _load_leaves(self, it, capacity):
+        leaves = []
+        leaf = self._new_node()
+        last = None
+        for k, v in it:
+            if leaf.keys or leaves:
+                if k < last:  # 输入无序, 回退到 "排序后再加载"
+                    loaded = chain.from_iterable(zip(x.keys, x.values) for x in leaves + [leaf])
+                    data = sorted(chain(loaded, [(k, v)], it), key=itemgetter(0))
+                    for x in leaves + [leaf]:
+                        self._free(x)
+                    return self._load_leaves(iter(data), capacity)
+                if k == last:
+                    leaf.values[-1] = v
+                    continue
+
+            if len(leaf.keys) == capacity:
+                leaves.append(leaf)
+                new = self._new_node()
+                leaf.next = self._ref(new)
+                leaf = new
+
+            leaf.keys.append(k)
+            leaf.values.append(v)
+            last = k
+
+        leaves.append(leaf)
+
+        # 保证最后一个叶子节点不少于 t-1 个键
+        if len(leaves) > 1 and len(leaves[-1].keys) < self._min_keys:
+            prev, leaf = leaves[-2], leaves[-1]
+            total = len(prev.keys) + len(leaf.keys)
+            if total <= self._max_keys:
+                prev.keys.extend(leaf.keys)
+                prev.values.extend(leaf.values)
+                prev.next = None
+                self._free(leaves.pop())
+            else:
+                move = total // 2 - len(leaf.keys)
+                leaf.keys[:0] = prev.keys[-move:]
+                leaf.values[:0] = prev.values[-move:]
+                del prev.keys[-move:], prev.values[-move:]
 
-    def merge_children(self, x, i):
-        y = x.children[i]
-        z = x.children[i + 1]
+        return leaves
 
-        # Transfer the middle key from x to y
-        y.keys.append(x.keys[i])
+    def _build_level(self, children, lows, fanout):
+        bounds = [[i, min(i + fanout, len(children))] for i in range(0, len(children), fanout)]
 
-        # Transfer all keys and children from z to y
-        y.keys.extend(z.keys)
-        if not y.leaf:
-            y.children.extend(z.children)
+        # 保证最后一个节点不少于 t 个子节点
+        if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < self.t:
+            start, end = bounds[-2][0], bounds[-1][1]
+            if end - start <= 2 * self.t:
+                bounds[-2:] = [[start, end]]
+            else:
+                middle = start + (end - start) // 2
+                bounds[-2:] = [[start, middle], [middle, end]]
+
+        nodes, node_lows = [], []
+        for start, end in bounds:
+            node = self._new_node(False)
+            node.children = [self._ref(child) for child in children[start:end]]
+            node.keys = lows[start + 1:end]
+            nodes.append(node)
+            node_lows.append(lows[start])
+
+        return nodes, node_lows
+
+    def bulk_load(self, iterable, fill_factor=1.0):
+        """
+        自底向上批量构建树, 比逐个 insert 快得多
+        :param iterable: 按键升序排列的 (key, value) 迭代器, 会以流的方式读取;
+                         如果发现输入无序, 会回退到先排序再加载
+        :param fill_factor: 每个节点的填充率 (0, 1], 预留空间可以减少之后插入时的分裂
+        :return: self
+        """
+        if not 0 < fill_factor <= 1:
+            raise ValueError("fill_factor must be in (0, 1]")
+
+        if self._size:  # 与已有的数据合并, 相同的键以新数据为准
+            iterable = merge(self.items(), iterable, key=itemgetter(0))
+
+        capacity = max(self._min_keys, int(self._max_keys * fill_factor))
+        nodes = self._load_leaves(iter(iterable), capacity)
+        size = sum(len(leaf.keys) for leaf in nodes)
+
+        lows = [leaf.keys[0] if leaf.keys else None for leaf in nodes]
+        while len(nodes) > 1:
+            nodes, lows = self._build_level(nodes, lows, capacity + 1)
+
+        self.root = nodes[0]
+        self._size = size
+        return self
 
-        # Update the number of keys in y
-        y.n += z.n + 1
+    def search(self, k):
+        x = self._find_leaf(k)
+        i = bisect_left(x.keys, k)
+        if i < len(x.keys) and x.keys[i] == k:
+            return SearchResult(result=x.values[i])
+        else:
+            return SearchResult(None, True, "Key not found")  # Key not found
 
-        # Remove the middle key from x
-        x.keys.pop(i)
+    def get(self, k, default=None):
+        x = self._find_leaf(k)
+        i = bisect_left(x.keys, k)
+        if i < len(x.keys) and x.keys[i] == k:
+            return x.values[i]
+        return default
+
+    def iter_range(self, start=None, end=None):
+        """
+        按顺序迭代 [start, end] 范围内的 (key, value)
+        :param start: 起始键(包含), 为 None 时从最小的键开始
+        :param end: 结束键(包含), 为 None 时迭代到最大的键
+        """
+        if start is None:
+            x, i = self._first_leaf(), 0
+        else:
+            x = self._find_leaf(start)
+            i = bisect_left(x.keys, start)
 
-        # Remove z from x's children list
-        x.children.pop(i + 1)
+        while x is not None:
+            keys, values = x.keys, x.values
+            if end is not None and keys and keys[-1] > end:
+                j = bisect_right(keys, end)
+                yield from zip(keys[i:j], values[i:j])
+                return
 
-        # Update the number of keys in x
-        x.n -= 1
+            yield from zip(keys[i:], values[i:])
+            x, i = self._node(x.next), 0
 
-        # Delete the merged node z
-        del z
+    def range_query(self, start_key, end_key):
+        return list(self.iter_range(start_key, end_key))
 
-    def redistribute_key(self, x, i):
-        y = x.children[i]
-        z = x.children[i + 1]
+    def items(self):
+        return self.iter_range()
 
-        if y.n < self.t:
-            # Move a key from z to y
-            y.keys.append(x.keys[i])
-            y.n += 1
+    def keys(self):
+        for k, _ in self.iter_range():
+            yield k
 
-            # Move a key from z to x
-            x.keys[i] = z.keys.pop(0)
+    def values(self):
+        for _, v in self.iter_range():
+            yield v
 
-            # Move a child from z to y, if applicable
-            if not y.leaf:
-                y.children.append(z.children.pop(0))
+    def to_dict(self):
+        return {
+            't': self.t,
+            'root': self.root.to_dict()
+        }
 
-            z.n -= 1
-        else:
-            # Move a key from y to x
-            x.keys[i] = y.keys.pop()
+    @classmethod
+    def from_dict(cls, bp_dict: dict):
+        self = cls(bp_dict['t'])
+        self.root = Node.from_dict(bp_dict['root'])
+
+        # Rebuild leaf links and size
+        prev = None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.leaf:
+                if prev is not None:
+                    prev.next = node
+                prev = node
+                self._size += len(node.keys)
+            else:
+                stack.extend(reversed(node.children))
+        return self
 
-            # Move a key from y to z
-            z.keys = y.keys[self.t:] + z.keys
-            if not z.leaf:
-                z.children = y.children[self.t + 1:] + z.children
+    def __contains__(self, k):
+        x = self._find_leaf(k)
+        i = bisect_left(x.keys, k)
+        return i < len(x.keys) and x.keys[i] == k
 
-            # Update y
-            y.keys = y.keys[:self.t]
-            y.children = y.children[:self.t + 1]
-            y.n = self.t
+    def __iter__(self):
+        return self.keys()
 
-            # Update z
-            z.n = self.t
+    def __len__(self):
+        return self._size
 
-    def insert(self, k, v):
-        if self.root.n == 2 * self.t - 1:
-            s = Node(leaf=False)
-            s.children.append(self.root)
-            self.split_child(s, 0)
-            self.insert_non_full(s, k, v)
-            self.root = s
-        else:
-            self.insert_non_full(self.root, k, v)
 
-    def remove(self, k):
-        x = self.root
-        found = False
-
-        while x is not None:
-            i = 0
-            while i < x.n and k > x.keys[i]:
-                i += 1
-
-            if i < x.n and k == x.keys[i]:
-                found = True
-                break
+@dc.dataclass
+class BplusTreeStats:
+    submitted: int = 0  # 已提交的写操作数
+    applied: int = 0  # 已应用的写操作数
+    batches: int = 0  # 已应用的批次数
+    max_batch: int = 0  # 最大批次大小
+    apply_time: float = 0.0  # 应用写操作累计耗时(秒)
+    total_latency: float = 0.0  # 写操作从提交到应用的累计延迟(秒)
+    max_latency: float = 0.0  # 写操作从提交到应用的最大延迟(秒)
 
-            if not x.leaf:
-                x = x.children[i]
-            else:
-                break
+    @property
+    def queue_depth(self):
+        return self.submitted - self.applied
 
-        if not found:
-            return
+    @property
+    def avg_batch(self):
+        return self.applied / self.batches if self.batches else 0.0
 
-        i = 0
-        while i < x.n and k > x.keys[i]:
-            i += 1
-        x.keys.pop(i)
-        x.values.pop(i)
-        x.n -= 1
-
-        if x.n < self.t and x.parent is not None:
-            sibling_index = -1
-            sibling = None
-            if i != 0:
-                sibling_index = i - 1
-                sibling = x.parent.children[sibling_index]
-            elif i < x.n:
-                sibling_index = i
-                sibling = x.parent.children[sibling_index]
-
-            if sibling is not None and sibling.n >= self.t:
-                self.redistribute_key(x.parent, sibling_index)
-            else:
-                if sibling_index != -1:
-                    self.merge_children(x.parent, sibling_index)
-                else:
-                    self.merge_children(x.parent, i)
+    @property
+    def avg_latency(self):
+        return self.total_latency / self.applied if self.applied else 0.0
 
-                if x.parent.n == 0:
-                    self.root = x
-                    del x.parent
 
-    def search(self, k):
-        x = self.root
-        while not x.leaf:
-            i = 0
-            while i < x.n and k > x.keys[i]:
-                i += 1
-            x = x.children[i]  # Continue down the tree until reaching a leaf node
-
-        # Now x is a leaf node, perform the search on this node
-        i = 0
-        while i < x.n and k > x.keys[i]:
-            i += 1
-        if i < x.n and k == x.keys[i]:
-            return SearchResult(result=x.values[i])
-        else:
-            return SearchResult(None, True, "Key not found")  # Key not found
+class BplusTree:
+    """
+    线程安全的 B+ 树
 
+    写操作 (insert/remove) 进入队列, 由后台线程按批次 (每次最多 batch_size 个) 应用;
+    读操作通过读写锁访问树, 只会看到已经应用完成的写操作
+    需要 "读自己的写" 时, 先调用 flush()
+    """
 
-class BplusTree:
-    def __init__(self, bp_tree: Union[BplusTree_t, object, None] = None):
+    def __init__(self, bp_tree: Union[BplusTree_t, object, None] = None, batch_size=256):
         if bp_tree is None:
             bp_tree = BplusTree_t(5)
         self.bp_tree = bp_tree
-        self.queue = queue.Queue()
+        self.batch_size = batch_size
+        self.stats = BplusTreeStats()
+
+        self._pending = deque()  # type: deque[tuple[int, Any, Any, float]]
+        self._errors = deque()
+        self._cond = threading.Condition()
+        self._rwlock = RWLock()
         self.event = threading.Event()
 
         self.thread = threading.Thread(
             target=self._process_loop,
-            args=(self.event,)
+            args=(self.event,),
+            daemon=True
         )
         self.thread.start()
 
+    @property
+    def queue_depth(self):
+        return self.stats.queue_depth
+
+    def _raise_errors(self):
+        if self._errors:
+            raise self._errors.popleft()
+
+    def _wait_applied(self, target, timeout):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.stats.applied >= target, timeout):
+                raise TimeoutError()
+        self._raise_errors()
+
+    def flush(self, timeout=None):
+        """
+        等待调用前提交的所有写操作被应用
+        """
+        self._wait_applied(self.stats.submitted, timeout)
+
     def wait(self, timeout=None):
-        start_time = time.time()
-        while not self.queue.empty():
-            if timeout is not None and time.time() - start_time > timeout:
+        """
+        等待队列被清空
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.stats.applied >= self.stats.submitted, timeout):
                 raise TimeoutError()
-            time.sleep(0.02)
-        return
+        self._raise_errors()
 
     def close(self):
+        """
+        应用剩余的写操作, 然后停止后台线程
+        """
         if self.thread.is_alive():
-            self.event.set()
+            with self._cond:
+                self.event.set()
+                self._cond.notify_all()
             self.thread.join()
 
-    def _process_loop(self, event: threading.Event):
-        while not event.is_set():
+    def _apply(self, batch):
+        tree = self.bp_tree
+        for operate, key, value, _ in batch:
             try:
-                operate = self.queue.get(timeout=0.3)
-                if operate['Operate'] == 'insert':
-                    self.bp_tree.insert(operate['key'], operate['value'])
-
-                if operate['Operate'] == 'remove':
-                    self.bp_tree.remove(operate['key'])
-
-                self.queue.task_done()
-
-            except queue.Empty:
-                pass
-
-    def _submit(self, *args):
-        func = inspect.stack()[1].function
-        submit_mro = {"Operate": func}
-        if func == 'insert':
-            submit_mro['key'] = args[0]
-            submit_mro['value'] = args[1]
-
-        if func == 'remove':
-            submit_mro['key'] = args[0]
+                if operate == _INSERT:
+                    tree.insert(key, value)
+                else:
+                    tree.remove(key)
+            except Exception as e:
+                self._errors.append(e)
 
-        self.queue.put(submit_mro)
+    def _process_loop(self, event: threading.Event):
+        cond, pending, stats = self._cond, self._pending, self.stats
+        while True:
+            with cond:
+                while not pending and not event.is_set():
+                    cond.wait()
+                if not pending:
+                    return
+                batch = [pending.popleft() for _ in range(min(self.batch_size, len(pending)))]
+
+            start = time.perf_counter()
+            with self._rwlock.write():
+                self._apply(batch)
+            end = time.perf_counter()
+
+            with cond:
+                stats.applied += len(batch)
+                stats.batches += 1
+                stats.max_batch = max(stats.max_batch, len(batch))
+                stats.apply_time += end - start
+                for *_, submit_time in batch:
+                    stats.total_latency += end - submit_time
+                stats.max_latency = max(stats.max_latency, end - batch[0][3])
+                cond.notify_all()
+
+    def _submit(self, operate, key, value=None):
+        if self.event.is_set():
+            raise RuntimeError("BplusTree is closed")
+
+        with self._cond:
+            self._pending.append((operate, key, value, time.perf_counter()))
+            self.stats.submitted += 1
+            self._cond.notify_all()
 
     def insert(self, k, v):
-        self._submit(k, v)
+        self._submit(_INSERT, k, v)
 
     def remove(self, k):
-        self._submit(k)
+        self._submit(_REMOVE, k)
+
+    def bulk_load(self, iterable, fill_factor=1.0):
+        self.flush()
+        with self._rwlock.write():
+            self.bp_tree.bulk_load(iterable, fill_factor)
 
     def search(self, k):
-        return self.bp_tree.search(k)
+        with self._rwlock.read():
+            return self.bp_tree.search(k)
+
+    def get(self, k, default=None):
+        with self._rwlock.read():
+            return self.bp_tree.get(k, default)
 
     @property
     def root(self):
         return self.bp_tree.root
 
     def range_query(self, start_key, end_key):
-        results = []
-        self._range_query_recursive(self.root, start_key, end_key, results)
-        return results
-
-    def _range_query_recursive(self, node, start_key, end_key, results):
-        if node is None or (not node.leaf and node.keys and start_key < node.keys[0]):
-            return
-
-        i = 0
-        while i < node.n and node.keys[i] <= end_key:
-            if start_key <= node.keys[i]:
-                results.append((node.keys[i], node.values[i]))
-            i += 1
-
-        # Traverse children if it's an internal node
-        if not node.leaf:
-            for i in range(node.n + 1):
-                self._range_query_recursive(node.children[i], start_key, end_key, results)
+        with self._rwlock.read():
+            return self.bp_tree.range_query(start_key, end_key)
+
+    def iter_range(self, start_key=None, end_key=None):
+        """
+        返回范围内数据的快照迭代器 (不会在迭代期间持有读锁)
+        """
+        return iter(self.range_query(start_key, end_key))
+
+    def __contains__(self, k):
+        with self._rwlock.read():
+            return k in self.bp_tree
+
+    def __len__(self):
+        with self._rwlock.read():
+            return len(self.bp_tree)
@@ -1,7 +1,14 @@
+import heapq
+from array import array
+from collections import deque
+from math import inf
 from typing import Any
 
-from .stack import Stack
-from .vis_structure import Visited
+
+class GraphCycleError(ValueError):
+    def __init__(self, cycles):
+        self.cycles = cycles
+        super().__init__(f"Graph contains cycles: {cycles}")
 
 
 class GraphBase:
@@ -59,72 +66,100 @@ class GraphBase:
             directed graph "graph". Edges are represented as lists
             with two vertices
         """
-        edges = []
-        for vertex in self.graph:
-            for neighbour in self.graph[vertex]:
-                if [vertex, neighbour] not in edges:
-                    edges.append([vertex, neighbour])
-        return edges
-
-    @property
-    def circles(self):
-        sck = Stack()
-        vis = Visited()
-        circle_vis = Visited()
-
-        result = set()
-
-        def func(current):
-            sck.push(current)
-            vis[current] = True
-
-            for child in self.children(current):
-                # print(f"Node {current} -> {child}")
-                # print(sck)
-                if vis[child]:  # 环的出现
-                    # print(f'Find circle {child}')
-                    ls = []
-                    finded = False
-                    for node in sck:
-                        # print(f'Foreach Circle Node: {node}, finded={finded}')
-                        if finded or node == child:
-                            finded = True
-                            circle_vis[node] = True
-                            ls.append(node)
-                    # ls.append(child)
-                    # ls = ls[::-1]
-                    result.add(tuple(ls))
-                else:
-                    func(child)
+        return [[vertex, neighbour] for vertex, children in self.graph.items() for neighbour in children]
 
-            vis[current] = False
-            sck.pop()
+    def iter_edges(self):
+        """ yields the edges as (vertex, neighbour) tuples """
+        for vertex, children in self.graph.items():
+            for neighbour in children:
+                yield vertex, neighbour
 
-        for vertex in self.vertices():
-            if circle_vis[vertex]:
-                continue  # 跳过已经遍历过的节点
-            func(vertex)
+    def dfs(self, start=None):
+        """
+        迭代的深度优先遍历 (前序), 不受递归深度限制
+        :param start: 起点, 为 None 时遍历所有顶点
+        """
+        graph = self.graph
+        visited = set()
+        for root in (self.graph if start is None else (start,)):
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [root]
+            while stack:
+                vertex = stack.pop()
+                yield vertex
+                for child in graph.get(vertex, ()):
+                    if child not in visited:
+                        visited.add(child)
+                        stack.append(child)
+
+    def bfs(self, start):
+        """
+        广度优先遍历, 产出 (顶点, 深度)
+        """
+        graph = self.graph
+        visited = {start}
+        level = [start]
+        depth = 0
+        while level:
+            following = []
+            for vertex in level:
+                yield vertex, depth
+                for child in graph.get(vertex, ()):
+                    if child not in visited:
+                        visited.add(child)
+                        following.append(child)
+            level = following
+            depth += 1
+
+    def reachable(self, start) -> set:
+        """
+        从 start 出发可以到达的顶点 (包括 start)
+        """
+        return set(self.dfs(start))
 
-        # func(1)
+    def freeze(self) -> 'CSRGraph':
+        """
+        生成当前图的只读 CSR 快照, 顶点映射为整数下标
+        图被修改后快照不会同步, 需要重新生成
+        """
+        return CSRGraph.from_graph(self.graph)
 
-        return result
+    def strongly_connected_components(self) -> list[list]:
+        """
+        强连通分量 (Tarjan), 按逆拓扑序排列
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        return [[vertices[i] for i in component] for component in csr.strongly_connected_components()]
 
-    def topological_sorted(self):
-        visited = Visited()
-        stack = Stack()
+    @property
+    def circles(self):
+        """
+        每个包含环的强连通分量给出一个环, 环以顶点元组表示
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        return {tuple(vertices[i] for i in cycle) for cycle in csr.cycles()}
 
-        def dfs(vertex):
-            visited[vertex] = True
-            for neighbour in self.graph.get(vertex, []):
-                if not visited[neighbour]:
-                    dfs(neighbour)
-            stack.push(vertex)
+    def has_cycle(self):
+        return self.freeze().has_cycle()
 
-        for vertex in self.vertices():
-            if not visited[vertex]:
-                dfs(vertex)
+    def topological_sorted(self):
+        """
+        拓扑排序 (Kahn), 图中有环时抛出 GraphCycleError
+        """
+        return [vertex for level in self.topological_levels() for vertex in level]
 
-        return stack[::-1]
+    def topological_levels(self) -> list[list]:
+        """
+        按层分组的拓扑排序: 每一层的顶点只依赖于前面的层, 同一层的顶点可以并行处理
+        图中有环时抛出 GraphCycleError
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        return [[vertices[i] for i in level] for level in csr.topological_levels()]
 
     def __str__(self):
         res = "vertices: "
@@ -161,7 +196,17 @@ class UndirectedGraph(GraphBase):
 
 
 class WeightedGraph(GraphBase):
+    """
+    带权有向图, 最短路径等算法在缓存的整数下标 CSR 快照上运行
+    快照和可达性缓存在 add_vertex / add_weighted_edge / remove_edge 时失效,
+    直接修改 self.graph 后需要调用 invalidate
+    """
+
+    reachability_cache_size = 1024  # 缓存可达集合的起点数量
+
     class GraphItem:
+        __slots__ = ('value', 'weight')
+
         def __init__(self, value, weight):
             self.value, self.weight = value, weight
 
@@ -175,11 +220,18 @@ class WeightedGraph(GraphBase):
     def __init__(self, graph=None):
         super().__init__(graph)
         self.graph: dict[Any, dict[Any, Any]] = {}
+        self._csr = None
+        self._reach = {}
+
+    def invalidate(self):
+        self._csr = None
+        self._reach.clear()
 
     def add_vertex(self, *vertexs):
         for vertex in vertexs:
             if vertex not in self.graph:
                 self.graph[vertex] = {}
+                self.invalidate()
 
     def add_edge(self, vertex1, vertex2):
         """ Adds a weighted edge between vertex1 and vertex2 """
@@ -190,6 +242,12 @@ class WeightedGraph(GraphBase):
         """ Adds a weighted edge between vertex1 and vertex2 """
         self.add_vertex(vertex1, vertex2)
         self.graph[vertex1][vertex2] = self.GraphItem(vertex2, weight)
+        self.invalidate()
+
+    def remove_edge(self, left, right):
+        if self.exists(left) and right in self.graph[left]:
+            del self.graph[left][right]
+            self.invalidate()
 
     def get_weight(self, vertex1, vertex2):
         """ Returns the weight of the edge between vertex1 and vertex2 """
@@ -197,6 +255,78 @@ class WeightedGraph(GraphBase):
             return self.graph[vertex1][vertex2]
         return None
 
+    @staticmethod
+    def _weight(item):
+        return 1.0 if item.weight is None else item.weight
+
+    def freeze(self) -> 'CSRGraph':
+        """
+        带边权的 CSR 快照, 图未修改时重复使用
+        """
+        if self._csr is None:
+            self._csr = CSRGraph.from_graph(self.graph, self._weight)
+        return self._csr
+
+    def is_reachable(self, source, target) -> bool:
+        """
+        target 是否可以从 source 到达, 每个起点的可达集合会被缓存
+        """
+        csr = self.freeze()
+        i = csr.index[source]
+        reach = self._reach.get(i)
+        if reach is None:
+            if len(self._reach) >= self.reachability_cache_size:
+                del self._reach[next(iter(self._reach))]
+            reach = self._reach[i] = csr.reachable(i)
+        return bool(reach[csr.index[target]])
+
+    def shortest_path(self, source, target, heuristic=None, bidirectional=False):
+        """
+        最短路径, 默认使用 Dijkstra
+        :param heuristic: heuristic(vertex, target) 估计剩余距离, 给定时使用 A*
+        :param bidirectional: 使用双向 Dijkstra
+        :return: (距离, 顶点列表), 不可达时为 (inf, [])
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        s, t = csr.index[source], csr.index[target]
+        if heuristic is not None:
+            distance, path = csr.astar(s, t, lambda i: heuristic(vertices[i], target))
+        elif bidirectional:
+            distance, path = csr.bidirectional_dijkstra(s, t)
+        else:
+            dist, parent = csr.dijkstra(s, t)
+            distance = dist[t]
+            path = csr._path(parent, t) if distance != inf else []
+        return distance, [vertices[i] for i in path]
+
+    def shortest_distances(self, source) -> dict:
+        """
+        source 到每个可达顶点的最短距离
+        """
+        csr = self.freeze()
+        dist, _ = csr.dijkstra(csr.index[source])
+        return {vertex: d for vertex, d in zip(csr.vertices, dist) if d != inf}
+
+    def all_pairs_shortest_paths(self) -> dict:
+        """
+        所有可达顶点对之间的最短距离 {起点: {终点: 距离}}, 适用于小图
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        return {
+            vertices[i]: {vertices[j]: d for j, d in enumerate(row) if d != inf}
+            for i, row in enumerate(csr.all_pairs_shortest_paths())
+        }
+
+    def minimum_spanning_tree(self) -> list:
+        """
+        最小生成森林 (边按无向处理), 返回 (顶点, 顶点, 边权) 列表
+        """
+        csr = self.freeze()
+        vertices = csr.vertices
+        return [(vertices[a], vertices[b], w) for a, b, w in csr.minimum_spanning_tree()]
+
     def __str__(self):
         res = "vertices: "
         for k in self.graph:
@@ -206,3 +336,485 @@ class WeightedGraph(GraphBase):
             for neighbour in self.graph[vertex]:
                 res += f"{vertex} -> {neighbour}, weight={self.graph[vertex][neighbour]} "
         return res
+
+
+class CSRGraph:
+    """
+    有向图的只读压缩稀疏行 (CSR) 快照
+
+    顶点 i 的邻居为 targets[offsets[i]:offsets[i + 1]], 所有算法都在整数下标上进行,
+    适合在大图上重复查询. 使用 GraphBase.freeze 或 from_graph / from_edges 创建
+    """
+
+    __slots__ = ('vertices', 'index', 'offsets', 'targets', 'weights', '_reversed', '_non_negative')
+
+    def __init__(self, vertices: list, offsets: array, targets: array, weights: array = None, index: dict = None):
+        """
+        :param weights: 与 targets 对应的边权 (array('d')), 无权图为 None
+        """
+        self.vertices = vertices
+        self.index = {v: i for i, v in enumerate(vertices)} if index is None else index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._reversed = None
+        self._non_negative = None
+
+    @classmethod
+    def from_graph(cls, graph: dict, weight=None):
+        """
+        :param graph: 顶点 -> 邻居集合 (或以邻居为键的字典)
+        :param weight: 给定时 graph 的值必须为字典, 边权为 weight(字典的值)
+        """
+        vertices = list(graph)
+        index = {v: i for i, v in enumerate(vertices)}
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = None if weight is None else array('d')
+        for vertex in vertices:  # 只作为邻居出现的顶点会追加到 vertices 末尾
+            children = graph.get(vertex, ())
+            try:
+                targets.extend([index[child] for child in children])
+            except KeyError:
+                for child in children:
+                    if child not in index:
+                        index[child] = len(vertices)
+                        vertices.append(child)
+                    targets.append(index[child])
+            if weights is not None:
+                weights.extend([weight(value) for value in children.values()])
+            offsets.append(len(targets))
+
+        return cls(vertices, offsets, targets, weights, index)
+
+    @classmethod
+    def from_edges(cls, edges, vertices=()):
+        """
+        从 (起点, 终点) 序列创建, 重复的边会保留
+        """
+        graph = {v: [] for v in vertices}
+        for left, right in edges:
+            graph.setdefault(left, []).append(right)
+            graph.setdefault(right, [])
+        return cls.from_graph(graph)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def neighbours(self, i: int):
+        """
+        顶点下标 i 的邻居下标
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def children(self, vertex):
+        vertices = self.vertices
+        return [vertices[i] for i in self.neighbours(self.index[vertex])]
+
+    def out_degree(self, i: int):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def in_degrees(self) -> list[int]:
+        degrees = [0] * len(self.vertices)
+        for t in self.targets:
+            degrees[t] += 1
+        return degrees
+
+    def reverse(self) -> 'CSRGraph':
+        """
+        所有边反向的快照 (计数排序, O(V + E)), 结果会被缓存
+        """
+        if self._reversed is not None:
+            return self._reversed
+
+        n = len(self.vertices)
+        offsets = array('q', bytes(8 * (n + 1)))
+        for t in self.targets:
+            offsets[t + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        position = offsets[:-1]
+        targets = array('q', bytes(8 * len(self.targets)))
+        old_offsets, old_targets, old_weights = self.offsets, self.targets, self.weights
+        weights = None if old_weights is None else array('d', bytes(8 * len(old_weights)))
+        for source in range(n):
+            for j in range(old_offsets[source], old_offsets[source + 1]):
+                t = old_targets[j]
+                targets[position[t]] = source
+                if weights is not None:
+                    weights[position[t]] = old_weights[j]
+                position[t] += 1
+
+        self._reversed = CSRGraph(self.vertices, offsets, targets, weights, self.index)
+        self._reversed._reversed = self
+        return self._reversed
+
+    def edges(self):
+        vertices, offsets, targets = self.vertices, self.offsets, self.targets
+        for i, vertex in enumerate(vertices):
+            for j in range(offsets[i], offsets[i + 1]):
+                yield vertex, vertices[targets[j]]
+
+    def dfs(self, start: int = None):
+        """
+        迭代的深度优先遍历 (前序), 产出顶点下标
+        """
+        offsets, targets = self.offsets, self.targets
+        visited = bytearray(len(self.vertices))
+        for root in (range(len(self.vertices)) if start is None else (start,)):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            stack = [root]
+            while stack:
+                i = stack.pop()
+                yield i
+                for t in targets[offsets[i]:offsets[i + 1]]:
+                    if not visited[t]:
+                        visited[t] = 1
+                        stack.append(t)
+
+    def bfs(self, start: int):
+        """
+        广度优先遍历, 产出 (顶点下标, 深度)
+        """
+        offsets, targets = self.offsets, self.targets
+        visited = bytearray(len(self.vertices))
+        visited[start] = 1
+        level = [start]
+        depth = 0
+        while level:
+            following = []
+            for i in level:
+                yield i, depth
+                for t in targets[offsets[i]:offsets[i + 1]]:
+                    if not visited[t]:
+                        visited[t] = 1
+                        following.append(t)
+            level = following
+            depth += 1
+
+    def reachable(self, start: int) -> bytearray:
+        """
+        :return: 长度为顶点数的 bytearray, 可到达的顶点为 1
+        """
+        offsets, targets = self.offsets, self.targets
+        visited = bytearray(len(self.vertices))
+        visited[start] = 1
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            for t in targets[offsets[i]:offsets[i + 1]]:
+                if not visited[t]:
+                    visited[t] = 1
+                    stack.append(t)
+        return visited
+
+    def strongly_connected_components(self) -> list[list[int]]:
+        """
+        迭代的 Tarjan 算法, 分量按逆拓扑序排列
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.vertices)
+        order = [-1] * n
+        low = [0] * n
+        on_stack = bytearray(n)
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, offsets[root])]
+
+            while work:
+                v, j = work[-1]
+                end = offsets[v + 1]
+                while j < end:
+                    w = targets[j]
+                    j += 1
+                    if order[w] == -1:
+                        work[-1] = (v, j)
+                        order[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        work.append((w, offsets[w]))
+                        break
+                    if on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[v] < low[parent]:
+                            low[parent] = low[v]
+                    if low[v] == order[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            component.append(w)
+                            if w == v:
+                                break
+                        components.append(component)
+
+        return components
+
+    def _cycle_through(self, start: int, members) -> list[int]:
+        """
+        在 members 内找一个经过 start 的最短环 (BFS)
+        """
+        offsets, targets = self.offsets, self.targets
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for t in targets[offsets[i]:offsets[i + 1]]:
+                if t == start:
+                    cycle = [i]
+                    while parents[cycle[-1]] is not None:
+                        cycle.append(parents[cycle[-1]])
+                    return cycle[::-1]
+                if t in members and t not in parents:
+                    parents[t] = i
+                    queue.append(t)
+        return []
+
+    def cycles(self) -> list[list[int]]:
+        """
+        每个包含环的强连通分量给出一个环 (顶点下标列表, 从分量中最早的顶点开始)
+        """
+        offsets, targets = self.offsets, self.targets
+        result = []
+        for component in self.strongly_connected_components():
+            if len(component) == 1:
+                i = component[0]
+                if i in targets[offsets[i]:offsets[i + 1]]:  # 自环
+                    result.append([i])
+                continue
+            result.append(self._cycle_through(min(component), set(component)))
+        return result
+
+    def has_cycle(self):
+        try:
+            self.topological_levels()
+        except GraphCycleError:
+            return True
+        return False
+
+    def topological_levels(self) -> list[list[int]]:
+        """
+        Kahn 算法, 按层分组, 有环时抛出 GraphCycleError
+        """
+        offsets, targets = self.offsets, self.targets
+        indegree = self.in_degrees()
+        level = [i for i, d in enumerate(indegree) if not d]
+        levels = []
+        seen = 0
+        while level:
+            levels.append(level)
+            seen += len(level)
+            following = []
+            for i in level:
+                for t in targets[offsets[i]:offsets[i + 1]]:
+                    indegree[t] -= 1
+                    if not indegree[t]:
+                        following.append(t)
+            level = following
+
+        if seen != len(self.vertices):
+            vertices = self.vertices
+            raise GraphCycleError([tuple(vertices[i] for i in cycle) for cycle in self.cycles()])
+        return levels
+
+    def topological_sorted(self) -> list[int]:
+        return [i for level in self.topological_levels() for i in level]
+
+    # 带权算法, 边权为 None 时视为 1
+    def _check_weights(self, allow_negative=False):
+        if self.weights is None:
+            raise ValueError("Graph snapshot has no edge weights")
+        if self._non_negative is None:
+            self._non_negative = min(self.weights, default=0) >= 0
+        if not (allow_negative or self._non_negative):
+            raise ValueError("Negative edge weights are not supported")
+        return self.weights
+
+    @staticmethod
+    def _path(parent, target) -> list[int]:
+        path = [target]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        return path[::-1]
+
+    def dijkstra(self, source: int, target: int = -1):
+        """
+        二叉堆 Dijkstra, 给定 target 时到达后提前结束
+        :return: (距离列表, 前驱列表), 不可达的距离为 inf, 没有前驱为 -1
+        """
+        offsets, targets, weights = self.offsets, self.targets, self._check_weights()
+        n = len(self.vertices)
+        dist = [inf] * n
+        parent = [-1] * n
+        done = bytearray(n)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, i = heapq.heappop(heap)
+            if done[i]:
+                continue
+            done[i] = 1
+            if i == target:
+                break
+            for j in range(offsets[i], offsets[i + 1]):
+                t = targets[j]
+                nd = d + weights[j]
+                if nd < dist[t]:
+                    dist[t] = nd
+                    parent[t] = i
+                    heapq.heappush(heap, (nd, t))
+        return dist, parent
+
+    def astar(self, source: int, target: int, heuristic):
+        """
+        A* 搜索
+        :param heuristic: heuristic(i) 估计顶点 i 到 target 的距离, 需要是一致的 (不高估且满足三角不等式)
+        :return: (距离, 路径下标列表), 不可达时为 (inf, [])
+        """
+        offsets, targets, weights = self.offsets, self.targets, self._check_weights()
+        n = len(self.vertices)
+        dist = [inf] * n
+        parent = [-1] * n
+        done = bytearray(n)
+        dist[source] = 0.0
+        heap = [(heuristic(source), 0.0, source)]
+        while heap:
+            _, d, i = heapq.heappop(heap)
+            if done[i]:
+                continue
+            if i == target:
+                return d, self._path(parent, target)
+            done[i] = 1
+            for j in range(offsets[i], offsets[i + 1]):
+                t = targets[j]
+                nd = d + weights[j]
+                if nd < dist[t]:
+                    dist[t] = nd
+                    parent[t] = i
+                    heapq.heappush(heap, (nd + heuristic(t), nd, t))
+        return inf, []
+
+    def bidirectional_dijkstra(self, source: int, target: int):
+        """
+        从两端同时进行 Dijkstra, 两个堆顶之和不小于已知最短距离时结束
+        :return: (距离, 路径下标列表), 不可达时为 (inf, [])
+        """
+        if source == target:
+            return 0.0, [source]
+
+        n = len(self.vertices)
+        sides = []
+        for graph, start in ((self, source), (self.reverse(), target)):
+            dist = [inf] * n
+            dist[start] = 0.0
+            sides.append((graph.offsets, graph.targets, graph._check_weights(), dist, [-1] * n, bytearray(n), [(0.0, start)]))
+
+        best, meet = inf, -1
+        forward, backward = sides
+        while forward[6] and backward[6]:
+            if forward[6][0][0] + backward[6][0][0] >= best:
+                break
+            side, other = (forward, backward) if forward[6][0][0] <= backward[6][0][0] else (backward, forward)
+            offsets, targets, weights, dist, parent, done, heap = side
+            other_dist = other[3]
+
+            d, i = heapq.heappop(heap)
+            if done[i]:
+                continue
+            done[i] = 1
+            for j in range(offsets[i], offsets[i + 1]):
+                t = targets[j]
+                nd = d + weights[j]
+                if nd < dist[t]:
+                    dist[t] = nd
+                    parent[t] = i
+                    heapq.heappush(heap, (nd, t))
+                if nd + other_dist[t] < best:
+                    best, meet = nd + other_dist[t], t
+
+        if meet == -1:
+            return inf, []
+        path = self._path(forward[4], meet)
+        parent = backward[4]
+        i = meet
+        while parent[i] != -1:
+            i = parent[i]
+            path.append(i)
+        return best, path
+
+    def all_pairs_shortest_paths(self) -> list[list[float]]:
+        """
+        所有顶点对之间的最短距离, 适用于小图
+        边权非负时对每个顶点运行 Dijkstra, 否则使用 Floyd-Warshall (有负环时抛出 ValueError)
+        """
+        weights = self._check_weights(allow_negative=True)
+        n = len(self.vertices)
+        if self._non_negative:
+            return [self.dijkstra(i)[0] for i in range(n)]
+
+        offsets, targets = self.offsets, self.targets
+        dist = [[inf] * n for _ in range(n)]
+        for i in range(n):
+            row = dist[i]
+            row[i] = 0.0
+            for j in range(offsets[i], offsets[i + 1]):
+                if weights[j] < row[targets[j]]:
+                    row[targets[j]] = weights[j]
+
+        for k in range(n):
+            row_k = dist[k]
+            for row in dist:
+                d = row[k]
+                if d == inf:
+                    continue
+                for j, w in enumerate(row_k):
+                    if d + w < row[j]:
+                        row[j] = d + w
+
+        if any(dist[i][i] < 0 for i in range(n)):
+            raise ValueError("Graph contains a negative cycle")
+        return dist
+
+    def minimum_spanning_tree(self) -> list[tuple[int, int, float]]:
+        """
+        Kruskal 最小生成森林, 边按无向处理
+        :return: (起点下标, 终点下标, 边权) 列表
+        """
+        offsets, targets, weights = self.offsets, self.targets, self._check_weights(allow_negative=True)
+        sources = [i for i in range(len(self.vertices)) for _ in range(offsets[i], offsets[i + 1])]
+        parent = list(range(len(self.vertices)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        result = []
+        for j in sorted(range(len(targets)), key=weights.__getitem__):
+            a, b = find(sources[j]), find(targets[j])
+            if a != b:
+                parent[a] = b
+                result.append((sources[j], targets[j], weights[j]))
+        return result
@@ -1,53 +1,83 @@
-class Heap:
-    """
-    默认大顶堆
-    """
-    def __init__(self, lst=None, reversed=False):
-        self.heap = lst or []
-        self.iter_reversed = reversed
-
-    def _parent(self, i):
-        return (i - 1) // 2
-
-    def _left_child(self, i):
-        return 2 * i + 1
+import heapq
 
-    def _right_child(self, i):
-        return 2 * i + 2
 
-    def _swap(self, i, j):
-        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+def _sift_up(heap, index, arity):
+    value = heap[index]
+    while index > 0:
+        parent = (index - 1) // arity
+        if not value < heap[parent]:
+            break
+        heap[index] = heap[parent]
+        index = parent
+    heap[index] = value
 
-    def _heapify_down(self, index):
-        left = self._left_child(index)
-        right = self._right_child(index)
-        smallest = index
 
-        if left < len(self.heap) and self.heap[left] < self.heap[smallest]:
-            smallest = left
+def _sift_down(heap, index, arity):
+    size = len(heap)
+    value = heap[index]
+    while True:
+        first = index * arity + 1
+        if first >= size:
+            break
+        best = first
+        for child in range(first + 1, min(first + arity, size)):
+            if heap[child] < heap[best]:
+                best = child
+        if not heap[best] < value:
+            break
+        heap[index] = heap[best]
+        index = best
+    heap[index] = value
 
-        if right < len(self.heap) and self.heap[right] < self.heap[smallest]:
-            smallest = right
 
-        if smallest != index:
-            self._swap(index, smallest)
-            self._heapify_down(smallest)
+class Heap:
+    """
+    小顶堆, 二叉堆 (arity=2) 时直接使用 heapq
+    按值删除为 O(n), 需要按句柄删除或修改优先级时使用 IndexedHeap
+    """
+    def __init__(self, lst=None, reversed=False, arity=2):
+        if arity < 2:
+            raise ValueError("arity must be at least 2")
+        self.heap = lst or []
+        self.iter_reversed = reversed
+        self.arity = arity
+        self._heapify()
 
-    def _heapify_up(self, index):
-        parent = self._parent(index)
-        if index > 0 and self.heap[parent] > self.heap[index]:
-            self._swap(index, parent)
-            self._heapify_up(parent)
+    def _heapify(self):
+        if self.arity == 2:
+            heapq.heapify(self.heap)
+        else:
+            for i in reversed(range((len(self.heap) - 2) // self.arity + 1)):
+                _sift_down(self.heap, i, self.arity)
 
     def insert(self, value):
-        self.heap.append(value)
-        self._heapify_up(len(self.heap) - 1)
+        if self.arity == 2:
+            heapq.heappush(self.heap, value)
+        else:
+            self.heap.append(value)
+            _sift_up(self.heap, len(self.heap) - 1, self.arity)
+
+    def push_many(self, values):
+        """
+        批量插入, 数量较多时追加后整体建堆 (O(n))
+        """
+        values = list(values)
+        if len(values) > len(self.heap):
+            self.heap.extend(values)
+            self._heapify()
+        else:
+            for value in values:
+                self.insert(value)
 
     def remove(self, value):
         index = self.heap.index(value)
-        self._swap(index, len(self.heap) - 1)
-        self.heap.pop()
-        self._heapify_down(index)
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            if index > 0 and last < self.heap[(index - 1) // self.arity]:
+                _sift_up(self.heap, index, self.arity)
+            else:
+                _sift_down(self.heap, index, self.arity)
 
     def append(self, value):
         self.insert(value)
@@ -55,29 +85,48 @@ class Heap:
     def extract_min(self):
         if not self.heap:
             raise IndexError("Heap is empty.")
+        if self.arity == 2:
+            return heapq.heappop(self.heap)
         min_val = self.heap[0]
         last_val = self.heap.pop()
         if self.heap:
             self.heap[0] = last_val
-            self._heapify_down(0)
+            _sift_down(self.heap, 0, self.arity)
         return min_val
 
+    def pop_many(self, count):
+        """
+        弹出最多 count 个最小的元素, 按从小到大排列
+        """
+        count = min(count, len(self.heap))
+        if self.arity == 2:
+            pop, heap = heapq.heappop, self.heap
+            return [pop(heap) for _ in range(count)]
+        return [self.extract_min() for _ in range(count)]
+
     def peek(self):
         if not self.heap:
             raise IndexError("Heap is empty.")
         return self.heap[0]
 
     def copy(self):
-        return self.__class__(self.heap.copy())
+        return self.__class__(self.heap.copy(), self.iter_reversed, self.arity)
 
     def iter(self):
-        copy = self.copy()
-        while copy:
-            yield copy.heap[0]
-            last = copy.heap.pop()
-            if copy:
-                copy.heap[0] = last
-                copy._heapify_down(0)
+        """
+        按从小到大的顺序遍历, 不复制整个堆: 前 k 个元素的代价为 O(k log k)
+        遍历期间不能修改堆
+        """
+        heap, arity = self.heap, self.arity
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            value, index = heapq.heappop(frontier)
+            yield value
+            first = index * arity + 1
+            for child in range(first, min(first + arity, len(heap))):
+                heapq.heappush(frontier, (heap[child], child))
 
     iter_reversed = False
 
@@ -86,3 +135,202 @@ class Heap:
 
     def __len__(self):
         return len(self.heap)
+
+
+class IndexedHeap:
+    """
+    带索引的最小优先队列
+
+    每个键 (句柄) 在堆中的位置记录在字典中, 因此 update_priority / remove 为 O(log n)
+    优先级与键分别存放在两个列表中, arity 为 d 叉堆的分支数
+    """
+
+    __slots__ = ('_priorities', '_keys', '_positions', 'arity')
+
+    def __init__(self, items=None, arity=2):
+        """
+        :param items: (键, 优先级) 序列或 {键: 优先级} 字典
+        """
+        if arity < 2:
+            raise ValueError("arity must be at least 2")
+        self._priorities = []
+        self._keys = []
+        self._positions = {}
+        self.arity = arity
+        if items:
+            self.push_many(items.items() if isinstance(items, dict) else items)
+
+    def _place(self, index, priority, key):
+        self._priorities[index] = priority
+        self._keys[index] = key
+        self._positions[key] = index
+
+    def _sift_up(self, index, stop=0):
+        priorities, keys, positions, arity = self._priorities, self._keys, self._positions, self.arity
+        priority, key = priorities[index], keys[index]
+        while index > stop:
+            parent = (index - 1) // arity
+            if not priority < priorities[parent]:
+                break
+            priorities[index] = priorities[parent]
+            keys[index] = keys[parent]
+            positions[keys[index]] = index
+            index = parent
+        priorities[index] = priority
+        keys[index] = key
+        positions[key] = index
+
+    def _sift_down(self, index):
+        """
+        与 heapq 相同: 先把空位沿较小的子节点移到叶子, 再向上调整, 减少比较次数
+        """
+        priorities, keys, positions, arity = self._priorities, self._keys, self._positions, self.arity
+        size = len(priorities)
+        start = index
+        priority, key = priorities[index], keys[index]
+        first = index * arity + 1
+        while first < size:
+            best = first
+            if arity == 2:
+                if first + 1 < size and priorities[first + 1] < priorities[first]:
+                    best = first + 1
+            else:
+                for child in range(first + 1, min(first + arity, size)):
+                    if priorities[child] < priorities[best]:
+                        best = child
+            priorities[index] = priorities[best]
+            keys[index] = child_key = keys[best]
+            positions[child_key] = index
+            index = best
+            first = index * arity + 1
+        priorities[index] = priority
+        keys[index] = key
+        self._sift_up(index, start)
+
+    def push(self, key, priority):
+        """
+        插入键, 键已存在时修改它的优先级
+        """
+        if key in self._positions:
+            self.update_priority(key, priority)
+            return
+        self._priorities.append(priority)
+        self._keys.append(key)
+        self._positions[key] = len(self._keys) - 1
+        self._sift_up(len(self._keys) - 1)
+
+    def push_many(self, items):
+        """
+        批量插入 (键, 优先级), 数量较多时追加后整体建堆 (O(n))
+        """
+        items = list(items)
+        if len(items) <= len(self._keys):
+            for key, priority in items:
+                self.push(key, priority)
+            return
+
+        positions = self._positions
+        for key, priority in items:
+            index = positions.get(key)
+            if index is None:
+                positions[key] = len(self._keys)
+                self._keys.append(key)
+                self._priorities.append(priority)
+            else:
+                self._priorities[index] = priority
+        for i in reversed(range((len(self._keys) - 2) // self.arity + 1)):
+            self._sift_down(i)
+
+    def update_priority(self, key, priority):
+        index = self._positions[key]
+        old = self._priorities[index]
+        self._priorities[index] = priority
+        if priority < old:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def _remove_at(self, index):
+        priorities, keys = self._priorities, self._keys
+        priority, key = priorities[index], keys[index]
+        del self._positions[key]
+        last_priority, last_key = priorities.pop(), keys.pop()
+        if index < len(keys):
+            self._place(index, last_priority, last_key)
+            if last_priority < priority:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+        return key, priority
+
+    def remove(self, key):
+        """
+        删除键, 返回它的优先级
+        """
+        return self._remove_at(self._positions[key])[1]
+
+    def discard(self, key):
+        if key in self._positions:
+            self._remove_at(self._positions[key])
+
+    def pop(self):
+        """
+        弹出优先级最小的 (键, 优先级)
+        """
+        if not self._keys:
+            raise IndexError("Heap is empty.")
+        return self._remove_at(0)
+
+    def pop_many(self, count):
+        count = min(count, len(self._keys))
+        return [self._remove_at(0) for _ in range(count)]
+
+    def peek(self):
+        if not self._keys:
+            raise IndexError("Heap is empty.")
+        return self._keys[0], self._priorities[0]
+
+    def priority(self, key):
+        return self._priorities[self._positions[key]]
+
+    def get(self, key, default=None):
+        index = self._positions.get(key)
+        return default if index is None else self._priorities[index]
+
+    def clear(self):
+        self._priorities.clear()
+        self._keys.clear()
+        self._positions.clear()
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __getitem__(self, key):
+        return self.priority(key)
+
+    def __setitem__(self, key, priority):
+        self.push(key, priority)
+
+    def __delitem__(self, key):
+        self.remove(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __bool__(self):
+        return bool(self._keys)
+
+    def __iter__(self):
+        """
+        按优先级从小到大遍历 (键, 优先级), 不修改堆
+        """
+        priorities, keys, arity = self._priorities, self._keys, self.arity
+        if not keys:
+            return
+        frontier = [(priorities[0], 0)]
+        while frontier:
+            priority, index = heapq.heappop(frontier)
+            yield keys[index], priority
+            first = index * arity + 1
+            for child in range(first, min(first + arity, len(keys))):
+                heapq.heappush(frontier, (priorities[child], child))
@@ -1,31 +1,31 @@
-from collections import deque
+import heapq
+import struct
+from collections import Counter, deque
+from itertools import count as _counter
 
-from bitarray import bitarray
+from bitarray import bitarray, frozenbitarray
+from bitarray.util import canonical_decode
 
-from ..utils.probability_counter import ProbabilityCounter
+from ..utils.probability_counter import ProbabilityCounter, count_bytes
 
 
 def get_probabilities(data):
     """
     Returns a dictionary of probabilities for each character in the data
     """
-    pc = ProbabilityCounter()
-    for i in data:
-        pc.increment(i, 1)
-    return pc.probabilities()
+    return ProbabilityCounter.from_data(data).probabilities()
 
 
 def get_probabilities_dict(data):
     """
     Returns a dictionary of probabilities for each character in the data
     """
-    pc = ProbabilityCounter()
-    for i in data:
-        pc.increment(i, 1)
-    return pc.proabilities_dict()
+    return ProbabilityCounter.from_data(data).probabilities_dict()
 
 
 class HuffmanNode:
+    __slots__ = ('left', 'right', 'value', 'probability')
+
     def __init__(self):
         self.left = None
         self.right = None
@@ -68,10 +68,234 @@ class HuffmanNode:
     __repr__ = __str__
 
 
+MAX_CODE_LENGTH = 31  # canonical_decode 支持的最大码长
+
+_MAGIC = b'HUF1'
+_BYTES, _STR = 0, 1
+_HEADER = struct.Struct('<4sBI')  # magic, 符号类型, 符号数
+_BITS = struct.Struct('<Q')  # 数据的位数
+
+
+class HuffmanCodec:
+    """
+    范式 Huffman 编解码器
+
+    - 只保存每个符号的码长, 码字按 (码长, 符号) 的顺序分配, 因此表头只需要 (符号, 码长)
+    - 编码结果为一个 bitarray, 解码使用范式码的查找表 (count / symbol)
+    - compress / decompress 处理 bytes 和 str, 结果包含表头, 可以独立解码
+    - compress_stream / decompress_stream 按块处理二进制流, 内存占用与块大小有关
+    """
+
+    def __init__(self, lengths: dict):
+        """
+        :param lengths: 每个符号的码长
+        """
+        try:
+            symbols = sorted(lengths, key=lambda s: (lengths[s], s))
+        except TypeError:  # 符号不可比较时, 保持原有顺序
+            symbols = sorted(lengths, key=lengths.__getitem__)
+
+        max_length = lengths[symbols[-1]] if symbols else 0
+        if max_length > MAX_CODE_LENGTH:
+            raise ValueError(f"Code length {max_length} exceeds {MAX_CODE_LENGTH}")
+
+        self.lengths = dict(lengths)
+        self.symbols = symbols
+        self.count = [0] * (max_length + 1)
+        for s in symbols:
+            self.count[lengths[s]] += 1
+
+        # 分配范式码
+        self.codes = {}
+        code = length = 0
+        for s in symbols:
+            code <<= lengths[s] - length
+            length = lengths[s]
+            self.codes[s] = frozenbitarray(format(code, f'0{length}b'))
+            code += 1
+
+    @staticmethod
+    def code_lengths(frequencies: dict):
+        """
+        使用堆构建 Huffman 树, 计算每个符号的码长
+        码长超过 MAX_CODE_LENGTH 时, 压缩频率的差距后重新计算
+        """
+        frequencies = {s: f for s, f in frequencies.items() if f > 0}
+        if len(frequencies) <= 1:
+            return dict.fromkeys(frequencies, 1)
+
+        while True:
+            tiebreak = _counter()
+            heap = [(f, next(tiebreak), s, None) for s, f in frequencies.items()]
+            heapq.heapify(heap)
+            while len(heap) > 1:
+                a, b = heapq.heappop(heap), heapq.heappop(heap)
+                heapq.heappush(heap, (a[0] + b[0], next(tiebreak), None, (a, b)))
+
+            lengths = {}
+            stack = [(heap[0], 0)]
+            while stack:
+                (_, _, symbol, children), depth = stack.pop()
+                if children is None:
+                    lengths[symbol] = depth
+                else:
+                    stack.append((children[0], depth + 1))
+                    stack.append((children[1], depth + 1))
+
+            if max(lengths.values()) <= MAX_CODE_LENGTH:
+                return lengths
+            frequencies = {s: (f >> 1) | 1 for s, f in frequencies.items()}
+
+    @classmethod
+    def from_frequencies(cls, frequencies: dict):
+        return cls(cls.code_lengths(frequencies))
+
+    @classmethod
+    def from_data(cls, data):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return cls.from_frequencies(count_bytes(data))
+        return cls.from_frequencies(Counter(data))
+
+    def encode(self, data, out: bitarray = None) -> bitarray:
+        """
+        将符号序列编码到一个 bitarray
+        :param out: 追加到已有的 bitarray
+        """
+        if out is None:
+            out = bitarray()
+        if self.codes:
+            out.encode(self.codes, data)
+        elif data:
+            raise ValueError("Symbol is not in the code table")
+        return out
+
+    def decode(self, bits: bitarray):
+        """
+        解码 bitarray, 返回符号的迭代器
+        """
+        if not self.symbols:
+            return iter(())
+        return canonical_decode(bits, self.count, self.symbols)
+
+    # 表头
+    def header(self, kind=None):
+        if kind is None:
+            if all(isinstance(s, int) and 0 <= s < 256 for s in self.symbols):
+                kind = _BYTES
+            elif all(isinstance(s, str) and len(s) == 1 for s in self.symbols):
+                kind = _STR
+            else:
+                raise TypeError("Only bytes and str symbols can be serialized")
+
+        entry = struct.Struct('<BB' if kind == _BYTES else '<IB')
+        parts = [_HEADER.pack(_MAGIC, kind, len(self.symbols))]
+        for s in self.symbols:
+            parts.append(entry.pack(s if kind == _BYTES else ord(s), self.lengths[s]))
+        return b''.join(parts)
+
+    @classmethod
+    def from_header(cls, data, offset=0):
+        """
+        :return: (编解码器, 符号类型, 表头之后的偏移)
+        """
+        magic, kind, n = _HEADER.unpack_from(data, offset)
+        if magic != _MAGIC:
+            raise ValueError("Not huffman compressed data")
+        offset += _HEADER.size
+
+        entry = struct.Struct('<BB' if kind == _BYTES else '<IB')
+        lengths = {}
+        for symbol, length in entry.iter_unpack(data[offset:offset + entry.size * n]):
+            lengths[symbol if kind == _BYTES else chr(symbol)] = length
+        return cls(lengths), kind, offset + entry.size * n
+
+    @staticmethod
+    def _join(kind, symbols):
+        return bytes(symbols) if kind == _BYTES else ''.join(symbols)
+
+    def compress(self, data) -> bytes:
+        """
+        压缩 bytes 或 str, 结果包含表头
+        """
+        bits = self.encode(data)
+        kind = _STR if isinstance(data, str) else _BYTES
+        return b''.join([self.header(kind), _BITS.pack(len(bits)), bits.tobytes()])
+
+    @classmethod
+    def decompress(cls, data):
+        """
+        解压 compress 的结果
+        """
+        codec, kind, offset = cls.from_header(data)
+        nbits, = _BITS.unpack_from(data, offset)
+        offset += _BITS.size
+
+        bits = bitarray()
+        bits.frombytes(data[offset:offset + (nbits + 7) // 8])
+        del bits[nbits:]
+        return cls._join(kind, codec.decode(bits))
+
+    def compress_stream(self, src, dst, chunk_size=1 << 20):
+        """
+        按块压缩二进制流, 每块单独记录位数, 以 0 结束
+        编解码器需要覆盖流中出现的所有字节, 可以使用 from_stream 统计得到
+        """
+        dst.write(self.header(_BYTES))
+        bits = bitarray()
+        while chunk := src.read(chunk_size):
+            bits.clear()
+            bits.encode(self.codes, chunk)
+            dst.write(_BITS.pack(len(bits)))
+            dst.write(bits.tobytes())
+        dst.write(_BITS.pack(0))
+
+    @classmethod
+    def decompress_stream(cls, src, dst):
+        """
+        解压 compress_stream 的结果
+        """
+        head = src.read(_HEADER.size)
+        _, kind, n = _HEADER.unpack(head)
+        entry_size = 2 if kind == _BYTES else 5
+        codec, kind, _ = cls.from_header(head + src.read(entry_size * n))
+
+        bits = bitarray()
+        while True:
+            nbits, = _BITS.unpack(src.read(_BITS.size))
+            if not nbits:
+                break
+            bits.clear()
+            bits.frombytes(src.read((nbits + 7) // 8))
+            del bits[nbits:]
+            dst.write(cls._join(kind, codec.decode(bits)))
+
+    @classmethod
+    def from_stream(cls, stream, chunk_size=1 << 20):
+        """
+        统计可以 seek 的二进制流中的字节频率, 统计后回到原来的位置
+        """
+        start = stream.tell()
+        counter = ProbabilityCounter().count_stream(stream, chunk_size)
+        stream.seek(start)
+        return cls.from_frequencies(counter.count_dict)
+
+
+def huffman_compress(data) -> bytes:
+    """
+    使用根据 data 统计得到的范式 Huffman 码压缩 bytes 或 str
+    """
+    return HuffmanCodec.from_data(data).compress(data)
+
+
+def huffman_decompress(data):
+    return HuffmanCodec.decompress(data)
+
+
 class HuffmanTree:
     def __init__(self):
         self.root = None
-        self.codes = {}
+        self.codes = None
+        self._codec = None
 
     @staticmethod
     def _build_tree_from_list(root, ls):
@@ -82,21 +306,25 @@ class HuffmanTree:
             queue.append(node.init_left())
             queue.append(node.init_right())
 
-    def _walk(self, node, path: bitarray):
-        if not node:
+    def walk(self):
+        """
+        遍历所有叶节点, 产出 (码字, 符号)
+        """
+        if self.root is None:
+            return
+        if self.root.is_leaf():
+            yield frozenbitarray('0'), self.root.value
             return
-        if node.is_leaf():
-            yield path.tobytes(), node.value
-        else:
-            path.append(0)
-            yield from self._walk(node.left, path)
-            path[-1] = 1
-            yield from self._walk(node.right, path)
-            path.pop()
 
-    def walk(self):
-        path = bitarray()
-        return self._walk(self.root, path)
+        stack = [(self.root, bitarray())]
+        while stack:
+            node, path = stack.pop()
+            if node.is_leaf():
+                yield frozenbitarray(path), node.value
+                continue
+            for bit, child in ((1, node.right), (0, node.left)):
+                if child is not None:
+                    stack.append((child, path + bitarray([bit])))
 
     @classmethod
     def from_list(cls, ls):
@@ -105,67 +333,68 @@ class HuffmanTree:
         越靠前的数据，所在树的深度越低
         """
         self = cls()
+        self.root = HuffmanNode()
         self._build_tree_from_list(self.root, ls)
         return self
 
     @classmethod
     def from_data(cls, probabilities: dict):
+        """
+        根据每个符号的概率 (或频率) 构建 Huffman 树
+        """
         self = cls()
-        priority_queue: list[HuffmanNode] = []
+        tiebreak = _counter()
+        heap = []
         for char, probability in probabilities.items():
             node = HuffmanNode()
             node.value = char
             node.probability = probability
-            priority_queue.append(node)
-
-        while len(priority_queue) > 1:
-            priority_queue.sort()
-            node1 = priority_queue.pop(0)
-            node2 = priority_queue.pop(0)
+            heap.append((probability, next(tiebreak), node))
+        heapq.heapify(heap)
 
-            prob1 = node1.probability
-            prob2 = node2.probability
+        while len(heap) > 1:
+            prob1, _, node1 = heapq.heappop(heap)
+            prob2, _, node2 = heapq.heappop(heap)
 
             new_node = HuffmanNode()
             new_node.left = node1
             new_node.right = node2
             new_node.probability = prob1 + prob2
-            priority_queue.append(new_node)
+            heapq.heappush(heap, (new_node.probability, next(tiebreak), new_node))
 
-        root = priority_queue.pop()
-        self.root = root
+        self.root = heap[0][2] if heap else None
         return self
 
     @property
     def huffman_code(self):
+        """
+        码字 -> 符号
+        """
         if self.codes is None:
             self.codes = dict(self.walk())
         return self.codes
 
     @property
     def huffman_codes_dict(self):
-        return dict(map(lambda x: (x[1], x[0]), self.walk()))
+        """
+        符号 -> 码字
+        """
+        return {value: code for code, value in self.walk()}
 
-    def compress(self, data):
-        codes = self.huffman_codes_dict
-        res = b''
-        for char in data:
-            res += codes[char]
+    @property
+    def codec(self):
+        """
+        与这棵树码长相同的范式编解码器
+        """
+        if self._codec is None:
+            self._codec = HuffmanCodec({value: len(code) for code, value in self.walk()})
+        return self._codec
 
-        return res
+    def compress(self, data):
+        return self.codec.compress(data)
 
     def decompress(self, data):
-        res = ''
-        current = self.root
-        ba = bitarray()
-        ba.frombytes(data)
-        for bit in ba:
-            current = current.left if bit == 0 else current.right
-            if current.is_leaf():
-                res += current.value
-                current = self.root
-
-        return res
+        return HuffmanCodec.decompress(data)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,320 @@
+import contextlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from .b_plus_tree import BplusTree_t, Node
+
+_MAGIC = b'HYBPTREE'
+_VERSION = 1
+
+# magic, version, page_size, t, root, page_count, free_head, size
+_HEADER = struct.Struct('<8sIIIQQQQ')
+# kind, payload length, next page of the chain
+_PAGE_HEADER = struct.Struct('<BIQ')
+
+_LEAF, _INTERNAL, _OVERFLOW, _FREE = 1, 2, 3, 4
+
+
+class PagedNode(Node):
+    __slots__ = ('page', 'overflow')
+
+    def __init__(self, leaf=True, page=0):
+        super().__init__(leaf)
+        self.page = page
+        self.overflow = []  # 溢出页
+
+
+class PagedBplusTree(BplusTree_t):
+    """
+    基于页文件的持久化 B+ 树, 接口与 BplusTree_t 相同
+
+    - 文件由固定大小的页组成, 第 0 页为文件头, 每个节点占用一页, 放不下的节点使用溢出页链
+    - 节点按需通过 mmap 从文件读取, 并保存在 LRU 缓存中; 打开文件时只读取文件头
+    - 修改过的节点在被淘汰出缓存或 flush() 时写回文件
+    - 被移除的节点所在的页会加入空闲链表, 供之后分配
+    - 一次操作 (insert/remove/bulk_load) 期间不会淘汰缓存, bulk_load 新建的节点在操作结束前都保留在内存中
+    - 缓存, 文件和 mmap 的访问由内部锁保护, 因此并发的读操作 (例如 BplusTree 的共享读锁下) 是安全的;
+      修改操作仍然需要外部的互斥
+    - 没有日志, 写入过程中崩溃可能损坏文件
+
+    键和值使用 pickle 序列化
+    """
+
+    def __init__(self, path, t=64, page_size=4096, cache_size=1024):
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+
+        self.path = os.fspath(path)
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()  # type: OrderedDict[int, PagedNode]
+        self._dirty = {}  # type: dict[int, PagedNode]
+        self._mmap = None
+        self._depth = 0  # 大于 0 时表示正在进行修改操作, 此时不淘汰缓存
+        self._io_lock = threading.RLock()  # 保护 _cache, _dirty, 文件位置和 _mmap
+
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self._file = open(self.path, 'r+b' if exists else 'w+b', buffering=0)
+
+        if exists:
+            magic, version, page_size, t, root, page_count, free_head, size = _HEADER.unpack(
+                self._file.read(_HEADER.size)
+            )
+            if magic != _MAGIC:
+                self._file.close()
+                raise ValueError(f"'{self.path}' is not a B+ tree page file")
+            if version != _VERSION:
+                self._file.close()
+                raise ValueError(f"Unsupported page file version: {version}")
+
+            self.page_size = page_size
+            self._page_count = page_count
+            self._free_head = free_head
+            self._root_page = root
+
+            self.t = t
+            self._max_keys = 2 * t - 1
+            self._min_keys = t - 1
+            self._size = size
+        else:
+            if page_size < max(_HEADER.size, _PAGE_HEADER.size + 1):
+                self._file.close()
+                raise ValueError("page_size is too small")
+
+            self.page_size = page_size
+            self._page_count = 1  # 第 0 页为文件头
+            self._free_head = 0
+            self._root_page = 0
+
+            super().__init__(t)
+            self.flush()
+
+    @property
+    def root(self):
+        return self._node(self._root_page)
+
+    @root.setter
+    def root(self, node):
+        self._root_page = node.page
+
+    # 页读写
+    def _read(self, page, size):
+        offset = page * self.page_size
+        with self._io_lock:
+            if self._mmap is None or offset + size > len(self._mmap):
+                if self._mmap is not None:
+                    self._mmap.close()
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap[offset:offset + size]
+
+    def _write(self, page, data):
+        data = data.ljust(self.page_size, b'\0')
+        with self._io_lock:
+            self._file.seek(page * self.page_size)
+            self._file.write(data)
+
+    def _write_header(self):
+        self._write(0, _HEADER.pack(
+            _MAGIC, _VERSION, self.page_size, self.t,
+            self._root_page, self._page_count, self._free_head, self._size
+        ))
+
+    def _allocate(self):
+        if self._free_head:
+            page = self._free_head
+            _, _, self._free_head = _PAGE_HEADER.unpack(self._read(page, _PAGE_HEADER.size))
+        else:
+            page = self._page_count
+            self._page_count += 1
+        return page
+
+    def _release(self, page):
+        self._write(page, _PAGE_HEADER.pack(_FREE, 0, self._free_head))
+        self._free_head = page
+
+    def _read_node(self, page):
+        data = self._read(page, self.page_size)
+        kind, length, next_page = _PAGE_HEADER.unpack_from(data)
+        if kind not in (_LEAF, _INTERNAL):
+            raise ValueError(f"Page {page} is not a node page")
+
+        parts = [data[_PAGE_HEADER.size:_PAGE_HEADER.size + length]]
+        node = PagedNode(kind == _LEAF, page)
+        while next_page:
+            node.overflow.append(next_page)
+            data = self._read(next_page, self.page_size)
+            _, length, next_page = _PAGE_HEADER.unpack_from(data)
+            parts.append(data[_PAGE_HEADER.size:_PAGE_HEADER.size + length])
+
+        if node.leaf:
+            node.keys, node.values, node.next = pickle.loads(b''.join(parts))
+            node.next = node.next or None
+        else:
+            node.keys, node.children = pickle.loads(b''.join(parts))
+        return node
+
+    def _write_node(self, node):
+        if node.leaf:
+            payload = pickle.dumps((node.keys, node.values, node.next or 0), pickle.HIGHEST_PROTOCOL)
+        else:
+            payload = pickle.dumps((node.keys, node.children), pickle.HIGHEST_PROTOCOL)
+
+        chunk = self.page_size - _PAGE_HEADER.size
+        pieces = [payload[i:i + chunk] for i in range(0, len(payload), chunk)]
+
+        while len(node.overflow) < len(pieces) - 1:
+            node.overflow.append(self._allocate())
+        while len(node.overflow) > len(pieces) - 1:
+            self._release(node.overflow.pop())
+
+        pages = [node.page] + node.overflow
+        kind = _LEAF if node.leaf else _INTERNAL
+        for i, piece in enumerate(pieces):
+            next_page = pages[i + 1] if i + 1 < len(pages) else 0
+            self._write(pages[i], _PAGE_HEADER.pack(kind if i == 0 else _OVERFLOW, len(piece), next_page) + piece)
+
+    # 缓存
+    def _trim(self):
+        cache, dirty = self._cache, self._dirty
+        with self._io_lock:
+            while len(cache) > self.cache_size:
+                page, node = cache.popitem(last=False)
+                if dirty.pop(page, None) is not None:
+                    self._write_node(node)
+
+    @contextlib.contextmanager
+    def _operation(self):
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self._trim()
+
+    # BplusTree_t 的节点访问钩子
+    def _node(self, ref):
+        if not ref:
+            return None
+
+        with self._io_lock:
+            node = self._cache.get(ref)
+            if node is None:
+                node = self._read_node(ref)
+                self._cache[ref] = node
+                if not self._depth:
+                    self._trim()
+            else:
+                self._cache.move_to_end(ref)
+            return node
+
+    def _ref(self, node):
+        return node.page
+
+    def _new_node(self, leaf=True):
+        node = PagedNode(leaf, self._allocate())
+        self._cache[node.page] = node
+        self._dirty[node.page] = node
+        return node
+
+    def _touch(self, node):
+        self._dirty[node.page] = node
+
+    def _free(self, node):
+        self._cache.pop(node.page, None)
+        self._dirty.pop(node.page, None)
+        for page in node.overflow:
+            self._release(page)
+        self._release(node.page)
+
+    def _find_leaf(self, k, path=None):
+        node = self._node
+        x = self.root
+        while not x.leaf:
+            i = bisect_right(x.keys, k)
+            if path is not None:
+                path.append((x, i))
+            x = node(x.children[i])
+        return x
+
+    def _first_leaf(self):
+        x = self.root
+        while not x.leaf:
+            x = self._node(x.children[0])
+        return x
+
+    def _free_tree(self, root_page):
+        """
+        深度优先遍历以 root_page 为根的子树并释放所有页, 只保存待访问的页号, 不把节点放入缓存
+        """
+        stack = [root_page]
+        while stack:
+            page = stack.pop()
+            node = self._cache.get(page)
+            if node is None:  # 缓存中的节点可能比文件中的新
+                node = self._read_node(page)
+            if not node.leaf:
+                stack.extend(node.children)
+            self._free(node)
+
+    # 修改操作
+    def insert(self, k, v):
+        with self._operation():
+            super().insert(k, v)
+
+    def remove(self, k):
+        with self._operation():
+            super().remove(k)
+
+    def bulk_load(self, iterable, fill_factor=1.0):
+        with self._operation():
+            old_root = self._root_page
+            super().bulk_load(iterable, fill_factor)  # 与已有数据合并时会读取旧树, 构建完成后再释放
+            self._free_tree(old_root)
+        return self
+
+    def to_dict(self):
+        raise NotImplementedError("PagedBplusTree can't be converted to a dict")
+
+    @classmethod
+    def from_dict(cls, bp_dict: dict):
+        raise NotImplementedError("PagedBplusTree can't be created from a dict")
+
+    def flush(self, sync=False):
+        """
+        将所有修改过的节点和文件头写回文件
+        :param sync: 是否调用 os.fsync 确保数据落盘
+        """
+        with self._io_lock:
+            for node in list(self._dirty.values()):
+                self._write_node(node)
+            self._dirty.clear()
+            self._write_header()
+
+            if sync:
+                os.fsync(self._file.fileno())
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def close(self):
+        with self._io_lock:
+            if self._file.closed:
+                return
+            self.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,7 +1,14 @@
 import collections.abc
 import enum
 import hashlib
+import os
+import sqlite3
+import threading
+import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils.object_pool.buffer_pool import buffer_pool
 
 
 class Hash(enum.Enum):
@@ -25,7 +32,7 @@ class Hash(enum.Enum):
     md5 = 'md5'
 
     def new_object(self, data: collections.abc.Buffer = b'', used_for_security=True):
-        return hashlib.new(self.value(), data, usedforsecurity=used_for_security)
+        return hashlib.new(self.value, data, usedforsecurity=used_for_security)
 
     def is_variable_length(self):
         return self in [Hash.shake_128, Hash.shake_256]
@@ -41,16 +48,27 @@ class Hash(enum.Enum):
     def compute_from_stream(self, stream: typing.IO[bytes], chunk_size=65536, use_hashlib_method=False):
         if use_hashlib_method:
             return hashlib.file_digest(
-                stream, self.value(), _bufsize=chunk_size
+                stream, self.value, _bufsize=chunk_size
             )
 
         # Custom Method
         obj = self.new_object()
-        while True:
-            chunk = stream.read(chunk_size)
-            if not chunk:
-                break
-            obj.update(chunk)
+        readinto = getattr(stream, 'readinto', None)
+        if readinto is None:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                obj.update(chunk)
+            return obj
+
+        # 读入复用的缓冲区, 避免每块都分配新的 bytes
+        with buffer_pool.borrow(chunk_size) as buffer:
+            while True:
+                n = readinto(buffer)
+                if not n:
+                    break
+                obj.update(buffer[:n])
         return obj
 
     def compute_from_file(self, file_path: str, chunk_size=65536):
@@ -68,3 +86,304 @@ class Hash(enum.Enum):
         async for chunk in aiterable:
             obj.update(chunk)
         return obj
+
+
+def _hash_objects(algorithms: typing.Iterable[Hash]):
+    return {Hash(algorithm): Hash(algorithm).new_object() for algorithm in algorithms}
+
+
+def hash_stream(stream: typing.BinaryIO, algorithms: typing.Iterable[Hash] = (Hash.sha256,), chunk_size=1 << 18):
+    """
+    读取一次数据, 同时计算多个哈希
+    :param stream: 二进制流, 支持 readinto 时使用复用的缓冲区读取
+    :param algorithms: 哈希算法
+    :param chunk_size: 每次读取的大小
+    :return: dict[Hash, 哈希对象]
+    """
+    objs = _hash_objects(algorithms)
+    updates = [obj.update for obj in objs.values()]
+
+    readinto = getattr(stream, 'readinto', None)
+    if readinto is None:
+        while chunk := stream.read(chunk_size):
+            for update in updates:
+                update(chunk)
+        return objs
+
+    with buffer_pool.borrow(chunk_size) as buffer:
+        while n := readinto(buffer):
+            chunk = buffer[:n] if n < chunk_size else buffer
+            for update in updates:
+                update(chunk)
+    return objs
+
+
+def hash_file(path, algorithms: typing.Iterable[Hash] = (Hash.sha256,), chunk_size=1 << 18):
+    """
+    读取一次文件, 同时计算多个哈希
+    :return: dict[Hash, 哈希对象]
+    """
+    with open(path, 'rb', buffering=0) as stream:
+        return hash_stream(stream, algorithms, chunk_size)
+
+
+def hash_many(paths: typing.Iterable, algorithms: typing.Iterable[Hash] = (Hash.sha256,),
+              workers: int = None, chunk_size=1 << 18, return_exceptions=False):
+    """
+    使用线程池并行计算多个文件的哈希, 每个文件只读取一次 (hashlib 计算时会释放 GIL)
+    :param paths: 文件路径
+    :param algorithms: 哈希算法
+    :param workers: 线程数, 默认为 CPU 核心数
+    :param chunk_size: 每次读取的大小
+    :param return_exceptions: 为 True 时, 读取失败的文件结果为异常对象, 否则直接抛出异常
+    :return: dict[路径, dict[Hash, 哈希对象]], 顺序与 paths 相同
+    """
+    paths = list(paths)
+    algorithms = [Hash(algorithm) for algorithm in algorithms]
+
+    def task(path):
+        try:
+            return hash_file(path, algorithms, chunk_size)
+        except OSError as e:
+            if return_exceptions:
+                return e
+            raise
+
+    if workers == 1 or len(paths) <= 1:
+        return {path: task(path) for path in paths}
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        return dict(zip(paths, executor.map(task, paths)))
+
+
+def _hash_chunk(path, offset, size, algorithm: Hash):
+    obj = algorithm.new_object(b'\x00')
+    with open(path, 'rb', buffering=0) as f, buffer_pool.borrow(size) as buffer:
+        f.seek(offset)
+        while n := f.readinto(buffer):
+            obj.update(buffer[:n])
+            size -= n
+            if not size:
+                break
+            buffer = buffer[n:]
+    return obj
+
+
+def tree_hash(path, algorithm: Hash = Hash.sha256, chunk_size=1 << 22, workers: int = None):
+    """
+    Merkle 树哈希: 将文件按 chunk_size 切分, 并行计算每块的哈希, 再两两合并
+    叶节点为 H(0x00 || 数据块), 内部节点为 H(0x01 || 左 || 右), 落单的节点直接进入上一层
+
+    结果与 chunk_size 有关, 与 compute_from_file 的结果不同
+    :return: 根节点的哈希对象
+    """
+    algorithm = Hash(algorithm)
+    if algorithm.is_variable_length():
+        raise ValueError(f"{algorithm.name} is not supported by tree_hash")
+
+    offsets = range(0, os.path.getsize(path), chunk_size) or [0]
+
+    if workers == 1 or len(offsets) == 1:
+        level = [_hash_chunk(path, offset, chunk_size, algorithm) for offset in offsets]
+    else:
+        with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+            level = list(executor.map(
+                lambda offset: _hash_chunk(path, offset, chunk_size, algorithm), offsets
+            ))
+
+    while len(level) > 1:
+        parents = [
+            algorithm.new_object(b'\x01' + level[i].digest() + level[i + 1].digest())
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+
+    return level[0]
+
+
+class DigestCache:
+    """
+    持久化的文件哈希缓存 (sqlite)
+
+    以 (路径, 大小, 修改时间, inode) 作为文件签名, 签名不变时直接返回保存的哈希, 否则重新计算
+    修改时间与计算时间过于接近 (racy_ns 以内) 的文件不会写入缓存, 避免同一时间戳内的修改被忽略
+    """
+
+    def __init__(self, db_path, algorithm: Hash = Hash.sha256, racy_ns=2_000_000_000):
+        """
+        :param db_path: 数据库文件路径, 为目录时在其中创建 digests.sqlite
+        :param algorithm: 哈希算法
+        :param racy_ns: 修改时间距今小于该值(纳秒)的文件不写入缓存
+        """
+        db_path = os.fspath(db_path)
+        if os.path.isdir(db_path):
+            db_path = os.path.join(db_path, 'digests.sqlite')
+
+        self.algorithm = Hash(algorithm)
+        if self.algorithm.is_variable_length():
+            raise ValueError(f"{self.algorithm.name} is not supported by DigestCache")
+
+        self.db_path = db_path
+        self.racy_ns = racy_ns
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS digests ('
+            'path TEXT, algorithm TEXT, size INTEGER, mtime INTEGER, inode INTEGER, digest BLOB, '
+            'PRIMARY KEY (path, algorithm))'
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _signature(st: os.stat_result):
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    _LOOKUP_CHUNK = 500  # 每次查询的路径数, 低于旧版 sqlite 999 个参数的限制
+
+    def _lookup(self, paths):
+        stored = {}
+        with self._lock:
+            for i in range(0, len(paths), self._LOOKUP_CHUNK):
+                chunk = paths[i:i + self._LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    'SELECT path, size, mtime, inode, digest FROM digests '
+                    f'WHERE algorithm = ? AND path IN ({", ".join("?" * len(chunk))})',
+                    (self.algorithm.value, *chunk)
+                )
+                for path, size, mtime, inode, digest in rows:
+                    stored[path] = ((size, mtime, inode), digest)
+        return stored
+
+    def _store(self, entries):
+        deadline = time.time_ns() - self.racy_ns
+        rows = [
+            (path, self.algorithm.value, *signature, digest)
+            for path, signature, digest in entries
+            if signature[1] < deadline
+        ]
+        if rows:
+            with self._lock, self._db:
+                self._db.executemany('INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def digests(self, paths: typing.Iterable, stats: typing.Iterable[os.stat_result] = None, workers: int = None):
+        """
+        获取多个文件的哈希, 只重新计算签名变化的文件 (并行计算)
+        :param paths: 文件路径
+        :param stats: 与 paths 对应的 stat 结果, 不提供时调用 os.stat
+        :param workers: 计算哈希的线程数
+        :return: dict[绝对路径, 哈希值 (bytes)]
+        """
+        paths = [os.path.abspath(os.fspath(path)) for path in paths]
+        stats = list(stats) if stats is not None else [os.stat(path) for path in paths]
+        stored = self._lookup(paths) if paths else {}
+
+        result = {}
+        changed = {}
+        for path, st in zip(paths, stats):
+            signature = self._signature(st)
+            entry = stored.get(path)
+            if entry is not None and entry[0] == signature:
+                result[path] = entry[1]
+            else:
+                result[path] = None
+                changed[path] = signature
+
+        self.hits += len(paths) - len(changed)
+        self.misses += len(changed)
+
+        if changed:
+            computed = hash_many(changed, [self.algorithm], workers)
+            entries = []
+            for path, signature in changed.items():
+                result[path] = digest = computed[path][self.algorithm].digest()
+                entries.append((path, signature, digest))
+            self._store(entries)
+
+        return result
+
+    def digest(self, path):
+        """
+        获取文件的哈希, 文件未变化时直接返回缓存的结果
+        :return: bytes
+        """
+        return next(iter(self.digests([path]).values()))
+
+    @staticmethod
+    def scan(directory, recursive=True):
+        """
+        使用 os.scandir 遍历目录
+        :return: (路径列表, stat 结果列表)
+        """
+        paths, stats = [], []
+        stack = [os.fspath(directory)]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_file():
+                        paths.append(entry.path)
+                        stats.append(entry.stat())
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        return paths, stats
+
+    def digest_directory(self, directory, recursive=True, workers: int = None):
+        """
+        一次遍历目录, 获取其中所有文件的哈希
+        :return: dict[绝对路径, 哈希值 (bytes)]
+        """
+        return self.digests(*self.scan(os.path.abspath(directory), recursive), workers=workers)
+
+    def changed(self, directory, recursive=True):
+        """
+        一次遍历目录, 找出签名与缓存不同 (新增或修改) 的文件, 不计算哈希
+        :return: 绝对路径列表
+        """
+        paths, stats = self.scan(os.path.abspath(directory), recursive)
+        stored = self._lookup(paths) if paths else {}
+        return [
+            path for path, st in zip(paths, stats)
+            if (entry := stored.get(path)) is None or entry[0] != self._signature(st)
+        ]
+
+    def forget(self, paths: typing.Iterable = None):
+        """
+        删除缓存的记录
+        :param paths: 需要删除的路径, 为 None 时删除所有不存在的文件的记录
+        :return: 删除的记录数
+        """
+        if paths is None:
+            with self._lock:
+                stored = [path for path, in self._db.execute(
+                    'SELECT path FROM digests WHERE algorithm = ?', (self.algorithm.value,)
+                )]
+            paths = [path for path in stored if not os.path.exists(path)]
+        rows = [(os.path.abspath(os.fspath(path)), self.algorithm.value) for path in paths]
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM digests WHERE path = ? AND algorithm = ?', rows)
+        return len(rows)
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM digests WHERE algorithm = ?', (self.algorithm.value,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM digests WHERE algorithm = ?', (self.algorithm.value,)
+            ).fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
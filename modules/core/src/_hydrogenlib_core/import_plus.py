@@ -70,3 +70,33 @@ def import_package(path):
     name = os.path.basename(path)
     path = os.path.dirname(path)
     return load_package(name, path)
+
+
+def lazy_exports(namespace: dict, exports: dict[str, tuple[str, ...]]):
+    """
+    PEP 562 惰性导出, 名称在第一次访问时才导入所在的模块, 之后缓存在 namespace 中
+
+    用法::
+
+        __all__ = [name for names in _EXPORTS.values() for name in names]
+        __getattr__, __dir__ = lazy_exports(globals(), _EXPORTS)
+
+    :param namespace: 模块的 globals()
+    :param exports: 模块名 -> 导出的名称
+    :return: (__getattr__, __dir__)
+    """
+    table = {name: module for module, names in exports.items() for name in names}
+    module_name = namespace['__name__']
+
+    def __getattr__(name):
+        module = table.get(name)
+        if module is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(namespace.keys() | table.keys())
+
+    return __getattr__, __dir__
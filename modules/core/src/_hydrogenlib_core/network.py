@@ -14,7 +14,7 @@ class IPAddress:
             except:
                 return IPv6Address(value)
         else:
-            return super().__new__(cls, value)
+            return super().__new__(cls)  # 地址由 ipaddress 的 __init__ 解析
 
     def ping(self, timout=3):
         return ping3.ping(self, timeout=timout)
@@ -3,6 +3,7 @@ from io import BytesIO
 from typing import Union
 
 from .data_structures import Stack
+from .utils.object_pool.buffer_pool import iter_chunks
 
 
 class FileStatus:
@@ -242,6 +243,23 @@ class NeoIO:
         else:
             raise IOError("文件无法读取")
 
+    def readinto(self, buffer):
+        """
+        读取数据到缓冲区, 返回读取的字节数
+        """
+        if self.can_read:
+            return self.__topfile.readinto(buffer)
+        else:
+            raise IOError("文件无法读取")
+
+    def iter_chunks(self, chunk_size=65536):
+        """
+        使用复用的缓冲区按块读取数据, 产出的 memoryview 只在下一次迭代前有效
+        """
+        if not self.can_read:
+            raise IOError("文件无法读取")
+        return iter_chunks(self.__topfile, chunk_size)
+
     def readline(self, size=-1):
         """
         读取一行
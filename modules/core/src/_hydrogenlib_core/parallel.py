@@ -0,0 +1,185 @@
+import math
+import os
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED as _FIRST_COMPLETED, ProcessPoolExecutor as _ProcessPoolExecutor, \
+    wait as _wait
+from multiprocessing import resource_tracker, shared_memory
+
+
+class _SharedResult:
+    """
+    放入共享内存的结果, 进程之间只传递共享内存的名称
+    """
+    __slots__ = ('name', 'size', 'kind', 'typecode')
+
+    def __init__(self, name, size, kind, typecode=None):
+        self.name = name
+        self.size = size
+        self.kind = kind
+        self.typecode = typecode
+
+    def __reduce__(self):
+        return _SharedResult, (self.name, self.size, self.kind, self.typecode)
+
+    def load(self):
+        """
+        复制出结果并释放共享内存
+        """
+        shm = shared_memory.SharedMemory(self.name)
+        try:
+            with shm.buf[:self.size] as view:
+                if self.kind is array:
+                    result = array(self.typecode)
+                    result.frombytes(view)
+                else:
+                    result = self.kind(view)
+        finally:
+            shm.close()
+            shm.unlink()
+        return result
+
+
+def _to_shared(result, threshold):
+    kind = type(result)
+    if kind not in (bytes, bytearray, array):
+        return result
+    with memoryview(result).cast('B') as view:
+        if view.nbytes < threshold:
+            return result
+        shm = shared_memory.SharedMemory(create=True, size=max(view.nbytes, 1))
+        resource_tracker.unregister(shm._name, 'shared_memory')  # 由主进程在 load 时释放
+        try:
+            shm.buf[:view.nbytes] = view
+        finally:
+            shm.close()
+        return _SharedResult(shm.name, view.nbytes, kind, getattr(result, 'typecode', None))
+
+
+def _release(results):
+    for result in results:
+        if type(result) is _SharedResult:
+            result.load()
+
+
+def _run_chunk(func, offset, items, star, threshold):
+    """
+    在工作进程中执行一块, 返回 (结果, 耗时)
+    """
+    start = time.perf_counter()
+    results = []
+    for index, item in enumerate(items, offset):
+        try:
+            result = func(*item) if star else func(item)
+        except BaseException as e:
+            _release(results)
+            e.add_note(f"raised by item {index} of parallel_map")
+            raise
+        results.append(result if threshold is None else _to_shared(result, threshold))
+    return results, time.perf_counter() - start
+
+
+def _parallel(func, iterable, star, processes, chunksize, pool, threshold, target_chunk_time):
+    items = iterable if isinstance(iterable, (list, tuple)) else list(iterable)
+    if not items:
+        return []
+    if pool is None:
+        processes = min(processes or os.cpu_count() or 1, len(items))
+        if processes == 1:
+            return _run_chunk(func, 0, items, star, None)[0]
+        with _ProcessPoolExecutor(processes) as pool:
+            return _schedule(pool, processes, func, items, star, chunksize, threshold, target_chunk_time)
+    return _schedule(pool, pool._max_workers, func, items, star, chunksize, threshold, target_chunk_time)
+
+
+def _schedule(pool, processes, func, items, star, chunksize, threshold, target_chunk_time):
+    """
+    同时保持 processes * 2 块在执行, 每块完成后根据测得的单个元素耗时调整下一块的大小,
+    使每块的执行时间接近 target_chunk_time; 块大小不超过剩余元素的 1 / (processes * 2), 使结尾负载均衡
+    """
+    total = len(items)
+    results = [None] * total
+    running = {}  # future -> (offset, count)
+    position = 0
+    per_item = None  # 单个元素耗时的滑动平均
+    error = None  # (offset, 异常), 保留位置最靠前的异常
+
+    def next_size():
+        if chunksize:
+            return chunksize
+        cap = math.ceil((total - position) / (processes * 2))
+        if per_item is None:
+            size = total // (processes * 32)
+        else:
+            size = int(target_chunk_time / per_item) if per_item > 0 else cap
+        return max(1, min(size, cap))
+
+    try:
+        while True:
+            while error is None and position < total and len(running) < processes * 2:
+                count = next_size()
+                future = pool.submit(_run_chunk, func, position, items[position:position + count], star, threshold)
+                running[future] = (position, count)
+                position += count
+            if not running:
+                break
+
+            done, _ = _wait(running, return_when=_FIRST_COMPLETED)
+            for future in done:
+                offset, count = running.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    chunk, elapsed = future.result()
+                except BaseException as e:
+                    if error is None or offset < error[0]:
+                        error = (offset, e)
+                    continue
+                if error is not None and offset > error[0]:
+                    _release(chunk)
+                    continue
+                if threshold is not None:
+                    chunk = [r.load() if type(r) is _SharedResult else r for r in chunk]
+                results[offset:offset + count] = chunk
+                sample = elapsed / count
+                per_item = sample if per_item is None else (per_item + sample) / 2
+
+            if error is not None:
+                # 只需要等待位置更靠前的块, 它们可能抛出更靠前的异常
+                for future, (offset, _) in running.items():
+                    if offset > error[0]:
+                        future.cancel()
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
+
+    if error is not None:
+        raise error[1]
+    return results
+
+
+def parallel_map(func, iterable, *, processes=None, chunksize=None, pool=None,
+                 shared_memory_threshold=None, target_chunk_time=0.05) -> list:
+    """
+    在进程池中对每个元素调用 func, 按输入的顺序返回结果, 用于受 GIL 限制的 CPU 密集任务
+
+    func 和元素需要可以被 pickle (func 应定义在模块顶层)
+    有多个元素抛出异常时抛出位置最靠前的那个, 异常带有元素位置的注释; 此时之后的块被取消
+
+    :param processes: 进程数, 默认为 CPU 数; 为 1 时直接在当前进程中执行
+    :param chunksize: 每块的元素数, 默认按测得的耗时自适应
+    :param pool: 使用已有的 ProcessPoolExecutor, 避免每次调用都启动进程
+    :param shared_memory_threshold: 不为 None 时, 不小于此字节数的 bytes / bytearray / array 结果
+        通过 multiprocessing.shared_memory 返回, 不经过 pickle 和管道; 共享内存本身有创建和映射的开销, 结果在数 MB 以上时才划算
+    :param target_chunk_time: 自适应时每块的目标执行时间 (秒)
+    """
+    return _parallel(func, iterable, False, processes, chunksize, pool, shared_memory_threshold, target_chunk_time)
+
+
+def parallel_starmap(func, iterable, *, processes=None, chunksize=None, pool=None,
+                     shared_memory_threshold=None, target_chunk_time=0.05) -> list:
+    """
+    与 parallel_map 相同, 但每个元素是参数元组, 调用 func(*item)
+    """
+    return _parallel(func, iterable, True, processes, chunksize, pool, shared_memory_threshold, target_chunk_time)
@@ -1,3 +1,4 @@
 from .methods import *
-from .sync import SyncResource, SyncResourceContextManager
+from .pool import *
+from .sync import SyncResource, SyncResourceContextManager, RWLock
 from .thread import Thread, ThreadWorker, FuncWorker
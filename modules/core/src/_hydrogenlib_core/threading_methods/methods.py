@@ -1,5 +1,7 @@
 import threading as threading
-from queue import Queue
+from concurrent.futures import Future as _Future
+
+from .pool import default_pool
 
 
 def thread(function, args=(), kwargs={}):
@@ -28,44 +30,25 @@ def exit_thread(thread: threading.Thread):
 
 
 def run_with_timeout(func, timeout, *args, **kwargs):
-    queue = Queue()
-
-    def target():
-        try:
-            res = func(*args, **kwargs)
-            queue.put((res, None))
-        except Exception as e:
-            queue.put((None, e))
-
-    thread = run_new_thread(target)
-    thread.join(timeout)
-
-    result, error = queue.get()
-    if error is not None:
-        raise error
-
-    return result
-
-
-def run_in_thread(func, *args, **kwargs):
-    queue = Queue()
-
-    def target():
-        try:
-            res = func(*args, **kwargs)
-        except Exception as e:
-            res = e
-
-        queue.put(res)
+    """
+    在共享线程池中执行 func, 最多等待 timeout 秒, 超时抛出 TimeoutError
+    超时的调用还未开始时被取消, 否则它的结果被丢弃
+    """
+    return default_pool().run_with_timeout(func, timeout, *args, **kwargs)
 
-    return queue, run_new_thread(target)
 
+def run_in_thread(func, *args, **kwargs) -> _Future:
+    """
+    在共享线程池中执行 func, 返回 Future
+    """
+    return default_pool().submit(func, *args, **kwargs)
 
-def run_in_thread_with_timeout(func, timeout, *args, **kwargs):
-    def wrap():
-        return run_with_timeout(func, timeout, *args, **kwargs)
 
-    return run_in_thread(wrap)
+def run_in_thread_with_timeout(func, timeout, *args, **kwargs) -> _Future:
+    """
+    在共享线程池中执行 func, 返回的 Future 在 timeout 秒后以 TimeoutError 结束
+    """
+    return default_pool().submit_with_timeout(func, timeout, *args, **kwargs)
 
 
 def get_tid():
@@ -0,0 +1,316 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future as _Future, InvalidStateError as _InvalidStateError, \
+    ThreadPoolExecutor as _ThreadPoolExecutor
+from queue import SimpleQueue as _SimpleQueue
+
+__all__ = ['LatencyStats', 'BoundedExecutor', 'default_pool', 'set_default_pool']
+
+
+class LatencyStats:
+    """
+    线程池调用的统计, 保留最近 window 次调用的排队时间与执行时间 (秒)
+    """
+
+    def __init__(self, window=1024):
+        self._lock = threading.Lock()
+        self._waits = collections.deque(maxlen=window)
+        self._runs = collections.deque(maxlen=window)
+        self.completed = self.failed = self.cancelled = self.timed_out = 0
+        self.max_run = 0.0
+
+    def record(self, wait, run, failed):
+        with self._lock:
+            self._waits.append(wait)
+            self._runs.append(run)
+            self.completed += 1
+            if failed:
+                self.failed += 1
+            if run > self.max_run:
+                self.max_run = run
+
+    def count_cancelled(self):
+        with self._lock:
+            self.cancelled += 1
+
+    def count_timed_out(self):
+        with self._lock:
+            self.timed_out += 1
+
+    def percentile(self, q, queued=False) -> float:
+        """
+        最近调用的执行时间 (queued=True 时为排队时间) 的 q 分位数, 0 <= q <= 100
+        """
+        with self._lock:
+            samples = sorted(self._waits if queued else self._runs)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits, runs = list(self._waits), sorted(self._runs)
+            result = {
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'timed_out': self.timed_out,
+                'max_run': self.max_run,
+            }
+        result['mean_wait'] = sum(waits) / len(waits) if waits else 0.0
+        result['mean_run'] = sum(runs) / len(runs) if runs else 0.0
+        for q in (50, 95, 99):
+            result[f'p{q}_run'] = runs[min(len(runs) - 1, len(runs) * q // 100)] if runs else 0.0
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            self._runs.clear()
+            self.completed = self.failed = self.cancelled = self.timed_out = 0
+            self.max_run = 0.0
+
+
+class _Deadlines:
+    """
+    所有带超时的调用共用一个计时线程, 按截止时间的最小堆依次执行回调
+
+    条目为 [截止时间, 序号, 回调], cancel 时把回调置为 None 以释放它引用的对象;
+    已取消的条目超过堆的一半时重建堆
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._cancelled = 0
+
+    def call_later(self, delay, callback):
+        entry = [time.monotonic() + delay, next(self._counter), callback]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='hydrogenlib-deadlines')
+                self._thread.start()
+            if self._heap[0] is entry:
+                self._cond.notify()
+        return entry
+
+    def cancel(self, entry):
+        with self._cond:
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._cancelled += 1
+            if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+                self._heap[:] = [e for e in self._heap if e[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def _run(self):
+        heap, cond = self._heap, self._cond
+        while True:
+            with cond:
+                while True:
+                    if not heap:
+                        cond.wait()
+                        continue
+                    delay = heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        entry = heapq.heappop(heap)
+                        callback = entry[2]
+                        if callback is None:
+                            self._cancelled -= 1
+                            continue
+                        entry[2] = None
+                        break
+                    cond.wait(delay)
+            callback()
+
+
+_deadlines = _Deadlines()
+
+
+class BoundedExecutor(_ThreadPoolExecutor):
+    """
+    有界线程池
+
+    - 线程数最多为 max_workers, 空闲线程会被复用
+    - max_pending > 0 时, 未完成 (排队或执行中) 的任务数达到上限后 submit 阻塞, 对提交方形成背压;
+      不要在池中的任务里向同一个池提交任务, 否则可能死锁
+    - stats 记录每次调用的排队时间与执行时间
+    """
+
+    def __init__(self, max_workers=None, max_pending=0, thread_name_prefix='hydrogenlib-worker', latency_window=1024):
+        """
+        :param max_workers: 最大线程数, 默认与 ThreadPoolExecutor 相同
+        :param max_pending: 未完成任务数的上限, 0 表示不限制
+        :param latency_window: 统计保留的最近调用数
+        """
+        super().__init__(max_workers, thread_name_prefix)
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self.stats = LatencyStats(latency_window)
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def _call(self, submitted, fn, args, kwargs):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self.stats.record(start - submitted, time.perf_counter() - start, failed)
+
+    def _done(self, future):
+        if self._slots is not None:
+            self._slots.release()
+        if future.cancelled():
+            self.stats.count_cancelled()
+
+    def submit(self, fn, /, *args, **kwargs) -> _Future:
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            future = super().submit(self._call, time.perf_counter(), fn, args, kwargs)
+        except BaseException:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run_with_timeout(self, fn, timeout, *args, **kwargs):
+        """
+        执行并等待 fn, 最多等待 timeout 秒, 超时抛出 TimeoutError
+        超时的调用还未开始时被取消, 否则它的结果被丢弃 (线程无法被强制停止)
+        """
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if future.done():  # fn 自身抛出的 TimeoutError
+                raise
+            future.cancel()
+            self.stats.count_timed_out()
+            raise TimeoutError(f"{getattr(fn, '__name__', fn)!s} did not finish in {timeout}s") from None
+
+    def submit_with_timeout(self, fn, timeout, *args, **kwargs) -> _Future:
+        """
+        与 submit 相同, 但返回的 Future 在 timeout 秒后以 TimeoutError 结束, 此时调用还未开始则被取消
+        取消返回的 Future 也会取消调用
+        """
+        inner = self.submit(fn, *args, **kwargs)
+        outer = _Future()
+
+        def settle(f):
+            try:
+                if f.cancelled():
+                    outer.cancel()
+                elif f.exception() is not None:
+                    outer.set_exception(f.exception())
+                else:
+                    outer.set_result(f.result())
+            except _InvalidStateError:  # 已经超时或被取消
+                pass
+
+        def expire():
+            if outer.done():
+                return
+            try:
+                outer.set_exception(TimeoutError(f"{getattr(fn, '__name__', fn)!s} did not finish in {timeout}s"))
+            except _InvalidStateError:
+                return
+            self.stats.count_timed_out()
+            inner.cancel()
+
+        def finished(f):
+            _deadlines.cancel(entry)
+            if f.cancelled():
+                inner.cancel()
+
+        entry = _deadlines.call_later(timeout, expire)
+        inner.add_done_callback(settle)
+        outer.add_done_callback(finished)
+        return outer
+
+    def _in_flight(self, max_in_flight):
+        return max_in_flight or self._max_workers * 2
+
+    def map_unordered(self, fn, *iterables, max_in_flight=None):
+        """
+        按完成的顺序产生 fn 的结果
+        同时最多有 max_in_flight (默认为线程数的两倍) 个未完成的调用, 输入按需读取; 调用抛出的异常在产生对应结果时抛出,
+        生成器关闭时取消还未开始的调用
+        """
+        max_in_flight = self._in_flight(max_in_flight)
+        finished = _SimpleQueue()
+        pending = set()
+        try:
+            for args in zip(*iterables):
+                future = self.submit(fn, *args)
+                pending.add(future)
+                future.add_done_callback(finished.put)
+                if len(pending) >= max_in_flight:
+                    future = finished.get()
+                    pending.discard(future)
+                    yield future.result()
+            while pending:
+                future = finished.get()
+                pending.discard(future)
+                yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def imap(self, fn, *iterables, max_in_flight=None):
+        """
+        与 map_unordered 相同, 但按输入的顺序产生结果
+        """
+        max_in_flight = self._in_flight(max_in_flight)
+        pending = collections.deque()
+        try:
+            for args in zip(*iterables):
+                pending.append(self.submit(fn, *args))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> BoundedExecutor:
+    """
+    run_in_thread 等函数共用的线程池, 第一次使用时创建
+    """
+    global _default_pool
+    if _default_pool is None:
+        with _default_lock:
+            if _default_pool is None:
+                _default_pool = BoundedExecutor(thread_name_prefix='hydrogenlib')
+    return _default_pool
+
+
+def set_default_pool(pool: BoundedExecutor, shutdown=True):
+    """
+    替换共用的线程池, shutdown 为真时等待旧线程池中的任务完成后关闭它
+    """
+    global _default_pool
+    with _default_lock:
+        old, _default_pool = _default_pool, pool
+    if shutdown and old is not None:
+        old.shutdown()
@@ -1,3 +1,6 @@
+import contextlib
+import threading
+
 from _hydrogenlib_core.utils import InstanceMapping
 
 
@@ -32,3 +35,59 @@ class SyncResource:
             self._data[inst] = SyncResourceContextManager(self._lock)
 
         return self._data[inst]
+
+
+class RWLock:
+    """
+    读写锁 (写优先)
+
+    允许多个读者同时持有, 写者独占; 有写者等待时新的读者会被阻塞, 避免写者饥饿
+    注意: 不可重入
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
@@ -1,93 +1,280 @@
 import asyncio
 import contextlib
+from collections import deque
 
 
 # 使用 asyncio 的功能尽可能复现 trio 的功能
 
+_MISSING = object()
+
 
 class Cancelled(BaseException): ...
 
 
 class Nursery:
-    def __init__(self):
+    """
+    任务组: 任意一个任务失败时取消其他任务, wait 抛出第一个异常
+    不是由任务组 (cancel 或其他任务失败) 取消的任务也算作失败, wait 抛出 CancelledError
+    max_concurrency 不为 None 时同时运行的任务数不超过它, 多出的任务在信号量上等待
+    """
+
+    def __init__(self, max_concurrency=None):
         self.tasks = set()  # type: set[asyncio.Task]
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._errors = []
+        self._cancelling = False  # 任务组已经请求取消所有任务
+        self._idle = None  # 所有任务完成时设置结果的 Future
+
+    async def _limited(self, coro):
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            coro.close()  # 还未开始就被取消
+            raise
+        try:
+            return await coro
+        finally:
+            self._semaphore.release()
 
-    async def _wrapper(self, coro):
-        await coro
-        task = asyncio.current_task()
-        if task is not None:
-            self.tasks.remove(task)
+    def _done(self, task):
+        self.tasks.discard(task)
+        if task.cancelled():
+            if not self._cancelling:
+                self._errors.append(asyncio.CancelledError(f"task {task.get_name()} was cancelled"))
+                self._cancel_tasks()
+        elif task.exception() is not None:
+            self._errors.append(task.exception())
+            self._cancel_tasks()
+        if not self.tasks and self._idle is not None and not self._idle.done():
+            self._idle.set_result(None)
 
-    async def start_soon(self, coro):
-        task = asyncio.create_task(self._wrapper(coro))
+    def _cancel_tasks(self):
+        self._cancelling = True
+        for task in self.tasks:
+            task.cancel()
+
+    def start_soon(self, coro, name=None) -> asyncio.Task:
+        """
+        启动任务, 不需要 await
+        """
+        if self._semaphore is not None:
+            coro = self._limited(coro)
+        task = asyncio.get_running_loop().create_task(coro, name=name)
         self.tasks.add(task)
+        task.add_done_callback(self._done)
         return task
 
     async def cancel(self):
-        for task in self.tasks:
-            if not task.done():
-                task.cancel()
-
+        self._cancel_tasks()
         await asyncio.gather(*self.tasks, return_exceptions=True)
 
     async def wait(self):
-        await asyncio.gather(*self.tasks)
+        """
+        等待所有任务 (包括等待期间启动的任务) 完成; 自身被取消时取消所有任务
+        """
+        try:
+            while self.tasks:
+                self._idle = asyncio.get_running_loop().create_future()
+                await self._idle
+        except asyncio.CancelledError:
+            await self.cancel()
+            raise
+        if self._errors:
+            raise self._errors[0]
 
     def __await__(self):
         return self.wait().__await__()
 
 
 @contextlib.asynccontextmanager
-async def create_nursery():
-    nursery = Nursery()
+async def create_nursery(max_concurrency=None):
+    nursery = Nursery(max_concurrency)
     try:
         yield nursery
         await nursery
-    except Exception as e:
+    except BaseException:
         await nursery.cancel()
-        raise e
+        raise
 
 
 class CancelScope:
-    def __init__(self, timeout=None):
+    """
+    取消作用域: 到达 deadline (事件循环时间) 或 timeout 秒后, 取消作用域中的代码和 spawn 启动的任务,
+    作用域退出时吞掉由此引起的 CancelledError, cancelled_caught() 返回 True
+    截止时间由 loop.call_at 注册的回调处理, 不为每个作用域创建计时任务
+    """
+
+    def __init__(self, timeout=None, deadline=None):
         self.timeout = timeout
-        self.tasks = []
+        self.deadline = deadline
+        self.tasks = set()
         self._cancelled = False
+        self._cancel_called = False
+        self._host = None  # 执行作用域中代码的任务
+        self._handle = None
 
     def _clean(self, task):
-        self.tasks.remove(task)
+        self.tasks.discard(task)
 
     async def __aenter__(self):
-        if self.timeout:
-            self._timeout_task = asyncio.create_task(self._timeout_handler())
+        loop = asyncio.get_running_loop()
+        self._host = asyncio.current_task()
+        if self.deadline is None and self.timeout is not None:
+            self.deadline = loop.time() + self.timeout
+        if self.deadline is not None:
+            self._handle = loop.call_at(self.deadline, self._cancel)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if hasattr(self, '_timeout_task'):
-            self._timeout_task.cancel()
+        if self._handle is not None:
+            self._handle.cancel()
+        host, self._host = self._host, None
+        if not self._cancel_called:
+            return None
 
-        if exc_type == asyncio.CancelledError:
+        remaining = host.uncancel() if host is not None else 0
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if exc_type is asyncio.CancelledError and remaining == 0:
+            self._cancelled = True
             return True
         return None
 
-    async def _timeout_handler(self):
-        await asyncio.sleep(self.timeout)
-        await self.cancel()
+    def _cancel(self):
+        if self._cancel_called:
+            return
+        self._cancel_called = True
+        for task in self.tasks:
+            task.cancel()
+        if self._host is not None:
+            self._host.cancel()
+
+    def reschedule(self, deadline):
+        """
+        修改截止时间 (事件循环时间), None 表示取消截止时间
+        """
+        self.deadline = deadline
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if deadline is not None and self._host is not None:
+            self._handle = asyncio.get_running_loop().call_at(deadline, self._cancel)
 
     async def cancel(self):
-        for t in self.tasks:
-            if not t.done():
-                t.cancel()
-
+        """
+        取消作用域, 在作用域中调用时作用域中的代码在这里被取消
+        """
+        self._cancel()
         await asyncio.gather(*self.tasks, return_exceptions=True)
+        await asyncio.sleep(0)
 
     def spawn(self, coro):
         task = asyncio.create_task(coro)
-        self.tasks.append(task)
+        self.tasks.add(task)
         task.add_done_callback(self._clean)
+        if self._cancel_called:
+            task.cancel()
         return task
 
+    @property
+    def cancel_called(self):
+        return self._cancel_called
+
     def cancelled_caught(self):
         return self._cancelled
 
 
+def _close(aw):
+    if asyncio.iscoroutine(aw):
+        aw.close()
+
+
+async def gather_bounded(aws, limit, *, return_exceptions=False) -> list:
+    """
+    与 asyncio.gather 相同, 但同时最多运行 limit 个
+    由 limit 个工作任务依次取出并直接 await 协程, 不为每个协程创建任务;
+    return_exceptions 为假时, 任意一个失败会取消正在运行的协程并抛出异常, 还未开始的协程被关闭
+    limit 小于 1 时关闭所有协程并抛出 ValueError
+    """
+    aws = list(aws)
+    if limit < 1:
+        for aw in aws:
+            _close(aw)
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    results = [None] * len(aws)
+    iterator = iter(enumerate(aws))
+
+    async def worker():
+        for index, aw in iterator:
+            try:
+                results[index] = await aw
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+
+    try:
+        async with create_nursery() as nursery:
+            for _ in range(min(limit, len(aws))):
+                nursery.start_soon(worker())
+    finally:
+        for _, aw in iterator:
+            _close(aw)
+    return results
+
+
+async def as_completed_bounded(aws, limit, *, return_exceptions=False):
+    """
+    按完成的顺序产生结果, 同时最多运行 limit 个
+    aws 按需读取, 可以是生成器; 生成器被关闭或出现异常时取消正在运行的任务, 并关闭 aws 中还未读取的协程
+    (aws 是生成器时调用它的 close, 不再读取); limit 小于 1 时抛出 ValueError
+    """
+    loop = asyncio.get_running_loop()
+    finished = deque()
+    waiter = None
+    pending = set()
+
+    def on_done(task):
+        finished.append(task)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def result(task):
+        pending.discard(task)
+        try:
+            return task.result()
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    iterator = iter(aws)
+    try:
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < limit:
+                aw = next(iterator, _MISSING)
+                if aw is _MISSING:
+                    exhausted = True
+                    break
+                task = asyncio.ensure_future(aw)
+                pending.add(task)
+                task.add_done_callback(on_done)
+            if not finished:
+                if not pending:
+                    return
+                waiter = loop.create_future()
+                await waiter
+            yield result(finished.popleft())
+    finally:
+        for task in pending:
+            task.cancel()
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+        else:
+            for aw in iterator:
+                _close(aw)
@@ -1,6 +1,12 @@
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import groupby
 from typing import Iterable, Union, Optional
 
 from bitarray import bitarray
+from bitarray.util import zeros, count_n
 
 
 class Bitmap:
@@ -42,9 +48,27 @@ class Bitmap:
         :param on: 如果为 True，则将位设置为 1；否则设置为 0。
         """
         if index >= len(self.bits):
-            self.bits.extend([False] * (index - len(self.bits) + 1))
+            self.bits.extend(zeros(index - len(self.bits) + 1, self.bits.endian))
         self.bits[index] = on
 
+    def cardinality(self) -> int:
+        """
+        返回值为 1 的位的数量。
+        """
+        return self.bits.count()
+
+    def indices(self):
+        """
+        返回一个迭代器，依次产出值为 1 的位的索引。
+        """
+        return self.bits.search(1)
+
+    def to_compressed(self) -> 'CompressedBitmap':
+        """
+        转换为压缩位图。
+        """
+        return CompressedBitmap.from_indices(self.indices())
+
     def pack(self) -> bytes:
         """
         将位图打包为字节序列。
@@ -116,3 +140,567 @@ class Bitmap:
         return f"{self.__class__.__module__}.{self.__class__.__name__}({self.bits.to01()})"
 
     __repr__ = __str__
+
+
+# 压缩位图: 按高 16 位分块, 每块 (65536 位) 使用一种容器保存低 16 位
+_ARRAY, _BITMAP, _RUN = 0, 1, 2
+_ARRAY_MAX = 4096  # 超过该数量时数组容器转换为位图容器
+_CHUNK = 1 << 16
+
+_MAGIC = b'RBM1'
+_HEADER = struct.Struct('<4sI')  # magic, 容器数
+_DESCRIPTOR = struct.Struct('<HBxI')  # 高 16 位, 容器类型, 元素数 (数组) / 基数 (位图) / 区间数 (区间)
+_LITTLE = sys.byteorder == 'little'
+
+
+def _from_bits(bits: bitarray, cardinality=None):
+    """
+    根据基数选择数组或位图容器, 空容器返回 None
+    """
+    if cardinality is None:
+        cardinality = bits.count()
+    if not cardinality:
+        return None
+    if cardinality <= _ARRAY_MAX:
+        return _ArrayContainer(array('H', bits.search(1)))
+    return _BitmapContainer(bits, cardinality)
+
+
+def _from_sorted(values: array):
+    if len(values) <= _ARRAY_MAX:
+        return _ArrayContainer(values) if values else None
+    bits = zeros(_CHUNK, 'little')
+    bits[values] = 1
+    return _BitmapContainer(bits, len(values))
+
+
+class _ArrayContainer:
+    __slots__ = ('values',)
+    kind = _ARRAY
+
+    def __init__(self, values):
+        self.values = values  # 有序的 array('H'), 或反序列化得到的只读 memoryview
+
+    @property
+    def cardinality(self):
+        return len(self.values)
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    def _owned(self):
+        if not isinstance(self.values, array):
+            self.values = array('H', self.values)
+        return self.values
+
+    def __contains__(self, low):
+        values = self.values
+        i = bisect_left(values, low)
+        return i < len(values) and values[i] == low
+
+    def add(self, low):
+        values = self.values
+        i = bisect_left(values, low)
+        if i < len(values) and values[i] == low:
+            return self
+        if len(values) >= _ARRAY_MAX:
+            bits = self.to_bits()
+            bits[low] = 1
+            return _BitmapContainer(bits, len(values) + 1)
+        self._owned().insert(i, low)
+        return self
+
+    def discard(self, low):
+        values = self.values
+        i = bisect_left(values, low)
+        if i < len(values) and values[i] == low:
+            del self._owned()[i]
+        return self if self.values else None
+
+    def to_bits(self):
+        bits = zeros(_CHUNK, 'little')
+        bits[self.values] = 1
+        return bits
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def last(self):
+        return self.values[-1]
+
+    def rank(self, low):
+        return bisect_right(self.values, low)
+
+    def select(self, k):
+        return self.values[k]
+
+    def copy(self):
+        return _ArrayContainer(array('H', self.values) if isinstance(self.values, array) else self.values)
+
+    def payload(self):
+        values = array('H', self.values)
+        if not _LITTLE:
+            values.byteswap()
+        return values.tobytes()
+
+
+class _BitmapContainer:
+    __slots__ = ('bits', 'cardinality')
+    kind = _BITMAP
+
+    def __init__(self, bits: bitarray, cardinality):
+        self.bits = bits  # 65536 位, 反序列化得到的位图为只读
+        self.cardinality = cardinality
+
+    @property
+    def count(self):
+        return self.cardinality
+
+    def __contains__(self, low):
+        return self.bits[low]
+
+    def add(self, low):
+        if not self.bits[low]:
+            if self.bits.readonly:
+                self.bits = bitarray(self.bits)
+            self.bits[low] = 1
+            self.cardinality += 1
+        return self
+
+    def discard(self, low):
+        if self.bits[low]:
+            if self.bits.readonly:
+                self.bits = bitarray(self.bits)
+            self.bits[low] = 0
+            self.cardinality -= 1
+            if self.cardinality <= _ARRAY_MAX:
+                return _from_bits(self.bits, self.cardinality)
+        return self
+
+    def to_bits(self):
+        return self.bits
+
+    def __iter__(self):
+        return self.bits.search(1)
+
+    def last(self):
+        return self.bits.find(1, right=True)
+
+    def rank(self, low):
+        return self.bits.count(1, 0, low + 1)
+
+    def select(self, k):
+        return count_n(self.bits, k + 1) - 1
+
+    def copy(self):
+        return _BitmapContainer(self.bits if self.bits.readonly else bitarray(self.bits), self.cardinality)
+
+    def payload(self):
+        return self.bits.tobytes()
+
+
+class _RunContainer:
+    __slots__ = ('starts', 'ends', 'cardinality')
+    kind = _RUN
+
+    def __init__(self, starts, ends, cardinality=None):
+        self.starts = starts  # 每个区间的起点
+        self.ends = ends  # 每个区间的终点 (包含)
+        if cardinality is None:
+            cardinality = sum(ends) - sum(starts) + len(starts)
+        self.cardinality = cardinality
+
+    @property
+    def count(self):
+        return len(self.starts)
+
+    def __contains__(self, low):
+        i = bisect_right(self.starts, low) - 1
+        return i >= 0 and low <= self.ends[i]
+
+    def add(self, low):
+        if low in self:
+            return self
+        return _from_bits(self.to_bits(), self.cardinality).add(low)  # 修改时转换为数组或位图容器
+
+    def discard(self, low):
+        if low not in self:
+            return self
+        return _from_bits(self.to_bits(), self.cardinality).discard(low)
+
+    def to_bits(self):
+        bits = zeros(_CHUNK, 'little')
+        for start, end in zip(self.starts, self.ends):
+            bits[start:end + 1] = 1
+        return bits
+
+    def __iter__(self):
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end + 1)
+
+    def last(self):
+        return self.ends[-1]
+
+    def rank(self, low):
+        result = 0
+        for start, end in zip(self.starts, self.ends):
+            if start > low:
+                break
+            result += min(end, low) - start + 1
+        return result
+
+    def select(self, k):
+        for start, end in zip(self.starts, self.ends):
+            if k <= end - start:
+                return start + k
+            k -= end - start + 1
+        raise IndexError(k)
+
+    def copy(self):
+        return _RunContainer(self.starts, self.ends, self.cardinality)  # 区间容器不会被原地修改
+
+    def payload(self):
+        values = array('H', self.starts) + array('H', self.ends)
+        if not _LITTLE:
+            values.byteswap()
+        return values.tobytes()
+
+
+def _runs(bits: bitarray):
+    starts = bits & ~(bits >> 1)
+    ends = bits & ~(bits << 1)
+    return array('H', starts.search(1)), array('H', ends.search(1))
+
+
+def _and(a, b):
+    if a.kind == _ARRAY and b.kind == _ARRAY:
+        return _from_sorted(array('H', sorted(set(a.values).intersection(b.values))))
+    if a.kind == _ARRAY or b.kind == _ARRAY:
+        small, large = (a, b) if a.kind == _ARRAY else (b, a)
+        return _from_sorted(array('H', [v for v in small.values if v in large]))
+    return _from_bits(a.to_bits() & b.to_bits())
+
+
+def _or(a, b):
+    if a.kind == _ARRAY and b.kind == _ARRAY and len(a.values) + len(b.values) <= _ARRAY_MAX:
+        return _ArrayContainer(array('H', sorted(set(a.values).union(b.values))))
+    return _from_bits(a.to_bits() | b.to_bits())
+
+
+def _xor(a, b):
+    if a.kind == _ARRAY and b.kind == _ARRAY:
+        return _from_sorted(array('H', sorted(set(a.values).symmetric_difference(b.values))))
+    return _from_bits(a.to_bits() ^ b.to_bits())
+
+
+def _andnot(a, b):
+    if a.kind == _ARRAY:
+        return _from_sorted(array('H', [v for v in a.values if v not in b]))
+    return _from_bits(a.to_bits() & ~b.to_bits())
+
+
+class CompressedBitmap:
+    """
+    压缩位图 (Roaring Bitmap), 接口与 Bitmap 相同, 适合稀疏或成段分布的大范围索引
+
+    按索引的高 16 位分块, 每块根据内容使用一种容器:
+        - 数组容器: 不超过 4096 个元素时, 保存有序的低 16 位
+        - 位图容器: 超过 4096 个元素时, 保存 65536 位的 bitarray
+        - 区间容器: 由 run_optimize() 对成段的数据生成, 保存区间的起点和终点
+
+    与 Bitmap 的区别:
+        - len() 为最大的 1 的索引 + 1, 设置为 0 的位不会增加长度
+        - 迭代时仍然产出每一位, 稀疏的位图应当使用 indices()
+    """
+
+    def __init__(self, bits: Optional[Union[int, Iterable[int]]] = None):
+        """
+        :param bits: 与 Bitmap 相同, 可以是整数、可迭代的位序列或 None。
+        """
+        self.keys = []  # type: list[int]
+        self.containers = []
+        self._cumulative = None  # 前缀基数, 用于 rank/select
+
+        if bits is None:
+            return
+        if isinstance(bits, int):
+            bits = bitarray(format(bits, 'b'))
+        elif not isinstance(bits, Iterable):
+            raise TypeError("bits must be an int, an iterable of bits, or None")
+        self.update(i for i, bit in enumerate(bits) if bit)
+
+    @classmethod
+    def from_indices(cls, indices: Iterable[int]) -> 'CompressedBitmap':
+        """
+        从值为 1 的位的索引创建压缩位图。
+        """
+        self = cls()
+        self.update(indices)
+        return self
+
+    def _find(self, high):
+        i = bisect_left(self.keys, high)
+        return i, i < len(self.keys) and self.keys[i] == high
+
+    def _put(self, i, found, high, container):
+        if container is None:
+            if found:
+                del self.keys[i], self.containers[i]
+        elif found:
+            self.containers[i] = container
+        else:
+            self.keys.insert(i, high)
+            self.containers.insert(i, container)
+
+    def add(self, index: int):
+        if index < 0:
+            raise IndexError("Bitmap index must not be negative")
+        high, low = index >> 16, index & 0xFFFF
+        i, found = self._find(high)
+        if found:
+            self.containers[i] = self.containers[i].add(low)
+        else:
+            self._put(i, False, high, _ArrayContainer(array('H', [low])))
+        self._cumulative = None
+
+    def discard(self, index: int):
+        high, low = index >> 16, index & 0xFFFF
+        i, found = self._find(high)
+        if found:
+            self._put(i, True, high, self.containers[i].discard(low))
+            self._cumulative = None
+
+    def update(self, indices: Iterable[int]):
+        """
+        批量设置多个位, 按块构建容器后再与已有的容器合并
+        """
+        for high, group in groupby(sorted(set(indices)), key=lambda x: x >> 16):
+            if high < 0:
+                raise IndexError("Bitmap index must not be negative")
+            container = _from_sorted(array('H', [x & 0xFFFF for x in group]))
+            i, found = self._find(high)
+            self._put(i, found, high, _or(self.containers[i], container) if found else container)
+        self._cumulative = None
+
+    def get_bit(self, index: int) -> bool:
+        """
+        获取指定索引的位值。
+        """
+        i, found = self._find(index >> 16)
+        return found and (index & 0xFFFF) in self.containers[i]
+
+    def set_bit(self, index: int, on: bool = True):
+        """
+        设置指定索引的位值。
+        """
+        if on:
+            self.add(index)
+        else:
+            self.discard(index)
+
+    def cardinality(self) -> int:
+        """
+        返回值为 1 的位的数量。
+        """
+        return sum(c.cardinality for c in self.containers)
+
+    def indices(self):
+        """
+        返回一个迭代器，依次产出值为 1 的位的索引。
+        """
+        for high, container in zip(self.keys, self.containers):
+            base = high << 16
+            for low in container:
+                yield base | low
+
+    def rank(self, index: int) -> int:
+        """
+        返回索引不大于 index 的 1 的数量。
+        """
+        cumulative = self._prefix()
+        i = bisect_right(self.keys, index >> 16)
+        if not i:
+            return 0
+        before = cumulative[i - 2] if i > 1 else 0
+        if self.keys[i - 1] == index >> 16:
+            return before + self.containers[i - 1].rank(index & 0xFFFF)
+        return cumulative[i - 1]
+
+    def select(self, k: int) -> int:
+        """
+        返回第 k 个 (从 0 开始) 1 的索引。
+        """
+        cumulative = self._prefix()
+        if not 0 <= k < (cumulative[-1] if cumulative else 0):
+            raise IndexError("select index out of range")
+        i = bisect_right(cumulative, k)
+        before = cumulative[i - 1] if i else 0
+        return self.keys[i] << 16 | self.containers[i].select(k - before)
+
+    def _prefix(self):
+        if self._cumulative is None:
+            total, self._cumulative = 0, []
+            for container in self.containers:
+                total += container.cardinality
+                self._cumulative.append(total)
+        return self._cumulative
+
+    def run_optimize(self):
+        """
+        将成段分布的块转换为区间容器 (如果占用空间更小)
+        """
+        for i, container in enumerate(self.containers):
+            if container.kind == _RUN:
+                continue
+            bits = container.to_bits()
+            starts, ends = _runs(bits)
+            size = 2 * container.cardinality if container.kind == _ARRAY else _CHUNK // 8
+            if 4 * len(starts) < size:
+                self.containers[i] = _RunContainer(starts, ends, container.cardinality)
+        return self
+
+    # 集合运算
+    def _combine(self, other: 'CompressedBitmap', op, keep_left, keep_right):
+        result = CompressedBitmap()
+        keys, containers = result.keys, result.containers
+        a_keys, b_keys = self.keys, other.keys
+        i = j = 0
+        while i < len(a_keys) or j < len(b_keys):
+            if j == len(b_keys) or (i < len(a_keys) and a_keys[i] < b_keys[j]):
+                if keep_left:
+                    keys.append(a_keys[i])
+                    containers.append(self.containers[i].copy())
+                i += 1
+            elif i == len(a_keys) or b_keys[j] < a_keys[i]:
+                if keep_right:
+                    keys.append(b_keys[j])
+                    containers.append(other.containers[j].copy())
+                j += 1
+            else:
+                container = op(self.containers[i], other.containers[j])
+                if container is not None:
+                    keys.append(a_keys[i])
+                    containers.append(container)
+                i += 1
+                j += 1
+        return result
+
+    def __and__(self, other: 'CompressedBitmap'):
+        return self._combine(other, _and, False, False)
+
+    def __or__(self, other: 'CompressedBitmap'):
+        return self._combine(other, _or, True, True)
+
+    def __xor__(self, other: 'CompressedBitmap'):
+        return self._combine(other, _xor, True, True)
+
+    def __sub__(self, other: 'CompressedBitmap'):
+        return self._combine(other, _andnot, True, False)
+
+    def andnot(self, other: 'CompressedBitmap'):
+        return self - other
+
+    def copy(self) -> 'CompressedBitmap':
+        result = CompressedBitmap()
+        result.keys = list(self.keys)
+        result.containers = [c.copy() for c in self.containers]
+        return result
+
+    # 序列化
+    def pack(self) -> bytes:
+        """
+        将位图打包为字节序列。
+        """
+        parts = [_HEADER.pack(_MAGIC, len(self.keys))]
+        parts += [_DESCRIPTOR.pack(key, c.kind, c.count) for key, c in zip(self.keys, self.containers)]
+        parts += [c.payload() for c in self.containers]
+        return b''.join(parts)
+
+    @classmethod
+    def unpack(cls, data) -> 'CompressedBitmap':
+        """
+        从字节序列解包为压缩位图。
+
+        容器直接引用 data 中的数据而不复制 (可以传入 bytes、bytearray、memoryview 或 mmap),
+        修改某个容器时才会复制该容器, data 本身不会被修改; 使用期间 data 需要保持有效。
+        """
+        view = memoryview(data).cast('B').toreadonly()  # 容器在第一次修改时复制, 不会写入 data
+        magic, n = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError("Not a packed CompressedBitmap")
+
+        self = cls()
+        offset = _HEADER.size + _DESCRIPTOR.size * n
+        for key, kind, count in _DESCRIPTOR.iter_unpack(view[_HEADER.size:offset]):
+            if kind == _BITMAP:
+                size = _CHUNK // 8
+                bits = bitarray(buffer=view[offset:offset + size], endian='little')
+                container = _BitmapContainer(bits, count)
+            else:
+                size = 2 * count if kind == _ARRAY else 4 * count
+                values = view[offset:offset + size].cast('H')
+                if not _LITTLE:
+                    values = array('H', values)
+                    values.byteswap()
+                if kind == _ARRAY:
+                    container = _ArrayContainer(values)
+                else:
+                    container = _RunContainer(values[:count], values[count:])
+            offset += size
+            self.keys.append(key)
+            self.containers.append(container)
+        return self
+
+    def to_bitmap(self) -> Bitmap:
+        """
+        转换为普通 (不压缩) 的位图。
+        """
+        bitmap = Bitmap()
+        bitmap.bits = zeros(len(self))
+        bitmap.bits[list(self.indices())] = 1
+        return bitmap
+
+    def extend(self, other: Union['CompressedBitmap', Bitmap]):
+        """
+        将另一个位图的位追加到当前位图之后。
+        """
+        offset = len(self)
+        self.update(offset + i for i in other.indices())
+
+    def __contains__(self, index: int) -> bool:
+        return self.get_bit(index)
+
+    def __setitem__(self, key: int, value: bool):
+        self.set_bit(key, value)
+
+    def __getitem__(self, item: int) -> bool:
+        return self.get_bit(item)
+
+    def __iter__(self):
+        """
+        遍历位图中的每一位 (与 Bitmap 相同)。
+        """
+        position = 0
+        for index in self.indices():
+            yield from (False for _ in range(index - position))
+            yield True
+            position = index + 1
+
+    def __len__(self) -> int:
+        if not self.keys:
+            return 0
+        return (self.keys[-1] << 16 | self.containers[-1].last()) + 1
+
+    def __eq__(self, other):
+        if not isinstance(other, CompressedBitmap):
+            return NotImplemented
+        return self.keys == other.keys and all(
+            a.cardinality == b.cardinality and a.to_bits() == b.to_bits()
+            for a, b in zip(self.containers, other.containers)
+        )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__module__}.{self.__class__.__name__}(cardinality={self.cardinality()}, containers={len(self.keys)})"
+
+    __repr__ = __str__
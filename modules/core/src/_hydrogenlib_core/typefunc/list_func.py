@@ -2,8 +2,6 @@ import fractions
 from collections import deque
 from collections.abc import Iterable
 
-from hatch.cli import self
-
 
 def d1(value, lenght):
     return [value for _ in range(lenght)]
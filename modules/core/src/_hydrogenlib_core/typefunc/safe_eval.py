@@ -1,5 +1,8 @@
 import ast
 import builtins as _builtins
+import functools
+import operator
+import types
 from typing import Optional
 
 opers = {
@@ -62,6 +65,20 @@ ast_name_to_operator = {
 }
 
 
+_comparisons = {
+    ast.Lt: operator.lt,
+    ast.Gt: operator.gt,
+    ast.LtE: operator.le,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.In: lambda x, y: x in y,
+    ast.NotIn: lambda x, y: x not in y,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+
 def _literal_eval(node, globals_: Optional[dict], locals_: Optional[dict], builtins: Optional[dict],
                   local_context: Optional[dict] = None):
     if local_context is None:
@@ -69,11 +86,7 @@ def _literal_eval(node, globals_: Optional[dict], locals_: Optional[dict], built
 
     args = globals_, locals_, builtins, local_context
 
-    def isin(name):
-        return name in local_context or name in locals_ or name in globals_ or name in builtins
-
-    def get(name):
-        return local_context.get(name, locals_.get(name, globals_.get(name, builtins.get(name))))
+    scopes = local_context, locals_, globals_, builtins
 
     def op_func(node):
         return opers[ast_name_to_operator[type(node).__name__]]
@@ -104,18 +117,18 @@ def _literal_eval(node, globals_: Optional[dict], locals_: Optional[dict], built
     elif isinstance(node, ast.Compare):
         left = _literal_eval(node.left, *args)
         for op, comparator in zip(node.ops, node.comparators):
-            func = op_func(op)
             right = _literal_eval(comparator, *args)
-            if not func(left, right):
+            if not _comparisons[type(op)](left, right):
                 return False
-            left = func(left, right)
-        return bool(left)
+            left = right
+        return True
 
-    elif isinstance(node, ast.BoolOp):
-        func = op_func(node.op)
-        res = True
+    elif isinstance(node, ast.BoolOp):  # 短路求值, 返回最后求值的操作数
+        is_and = isinstance(node.op, ast.And)
         for value in node.values:
-            res = func(res, _literal_eval(value, *args))
+            res = _literal_eval(value, *args)
+            if bool(res) is not is_and:
+                return res
         return res
 
     elif isinstance(node,
@@ -128,19 +141,18 @@ def _literal_eval(node, globals_: Optional[dict], locals_: Optional[dict], built
 
     elif isinstance(node, ast.Name):  # <variable>
         name = node.id
-        if not isin(name):
-            raise NameError("name '" + name + "' is not defined")
-        else:
-            return get(name)
+        for scope in scopes:
+            if name in scope:
+                return scope[name]
+        raise NameError("name '" + name + "' is not defined")
 
     elif isinstance(node, ast.Call):
         return _literal_eval(node.func, *args)(
             *[_literal_eval(arg, *args)
               for arg in node.args],
             **{
-                _literal_eval(key, *args):
-                    _literal_eval(value, *args)
-                for key, value in node.keywords
+                keyword.arg: _literal_eval(keyword.value, *args)
+                for keyword in node.keywords
             }
         )
 
@@ -185,15 +197,112 @@ def _literal_eval(node, globals_: Optional[dict], locals_: Optional[dict], built
         raise ValueError("Unsupported type: " + str(type(node)))
 
 
-def literal_eval(string, globals: Optional[dict] = None, locals: Optional[dict] = None,
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.FormattedValue, ast.List, ast.Tuple, ast.BinOp, ast.UnaryOp,
+    ast.Compare, ast.BoolOp, ast.Dict, ast.Name, ast.Call, ast.keyword, ast.ListComp, ast.GeneratorExp,
+    ast.comprehension, ast.Attribute, ast.operator, ast.unaryop, ast.cmpop, ast.boolop, ast.expr_context,
+)
+_NO_BUILTINS = {}
+_ALL_BUILTINS = dict(vars(_builtins))
+_SAFE_BUILTINS = {k: v for k, v in _ALL_BUILTINS.items() if k != 'eval'}
+# 编译执行时作为 __builtins__ 的只读视图, 表达式无法修改共享的内置名称表
+_BUILTINS_VIEWS = {id(d): types.MappingProxyType(d) for d in (_NO_BUILTINS, _ALL_BUILTINS, _SAFE_BUILTINS)}
+
+
+def _validate(tree):
+    """
+    检查表达式只包含 literal_eval 支持的语法
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError("Unsupported type: " + str(type(node)))
+        if isinstance(node, ast.Dict) and None in node.keys:
+            raise ValueError("Unsupported dict unpacking")
+        if isinstance(node, ast.keyword) and node.arg is None:
+            raise ValueError("Unsupported keyword unpacking")
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise ValueError("Access to private name: " + node.id)
+        if isinstance(node, ast.Attribute) and node.attr.startswith('_'):
+            raise ValueError("Access to private attribute: " + node.attr)
+        if isinstance(node, ast.comprehension):
+            if node.is_async:
+                raise ValueError("Unsupported async comprehension")
+            target = node.target
+            names = target.elts if isinstance(target, ast.Tuple) else [target]
+            if not all(isinstance(name, ast.Name) for name in names):
+                raise ValueError("Unsupported target type: " + str(type(target)))
+
+
+def _builtins_dict(builtins, no_eval):
+    if not builtins:
+        return _NO_BUILTINS
+    return _SAFE_BUILTINS if no_eval else _ALL_BUILTINS
+
+
+class SafeExpression:
+    """
+    compile_safe 的结果: 经过白名单检查的表达式代码对象, 可以在不同的变量上重复求值
+    """
+    __slots__ = ('source', 'code', '_nested_scope')
+
+    def __init__(self, source: str):
+        tree = ast.parse(source, mode='eval')
+        _validate(tree)
+        self.source = source
+        self.code = compile(tree, '<safe_eval>', 'eval')
+        # 生成器表达式有独立的作用域, 看不到作为 locals 传入的变量, 需要合并到 globals
+        self._nested_scope = any(isinstance(node, ast.GeneratorExp) for node in ast.walk(tree))
+
+    def __call__(self, globals: Optional[dict] = None, locals: Optional[dict] = None,
                  builtins: bool = False, no_eval: bool = True):
-    builtins_dict = {}
+        namespace = dict(globals) if globals else {}
+        namespace['__builtins__'] = _BUILTINS_VIEWS[id(_builtins_dict(builtins, no_eval))]
+        if locals and self._nested_scope:
+            namespace.update(locals)
+            locals = None
+        return eval(self.code, namespace, locals or {})
+
+    def evaluate_many(self, rows, globals: Optional[dict] = None, builtins: bool = False, no_eval: bool = True):
+        """
+        对每一行变量 (作为 locals) 求值, 共享同一个 globals
+        :return: 结果列表
+        """
+        namespace = dict(globals or ())
+        namespace['__builtins__'] = _BUILTINS_VIEWS[id(_builtins_dict(builtins, no_eval))]
+        code = self.code
+        if self._nested_scope:
+            return [eval(code, {**namespace, **row}) for row in rows]
+        return [eval(code, namespace, row) for row in rows]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.source!r})"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_safe(expr: str) -> SafeExpression:
+    """
+    解析并检查表达式, 返回可以重复求值的 SafeExpression
+    结果按表达式文本缓存 (LRU)
+    """
+    return SafeExpression(expr)
+
+
+def literal_eval(string, globals: Optional[dict] = None, locals: Optional[dict] = None,
+                 builtins: bool = False, no_eval: bool = True, compiled: bool = False):
+    """
+    在受限的语法下求值表达式
+    :param compiled: 使用 compile_safe 缓存的代码对象求值, 默认使用逐节点解释的求值器;
+        两者的结果有以下不同:
+        - 编译执行时生成器表达式返回惰性的生成器, 解释执行返回列表
+        - 编译执行时多个 for 的推导式按 Python 语义嵌套, 解释执行依次遍历各个 for
+        - 编译执行拒绝以下划线开头的名称和属性
+    """
+    if compiled:
+        return compile_safe(string)(globals, locals, builtins, no_eval)
+
     if globals is None: globals = {}
     if locals is None: locals = {}
-    if builtins is True: builtins_dict = vars(_builtins)
-
-    if no_eval and 'eval' in builtins_dict:
-        del builtins_dict['eval']
+    builtins_dict = _builtins_dict(builtins, no_eval)
 
     tree = ast.parse(string, mode='eval')
     return _literal_eval(tree.body, globals, locals, builtins_dict)
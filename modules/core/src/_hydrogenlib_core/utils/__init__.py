@@ -1,11 +1,14 @@
 from .clock import *
 from .double_dict import *
+from .histogram import *
 from .instance_mapping import *
 from .lazy import *
 from .multi_set import *
 from .namespace import *
+from .object_pool import *
 from .once_message import *
 from .probability_counter import *
 from .property_path import *
 from .timed_data import *
 from .triggers import *
+from .ttl_cache import *
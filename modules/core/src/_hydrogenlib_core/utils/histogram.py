@@ -0,0 +1,74 @@
+import threading
+from bisect import bisect_left
+
+
+class Histogram:
+    """
+    固定分桶的直方图, 用于统计延迟、耗时等数据 (线程安全)
+
+    :param buckets: 各个桶的上界 (升序), 超过最后一个上界的值计入溢出桶
+    """
+
+    default_buckets = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.default_buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.total = 0
+            self.max = None
+            self.min = None
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += value
+            if self.max is None or value > self.max:
+                self.max = value
+            if self.min is None or value < self.min:
+                self.min = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, q):
+        """
+        估算分位数 (返回所在桶的上界, 落在溢出桶时返回最大值)
+        :param q: 0 ~ 100
+        """
+        if not self.count:
+            return None
+
+        rank = self.count * q / 100
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': dict(zip(self.buckets + (float('inf'),), self.counts)),
+        }
+
+    def __str__(self):
+        return (f"{self.__class__.__name__}(count={self.count}, mean={self.mean:.3f}, "
+                f"p50={self.percentile(50)}, p99={self.percentile(99)}, max={self.max})")
+
+    __repr__ = __str__
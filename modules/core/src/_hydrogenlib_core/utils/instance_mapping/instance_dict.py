@@ -1,15 +1,24 @@
 import weakref
-from collections import UserDict
+from collections.abc import Mapping, MutableMapping
 from typing import Any
 
+_MISSING = object()
+
+
+class _KeyRef(weakref.ref):
+    __slots__ = ('key_id',)
+
 
 class InstanceMappingItem:
-    _key: weakref.ReferenceType
+    """
+    InstanceMapping 中一项的视图, 只在 _get(item=True) 时创建
+    """
+    __slots__ = ('_key', '_isweakref', 'value', 'parent')
 
     def __init__(self, key_instance, value, parent: 'InstanceMapping' = None):
         self._isweakref = True
         try:
-            self._key = weakref.ref(key_instance, self.delete_callback)
+            self._key = weakref.ref(key_instance)
         except TypeError:
             self._key = key_instance  # 如果 key_instance 不是弱引用对象
             self._isweakref = False
@@ -27,40 +36,73 @@ class InstanceMappingItem:
     def as_key(self):
         return self.parent.to_key(self.key)
 
-    def delete_callback(self, obj):
-        try:
-            self.parent.delete(obj)
-        except KeyError:
-            pass  # 忽略 KeyError
 
+class InstanceMapping[_KT, _VT](MutableMapping[_KT, _VT]):
+    """
+    以对象身份 (id) 为键的映射, 键不需要可哈希
+
+    值和键的引用分别存放在两个以 id 为键的字典中, 插入和删除总是同步进行, 因此两者的顺序一致
+    可以弱引用的键使用同一个回调, 对象被回收时删除对应的项; 不能弱引用的键 (int, str 等) 被强引用
+    """
+
+    __slots__ = ('_values', '_refs', '_remove', '__weakref__')
 
-class InstanceMapping[_KT, _VT](UserDict[_KT, _VT]):
     def __init__(self, dct=None):
-        super().__init__()
-        if isinstance(dct, InstanceMapping):
-            for k, v in dct.items():
-                self._set(k, v)
+        self._values = {}  # id -> value
+        self._refs = {}  # id -> _KeyRef 或键本身
+
+        selfref = weakref.ref(self)
+
+        def remove(ref, selfref=selfref):
+            self = selfref()
+            if self is not None and self._refs.get(ref.key_id) is ref:
+                del self._refs[ref.key_id]
+                del self._values[ref.key_id]
+
+        self._remove = remove
+
+        if dct is not None:
+            self.update(dct.items() if isinstance(dct, Mapping) else dct)
+
+    @property
+    def data(self):
+        """
+        id -> 值
+        """
+        return self._values
 
     def to_dict(self):
-        return {
-            i.as_key: i.value for i in self.data.values()
-        }
+        return dict(self._values)
 
     def to_key(self, value):
         return id(value)
 
     def _get(self, key, item=False) -> InstanceMappingItem:
-        i = super().__getitem__(key)
-        return i if item else i.value
+        value = self._values[key]
+        return InstanceMappingItem(self._deref(self._refs[key]), value, self) if item else value
 
     def _set(self, key, value) -> None:
-        super().__setitem__(self.to_key(key), InstanceMappingItem(key, value, self))
+        key_id = id(key)
+        if key_id not in self._refs:
+            try:
+                ref = _KeyRef(key, self._remove)
+                ref.key_id = key_id
+            except TypeError:
+                ref = key
+            self._refs[key_id] = ref
+        self._values[key_id] = value
 
     def _pop(self, key):
-        return super().pop(key)
+        del self._refs[key]
+        return self._values.pop(key)
 
     def _delete(self, key) -> None:
-        super().__delitem__(key)
+        del self._refs[key]
+        del self._values[key]
+
+    @staticmethod
+    def _deref(ref):
+        return ref() if type(ref) is _KeyRef else ref
 
     def get(self, k, default=None, is_key_id=False) -> Any:
         """
@@ -69,27 +111,21 @@ class InstanceMapping[_KT, _VT](UserDict[_KT, _VT]):
         :param is_key_id: 传入的 k 参数是否是一个 id 值
         :param default: 返回的默认值
         """
-        if not is_key_id:  # 如果 k 不作为 id 传入
-            k = self.to_key(k)  # 转换为 id
-
-        if not super().__contains__(k):  # 如果 k 不位于字典中
-            return default  # 返回默认值
-
-        id_item = super().__getitem__(k)
-
-        return id_item.value
+        return self._values.get(k if is_key_id else id(k), default)
 
     def set(self, k, v, is_key_id=False):
         """
         设置 实例字典 的值
         :param k: 键
         :param v: 值
-        :param is_key_id: 传入的是否是一个 id 值
+        :param is_key_id: 传入的是否是一个 id 值, 此时只能修改已经存在的项
         """
-        if not is_key_id:
-            k = self.to_key(k)
-
-        self._set(self.to_key(k), v)
+        if is_key_id:
+            if k not in self._values:
+                raise KeyError(k)
+            self._values[k] = v
+        else:
+            self._set(k, v)
 
     def delete(self, key, is_key_id=False):
         """
@@ -97,43 +133,56 @@ class InstanceMapping[_KT, _VT](UserDict[_KT, _VT]):
         :param key: 键
         :param is_key_id: 传入的键是否是一个 id 值
         """
-        if not is_key_id:
-            key = self.to_key(key)
+        self._delete(key if is_key_id else id(key))
 
-        self._delete(key)
-
-    def pop(self, key, is_key_id=False):
+    def pop(self, key, is_key_id=False, default=_MISSING):
         """
         弹出一个 实例字典 项
         :param key: 键
         :param is_key_id: 传入的键是否是一个 id 值
+        :param default: 键不存在时返回的默认值, 不提供时抛出 KeyError
         :return: Any
         """
-        if not is_key_id:
-            key = self.to_key(key)
-
+        key = key if is_key_id else id(key)
+        if key not in self._values and default is not _MISSING:
+            return default
         return self._pop(key)
 
     def keys(self):
-        return [i.key for i in self.data.values()]
+        deref = self._deref
+        return [deref(ref) for ref in list(self._refs.values())]
 
     def values(self):
-        return [i.value for i in self.data.values()]
+        return list(self._values.values())
 
     def items(self):
-        return [(i.key, i.value) for i in self.data.values()]
+        values, deref = self._values, self._deref
+        return [(deref(ref), values[key_id]) for key_id, ref in list(self._refs.items()) if key_id in values]
+
+    def clear(self):
+        self._refs.clear()
+        self._values.clear()
+
+    def copy(self):
+        return self.__class__(self.items())
 
     def __getitem__(self, key):
-        return super().__getitem__(self.to_key(key)).value
+        return self._values[id(key)]
 
     def __setitem__(self, key, value):
         self._set(key, value)
 
     def __delitem__(self, key):
-        super().__delitem__(self.to_key(key))
+        self._delete(id(key))
 
     def __contains__(self, item):
-        return super().__contains__(self.to_key(item))
+        return id(item) in self._values
 
     def __iter__(self):
-        yield from self.keys()
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.items()!r})"
@@ -1,2 +1,2 @@
-from .lz_property import lazy_property
+from .lz_property import lazy_property, async_lazy_property
 from .lz_data import LazyData
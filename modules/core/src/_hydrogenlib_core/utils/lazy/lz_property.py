@@ -1,45 +1,188 @@
+import asyncio
+import threading
+from types import MemberDescriptorType
+
 from ..instance_mapping import InstanceMapping
 from ...typefunc import alias
 
+_MISSING = object()
+_DICT = object()
+_MAPPING = object()
+
 
 class lazy_property[T]:
+    """
+    惰性属性, 第一次访问时计算, 之后返回缓存的值
+
+    缓存的位置:
+    - 实例有 __dict__ 时存入 __dict__, 没有 setter / deleter 时本描述符不是数据描述符,
+      之后的读取直接命中实例属性, 与普通属性的开销相同; del 实例属性会使缓存失效
+    - __slots__ 类中有名为 slot (默认为 "_lazy_" + 属性名) 的槽时存入该槽
+    - 否则存入描述符中的 InstanceMapping
+
+    lock=True 时同一个实例只有一个线程进行计算, 其他线程等待结果
+    """
     fget = alias['_fget']
     fset = alias['_fset']
     fdel = alias['_fdel']
 
-    def __init__(self, fget=None, fset=None, fdel=None):
+    def __new__(cls, fget=None, fset=None, fdel=None, **kwargs):
+        if cls is lazy_property and (fset is not None or fdel is not None):
+            cls = _lazy_data_property
+        return super().__new__(cls)
+
+    def __init__(self, fget=None, fset=None, fdel=None, *, lock=False, slot=None):
         self._fget = fget
         self._fset = fset
         self._fdel = fdel
         self._values = InstanceMapping()
+        self._lock = threading.Lock() if lock else None
+        self._pending = InstanceMapping() if lock else None  # 实例 -> 正在计算时使用的锁
+        self.__name__ = getattr(fget, '__name__', None)
+        self.slot = slot
+        self._modes = {}  # 类 -> 缓存位置
+
+    def __set_name__(self, owner, name):
+        self.__name__ = name
+
+    def __call__(self, fget):
+        """
+        @lazy_property(lock=True) 形式的装饰器
+        """
+        self._fget = fget
+        if self.__name__ is None:
+            self.__name__ = fget.__name__
+        return self
 
     def setter(self, fset):
         self._fset = fset
+        self.__class__ = _lazy_data_property
+        return self
 
     def getter(self, fget):
         self._fget = fget
+        return self
 
     def deleter(self, fdel):
         self._fdel = fdel
+        self.__class__ = _lazy_data_property
+        return self
 
-    def __get__(self, instance, owner) -> T:
-        if instance in self._values:
-            return self._values[instance]
-        elif self._fget:
-            self._values[instance] = self._fget(instance)
-            return self._values[instance]
+    # 缓存的读写, 返回 _MISSING 表示没有缓存
+    def _mode(self, cls):
+        """
+        缓存位置: _DICT, 槽的成员描述符, 或 _MAPPING; 按类缓存
+        """
+        mode = self._modes.get(cls)
+        if mode is None:
+            if cls.__dictoffset__:
+                mode = _DICT
+            else:
+                slot = getattr(cls, self.slot or '_lazy_' + self.__name__, None)
+                mode = slot if type(slot) is MemberDescriptorType else _MAPPING
+            self._modes[cls] = mode
+        return mode
+
+    def _load(self, instance):
+        mode = self._mode(type(instance))
+        if mode is _DICT:
+            return instance.__dict__.get(self.__name__, _MISSING)
+        if mode is _MAPPING:
+            return self._values.get(instance, _MISSING)
+        try:
+            return mode.__get__(instance)
+        except AttributeError:
+            return _MISSING
+
+    def _store(self, instance, value):
+        mode = self._mode(type(instance))
+        if mode is _DICT:
+            instance.__dict__[self.__name__] = value
+        elif mode is _MAPPING:
+            self._values[instance] = value
+        else:
+            mode.__set__(instance, value)
+
+    def _clear(self, instance):
+        mode = self._mode(type(instance))
+        if mode is _DICT:
+            instance.__dict__.pop(self.__name__, None)
+        elif mode is _MAPPING:
+            self._values.pop(instance, default=None)
         else:
+            try:
+                mode.__delete__(instance)
+            except AttributeError:
+                pass
+
+    def _compute(self, instance, owner):
+        if self._fget is None:
             raise AttributeError(f"'{instance.__class__.__name__}' object has no attribute '{self.__name__}'")
+        if self._lock is None:
+            value = self._fget(instance)
+            self._store(instance, value)
+            return value
 
-    def __set__(self, instance, value):
-        if instance in self._values:
-            del self._values[instance]
+        with self._lock:
+            lock = self._pending.get(instance)
+            if lock is None:
+                lock = self._pending[instance] = threading.Lock()
+        try:
+            with lock:
+                value = self._load(instance)  # 等待期间其他线程可能已经完成计算
+                if value is _MISSING:
+                    value = self._fget(instance)
+                    self._store(instance, value)
+                return value
+        finally:
+            with self._lock:
+                if self._pending.get(instance) is lock:
+                    self._pending.pop(instance)
+
+    def __get__(self, instance, owner) -> T:
+        if instance is None:
+            return self
+        # 存入 __dict__ 后不会再进入这里, 只需检查槽和 InstanceMapping
+        value = self._load(instance)
+        if value is _MISSING:
+            value = self._compute(instance, owner)
+        return value
+
+
+class _lazy_data_property[T](lazy_property[T]):
+    """
+    带 setter / deleter 的惰性属性: 赋值和删除会清除缓存后调用 fset / fdel
+    """
 
+    def __set__(self, instance, value):
+        self._clear(instance)
+        if self._fset is None:
+            raise AttributeError(f"can't set attribute '{self.__name__}'")
         self._fset(instance, value)
 
     def __delete__(self, instance):
-        if instance in self._values:
-            del self._values[instance]
+        self._clear(instance)
+        if self._fdel is not None:
+            self._fdel(instance)
+
+
+class async_lazy_property[T](lazy_property[T]):
+    """
+    协程加载的惰性属性, 访问时返回一个 Task, 可以重复 await
+
+    第一次访问时创建 Task 并缓存, 并发的访问共享同一个 Task; 加载失败或被取消时清除缓存, 下次访问重新加载
+    """
+
+    def _compute(self, instance, owner):
+        if self._fget is None:
+            raise AttributeError(f"'{instance.__class__.__name__}' object has no attribute '{self.__name__}'")
+        task = asyncio.ensure_future(self._fget(instance))
+        self._store(instance, task)
 
-        self._fdel(instance)
+        def done(t):
+            if t.cancelled() or t.exception() is not None:
+                if self._load(instance) is t:
+                    self._clear(instance)
 
+        task.add_done_callback(done)
+        return task
@@ -0,0 +1,3 @@
+from .item import *
+from .pool import *
+from .buffer_pool import *
@@ -0,0 +1,135 @@
+from .pool import Pool
+
+KiB = 1024
+MiB = 1024 * KiB
+
+
+class _Borrowed:
+    __slots__ = ('pool', 'size', 'buffer', 'view')
+
+    def __init__(self, pool: 'BufferPool', size):
+        self.pool = pool
+        self.size = size
+
+    def __enter__(self):
+        self.buffer = self.pool.acquire(self.size)
+        self.view = memoryview(self.buffer)[:self.size]
+        return self.view
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.view.release()
+        self.pool.release(self.buffer)
+
+
+class BufferPool:
+    """
+    按大小分级的 bytearray 缓冲区池
+
+    缓冲区大小为 min_size ~ max_size 之间 2 的幂 (默认 4 KiB ~ 16 MiB), 每一级使用一个 Pool;
+    请求的大小会向上取整到所在的级别, 超过 max_size 的请求直接分配, 不进入缓冲区池
+
+    缓冲区用完后需要归还; 借出期间不能改变 bytearray 的长度
+    """
+
+    def __init__(self, min_size=4 * KiB, max_size=16 * MiB, max_idle=8):
+        """
+        :param min_size: 最小的缓冲区大小, 必须是 2 的幂
+        :param max_size: 最大的缓冲区大小, 必须是 2 的幂
+        :param max_idle: 每一级最多保留的空闲缓冲区数
+        """
+        if min_size <= 0 or min_size & (min_size - 1) or max_size & (max_size - 1):
+            raise ValueError("min_size and max_size must be powers of two")
+        if max_size < min_size:
+            raise ValueError("max_size must not be less than min_size")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self._shift = min_size.bit_length() - 1
+        self.pools = [
+            Pool(factory=lambda size=1 << bits: bytearray(size), max_idle=max_idle)
+            for bits in range(self._shift, max_size.bit_length())
+        ]
+        self.oversized = 0  # 超过 max_size 的分配次数
+
+    def size_class(self, size):
+        """
+        获取 size 所在级别的缓冲区大小
+        """
+        if size <= self.min_size:
+            return self.min_size
+        return 1 << (size - 1).bit_length()
+
+    def _pool(self, size):
+        if size <= self.min_size:
+            return self.pools[0]
+        index = (size - 1).bit_length() - self._shift
+        return self.pools[index] if index < len(self.pools) else None
+
+    @property
+    def allocations(self):
+        """
+        新分配的缓冲区数
+        """
+        return sum(pool.stats.misses for pool in self.pools) + self.oversized
+
+    @property
+    def hits(self):
+        return sum(pool.stats.hits for pool in self.pools)
+
+    def acquire(self, size) -> bytearray:
+        """
+        借出一个长度不小于 size 的缓冲区
+        """
+        pool = self._pool(size)
+        if pool is None:
+            self.oversized += 1
+            return bytearray(size)
+        return pool.acquire()
+
+    def release(self, buffer: bytearray):
+        """
+        归还缓冲区
+        """
+        size = len(buffer)
+        if size > self.max_size:
+            return
+        pool = self._pool(size)
+        if pool is None or size != self.size_class(size):
+            raise ValueError("Buffer is not borrowed from this pool")
+        pool.release(buffer)
+
+    def borrow(self, size):
+        """
+        借出一个缓冲区, 得到长度恰好为 size 的 memoryview, 离开 with 块时自动归还
+        """
+        return _Borrowed(self, size)
+
+    def clear(self):
+        """
+        释放所有空闲缓冲区
+        """
+        for pool in self.pools:
+            pool.evict_idle(0)
+
+
+buffer_pool = BufferPool()  # 默认的全局缓冲区池
+
+
+def iter_chunks(stream, chunk_size=64 * KiB, pool: BufferPool = None):
+    """
+    使用 readinto 从二进制流中按块读取数据
+
+    每次产出的 memoryview 指向同一个缓冲区, 只在下一次迭代前有效, 需要保留数据时应当复制 (bytes(chunk))
+    :param stream: 支持 readinto 的二进制流
+    :param chunk_size: 每块的大小
+    :param pool: 使用的缓冲区池, 默认为全局缓冲区池
+    """
+    pool = pool or buffer_pool
+    with pool.borrow(chunk_size) as buffer:
+        readinto = stream.readinto
+        while True:
+            n = readinto(buffer)
+            if not n:
+                break
+            with buffer[:n] as chunk:
+                yield chunk
@@ -1,10 +1,5 @@
+import time
 import typing
-import weakref
-
-from ...typefunc.properties import alias
-
-if typing.TYPE_CHECKING:
-    from .pool import Pool
 
 
 class PoolObject(typing.Protocol if typing.TYPE_CHECKING else object):
@@ -27,25 +22,15 @@ class PoolObject(typing.Protocol if typing.TYPE_CHECKING else object):
 
 
 class PoolItem:
-    obj = alias['obj']
-
-    def __init__(self, obj: PoolObject, pool: 'Pool'):
-        self._ref = None
-        self._obj = obj
-        self._pool = pool
-    
-    def keep(self, obj):
-        self._obj = obj
-        self._obj.__pool_keep__()
-        self._ref = None
-    
-    def pop(self):
-        self._ref = weakref.ref(self._obj, self.keep)  # 建立弱引用, 控制对象生命周期
-        self._obj = None
-
-    def reuse(self, *args, **kwargs):
-        if self._obj is None:
-            raise RuntimeError('对象正在使用中')
-
-        self._obj.__pool_reuse__(*args, **kwargs)
-        
\ No newline at end of file
+    """
+    对象池中的空闲对象
+    """
+    __slots__ = ('obj', 'idle_since')
+
+    def __init__(self, obj: PoolObject):
+        self.obj = obj
+        self.idle_since = time.monotonic()  # 开始空闲的时间
+
+    @property
+    def idle_time(self):
+        return time.monotonic() - self.idle_since
@@ -1,19 +1,409 @@
+import asyncio
+import contextlib
+import dataclasses as dc
+import threading
+import time
 from collections import deque
-from .item import PoolItem
+from typing import Callable
+
+from .item import PoolItem, PoolObject
+
+# 交给等待者的特殊值
+_CREATE = object()  # 分配到一个空位, 由等待者调用 factory 创建对象
+_CLOSED = object()  # 对象池已关闭
+
+
+@dc.dataclass
+class PoolStats:
+    hits: int = 0  # 复用空闲对象的次数
+    misses: int = 0  # 新建对象的次数
+    waits: int = 0  # 需要等待的次数
+    wait_time: float = 0.0  # 累计等待时间(秒)
+    max_wait_time: float = 0.0  # 最大等待时间(秒)
+    timeouts: int = 0  # 超时次数
+    evicted: int = 0  # 因空闲过久被移除的对象数
+
+    @property
+    def acquired(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.acquired if self.acquired else 0.0
+
+    @property
+    def avg_wait_time(self):
+        return self.wait_time / self.waits if self.waits else 0.0
+
+
+class _Waiter:
+    __slots__ = ('event', 'value')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+    def deliver(self, value):
+        self.value = value
+        self.event.set()
+        return True
+
+
+class _AsyncWaiter:
+    __slots__ = ('pool', 'loop', 'future')
+
+    def __init__(self, pool: 'Pool', loop: asyncio.AbstractEventLoop):
+        self.pool = pool
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def deliver(self, value):
+        if self.future.done():  # 已经超时或被取消
+            return False
+        self.loop.call_soon_threadsafe(self._set, value)
+        return True
+
+    def _set(self, value):
+        if self.future.done():  # 交付途中超时或被取消, 归还给对象池
+            self.pool._give_back(value)
+        else:
+            self.future.set_result(value)
 
 
 class Pool:
-    def __init__(self, max_size=0):
-        self._max_size = max_size
-        self._deque = deque(maxlen=max_size)  # type: deque[PoolItem]
-    
-    def put(self, obj):
-        self._deque.append(PoolItem(obj, self))
-    
-    def request(self, *args, **kwargs):
-        item = self._deque.popleft()
-        item.reuse(*args, **kwargs)
-        self._deque.append(item)
-        return item.obj
-        
-            
\ No newline at end of file
+    """
+    线程安全的有界对象池
+
+    - 对象通过 factory 按需创建, 也可以通过 put() 放入; 对象总数 (空闲 + 借出) 不超过 max_size (0 表示不限制)
+    - 没有可用对象时 acquire() 会等待, 直到有对象归还或超时 (TimeoutError), 等待者按先来先得的顺序获得对象
+    - 空闲超过 idle_timeout 秒的对象会被移除, 并调用 destroy(obj)
+    - 空闲对象数达到 max_idle (0 表示不限制) 时, 归还的对象会被直接销毁
+    - 对象实现了 PoolObject 的方法时, 借出时调用 __pool_reuse__(*args, **kwargs), 归还时调用 __pool_keep__()
+    """
+
+    def __init__(self, max_size=0, factory: Callable[[], PoolObject] = None, *, max_idle=0,
+                 idle_timeout: float = None, destroy: Callable[[PoolObject], None] = None):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.destroy = destroy
+        self.stats = PoolStats()
+
+        self._lock = threading.Lock()
+        self._idle = deque()  # type: deque[PoolItem]  # 右端为最近归还的对象
+        self._in_use = {}  # type: dict[int, PoolObject]
+        self._waiters = deque()  # type: deque[_Waiter | _AsyncWaiter]
+        self._size = 0  # 对象总数, 包括正在创建的对象
+        self._closed = False
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    @property
+    def in_use(self):
+        return len(self._in_use)
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    # 以下方法需要持有锁
+    def _take(self):
+        if self._idle:
+            obj = self._idle.pop().obj
+            self._in_use[id(obj)] = obj
+            self.stats.hits += 1
+            return obj
+
+        if self.factory is not None and (not self.max_size or self._size < self.max_size):
+            self._size += 1
+            self.stats.misses += 1
+            return _CREATE
+
+        return None
+
+    def _hand_off(self, value):
+        """
+        交给等待者或放回空闲队列, 返回需要销毁的对象
+        """
+        while self._waiters:
+            if self._waiters.popleft().deliver(value):
+                if value is not _CREATE:
+                    self._in_use[id(value)] = value
+                return ()
+
+        if value is _CREATE:
+            self._size -= 1
+        elif self.max_idle and len(self._idle) >= self.max_idle:
+            self._size -= 1
+            return (value,)
+        else:
+            self._idle.append(PoolItem(value))
+        return ()
+
+    def _expired(self, max_age):
+        expired = []
+        deadline = time.monotonic() - max_age
+        while self._idle and self._idle[0].idle_since <= deadline:
+            expired.append(self._idle.popleft().obj)
+        self._size -= len(expired)
+        self.stats.evicted += len(expired)
+        return expired
+
+    def _received(self, value, start):
+        if value is _CLOSED:
+            return
+        if value is _CREATE:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+
+        waited = time.monotonic() - start
+        self.stats.waits += 1
+        self.stats.wait_time += waited
+        self.stats.max_wait_time = max(self.stats.max_wait_time, waited)
+
+    def _give_back(self, value):
+        with self._lock:
+            if value is _CLOSED:
+                return
+            if value is not _CREATE:
+                del self._in_use[id(value)]
+            dropped = self._hand_off(value)
+        self._destroy(dropped)
+
+    def _check_closed(self):
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+
+    def _destroy(self, objs):
+        if self.destroy is not None:
+            for obj in objs:
+                self.destroy(obj)
+
+    def _finish(self, value, args, kwargs):
+        if value is _CLOSED:
+            raise RuntimeError("Pool is closed")
+
+        if value is _CREATE:
+            try:
+                obj = self.factory()
+            except BaseException:
+                with self._lock:
+                    self._hand_off(_CREATE)  # 让出空位
+                raise
+            with self._lock:
+                self._in_use[id(obj)] = obj
+        else:
+            obj = value
+
+        reuse = getattr(obj, '__pool_reuse__', None)
+        if reuse is not None:
+            try:
+                reuse(*args, **kwargs)
+            except BaseException:
+                self.discard(obj)
+                raise
+        return obj
+
+    def _prepare(self):
+        self._check_closed()
+        expired = self._expired(self.idle_timeout) if self.idle_timeout is not None else ()
+        return self._take(), expired
+
+    def acquire(self, *args, timeout: float = None, **kwargs):
+        """
+        借出一个对象, 用完后需要调用 release() 归还
+        :param args: 传给 __pool_reuse__ 的参数
+        :param timeout: 最长等待时间(秒), None 表示一直等待, 0 表示不等待
+        :param kwargs: 传给 __pool_reuse__ 的参数
+        """
+        with self._lock:
+            value, expired = self._prepare()
+            if value is None:
+                if timeout is not None and timeout <= 0:
+                    self.stats.timeouts += 1
+                    waiter = None
+                else:
+                    waiter = _Waiter()
+                    self._waiters.append(waiter)
+        self._destroy(expired)
+        if value is None and waiter is None:
+            raise TimeoutError("No object available in the pool")
+
+        if value is None:
+            start = time.monotonic()
+            waiter.event.wait(timeout)
+            with self._lock:
+                value = waiter.value
+                if value is None:
+                    with contextlib.suppress(ValueError):  # close() 已经取走了等待队列
+                        self._waiters.remove(waiter)
+                    self.stats.timeouts += 1
+                    raise TimeoutError("Timed out waiting for an object from the pool")
+                self._received(value, start)
+
+        return self._finish(value, args, kwargs)
+
+    async def acquire_async(self, *args, timeout: float = None, **kwargs):
+        """
+        acquire() 的异步版本, 等待时不阻塞事件循环
+        """
+        with self._lock:
+            value, expired = self._prepare()
+            if value is None:
+                if timeout is not None and timeout <= 0:
+                    self.stats.timeouts += 1
+                    waiter = None
+                else:
+                    waiter = _AsyncWaiter(self, asyncio.get_running_loop())
+                    self._waiters.append(waiter)
+        self._destroy(expired)
+        if value is None and waiter is None:
+            raise TimeoutError("No object available in the pool")
+
+        if value is None:
+            start = time.monotonic()
+            try:
+                value = await asyncio.wait_for(waiter.future, timeout)
+            except BaseException as e:
+                future = waiter.future
+                if future.done() and not future.cancelled():  # 对象已经交付, 归还给对象池
+                    self._give_back(future.result())
+                with self._lock:
+                    with contextlib.suppress(ValueError):
+                        self._waiters.remove(waiter)
+                    if isinstance(e, TimeoutError):
+                        self.stats.timeouts += 1
+                raise
+            with self._lock:
+                self._received(value, start)
+
+        return self._finish(value, args, kwargs)
+
+    request = acquire
+
+    def release(self, obj: PoolObject):
+        """
+        归还对象
+        """
+        keep = getattr(obj, '__pool_keep__', None)
+        if keep is not None:
+            self._unborrow(obj)
+            try:
+                keep()
+            except BaseException:
+                self._discard(obj)
+                raise
+
+        with self._lock:
+            if keep is None and self._in_use.pop(id(obj), None) is None:
+                raise ValueError("Object is not borrowed from this pool")
+            if self._closed:
+                self._size -= 1
+                dropped = (obj,)
+            else:
+                dropped = self._hand_off(obj)
+        self._destroy(dropped)
+
+    def discard(self, obj: PoolObject):
+        """
+        移除一个借出的对象 (例如已经损坏的连接), 空出的位置可以用来创建新对象
+        """
+        self._unborrow(obj)
+        self._discard(obj)
+
+    def _unborrow(self, obj):
+        with self._lock:
+            if self._in_use.pop(id(obj), None) is None:
+                raise ValueError("Object is not borrowed from this pool")
+
+    def _discard(self, obj):
+        with self._lock:
+            if self.factory is not None and not self._closed:
+                self._hand_off(_CREATE)
+            else:
+                self._size -= 1
+        self._destroy([obj])
+
+    def put(self, obj: PoolObject):
+        """
+        放入一个新的空闲对象
+        """
+        with self._lock:
+            self._check_closed()
+            if self.max_size and self._size >= self.max_size:
+                raise ValueError("Pool is full")
+            self._size += 1
+            dropped = self._hand_off(obj)
+        self._destroy(dropped)
+
+    def evict_idle(self, max_age: float = None):
+        """
+        移除空闲时间超过 max_age 秒的对象
+        :param max_age: 默认为 idle_timeout
+        :return: 移除的对象数
+        """
+        max_age = self.idle_timeout if max_age is None else max_age
+        if max_age is None:
+            return 0
+
+        with self._lock:
+            expired = self._expired(max_age)
+        self._destroy(expired)
+        return len(expired)
+
+    @contextlib.contextmanager
+    def borrow(self, *args, timeout: float = None, **kwargs):
+        """
+        借出一个对象, 离开 with 块时自动归还
+        """
+        obj = self.acquire(*args, timeout=timeout, **kwargs)
+        try:
+            yield obj
+        finally:
+            self.release(obj)
+
+    @contextlib.asynccontextmanager
+    async def borrow_async(self, *args, timeout: float = None, **kwargs):
+        obj = await self.acquire_async(*args, timeout=timeout, **kwargs)
+        try:
+            yield obj
+        finally:
+            self.release(obj)
+
+    def close(self):
+        """
+        关闭对象池, 销毁空闲对象; 正在等待的 acquire() 会抛出 RuntimeError, 之后归还的对象会被直接销毁
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle = [item.obj for item in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            waiters, self._waiters = self._waiters, deque()
+
+        for waiter in waiters:
+            waiter.deliver(_CLOSED)
+        self._destroy(idle)
+
+    def __len__(self):
+        return self._size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,13 +1,53 @@
+from collections import Counter
 from fractions import Fraction
 
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+def count_bytes(data) -> dict[int, int]:
+    """
+    统计 bytes-like 数据中每个字节出现的次数
+    安装了 numpy 时使用 numpy.bincount, 否则使用 collections.Counter
+    """
+    if _np is not None:
+        counts = _np.bincount(_np.frombuffer(data, dtype=_np.uint8), minlength=256)
+        return {i: int(c) for i, c in enumerate(counts.tolist()) if c}
+    return dict(Counter(memoryview(data).cast('B')))
+
 
 class ProbabilityCounter:
-    def __init__(self, init_value=None):
+    """
+    计数器, 可以计算每个键的概率
+
+    exact 为 True 时概率为 Fraction, 否则为 float
+    计数器之间可以合并 (merge / +), 用于分块或多进程统计
+    """
+
+    def __init__(self, init_value=None, exact=True):
         if init_value is None:
             init_value = {}
         self.count_dict = dict(init_value)
+        self.exact = exact
+        self._total = sum(self.count_dict.values())
+
+    @classmethod
+    def from_data(cls, data, exact=True):
+        """
+        统计数据中每个元素的出现次数, bytes-like 数据使用 count_bytes
+        """
+        self = cls(exact=exact)
+        self.count(data)
+        return self
+
+    @property
+    def total(self):
+        return self._total
 
     def __setitem__(self, key, value):
+        self._total += value - self.count_dict.get(key, 0)
         self.count_dict[key] = value
 
     def __getitem__(self, item):
@@ -16,21 +56,58 @@ class ProbabilityCounter:
         return self.count_dict[item]
 
     def get(self, key):
-        s = sum(self.count_dict.values())
+        s = self._total
         if s == 0:
-            return Fraction()
-        return Fraction(self.count_dict[key], s)
+            return Fraction() if self.exact else 0.0
+        if self.exact:
+            return Fraction(self.count_dict[key], s)
+        return self.count_dict[key] / s
 
     def update(self, data: dict):
+        count_dict = self.count_dict
         for key, value in data.items():
-            if key not in self.count_dict:
-                self.count_dict[key] = 0
-            self.count_dict[key] += value
+            count_dict[key] = count_dict.get(key, 0) + value
+            self._total += value
 
     def increment(self, key, value=1):
-        if key not in self.count_dict:
-            self.count_dict[key] = 0
-        self.count_dict[key] += value
+        self.count_dict[key] = self.count_dict.get(key, 0) + value
+        self._total += value
+
+    def count(self, data):
+        """
+        统计数据中每个元素的出现次数, 累加到计数器中
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            self.update(count_bytes(data))
+        else:
+            self.update(Counter(data))
+        return self
+
+    def count_stream(self, stream, chunk_size=1 << 20):
+        """
+        分块统计二进制流中的字节
+        """
+        while chunk := stream.read(chunk_size):
+            self.update(count_bytes(chunk))
+        return self
+
+    def merge(self, *others: 'ProbabilityCounter'):
+        """
+        合并其他计数器的计数
+        """
+        for other in others:
+            self.update(other.count_dict)
+        return self
+
+    def __add__(self, other: 'ProbabilityCounter'):
+        if not isinstance(other, ProbabilityCounter):
+            return NotImplemented
+        return ProbabilityCounter(self.count_dict, self.exact).merge(other)
+
+    def __iadd__(self, other: 'ProbabilityCounter'):
+        if not isinstance(other, ProbabilityCounter):
+            return NotImplemented
+        return self.merge(other)
 
     def probabilities(self, keys=None):
         if keys is None:
@@ -41,12 +118,14 @@ class ProbabilityCounter:
 
         return [self.get(key) for key in keys]
 
-    def proabilities_dict(self, keys=None):
+    def probabilities_dict(self, keys=None):
         if keys is None:
             keys = list(self.count_dict.keys())
             keys.sort()
         return dict(zip(keys, self.probabilities(keys)))
 
+    proabilities_dict = probabilities_dict  # 兼容旧的拼写
+
     def __iter__(self):
         return iter(self.count_dict)
 
@@ -63,6 +63,9 @@ class TimedData:
 
 
 class TimedDataManager:
+    """
+    每次检查都会扫描 TimedData, 大量短期键请使用 TTLCache
+    """
     def __init__(self, timeout=60):
         self.timeout = timeout
         self.data = {}  # type: dict[str, TimedData]
@@ -90,7 +93,7 @@ class TimedDataManager:
             self.delete_multiple(keys)
 
     def extend(self, dic):
-        for key, value in dic._instances():
+        for key, value in dic.items():
             self.add(key, value)
 
     def extend_threadsafe(self, dic):
@@ -1,3 +1,4 @@
-from .core import get_current_ms, TaskType as TaskKind
+from .core import get_current_ms, MultiError, TaskType as TaskKind
 from .task import Task
 from .wheel import Wheel, MultiWheel
+from .runner import AsyncWheelRunner
@@ -1,7 +1,6 @@
 import dataclasses as dc
 import enum
 import time
-from collections import deque
 from typing import Callable
 
 
@@ -18,7 +17,7 @@ class MultiError(Exception):
 
 
 def get_current_ms():
-    return int(time.monotonic())
+    return time.monotonic_ns() // 1_000_000
 
 
 class TaskType(str, enum.Enum):
@@ -27,9 +26,9 @@ class TaskType(str, enum.Enum):
     cycle = "cycle"
 
 
-@dc.dataclass
-class TaskData[A, R]:
-    callback: Callable[[*A], R]
+@dc.dataclass(eq=False)  # 按对象身份哈希, 以便保存在槽中
+class TaskData[R]:
+    callback: Callable[..., R]
     args: tuple
     kwargs: dict
     id: str
@@ -37,10 +36,13 @@ class TaskData[A, R]:
     delay: int
     is_vaild: bool
 
-    round: int = 0
+    round: int = 0  # 在最高层时间轮中还需要等待的圈数
     type: str = TaskType.single
     activity: bool = True
 
+    expire: int = 0  # 到期的 tick
+    slot: 'Slot' = dc.field(default=None, repr=False)  # 任务当前所在的槽
+
     def __call__(self) -> R:
         return self.callback(*self.args, **self.kwargs)
 
@@ -53,83 +55,241 @@ class TaskData[A, R]:
         return self.remaining_time <= 0
 
 
+class Level:
+    __slots__ = ('slots', 'span', 'count')
+
+    def __init__(self, slots: int, span: int):
+        self.slots = [Slot(self) for _ in range(slots)]
+        self.span = span  # 每个槽对应的 tick 数
+        self.count = 0  # 本层的任务数
+
+
 class Slot:
-    def __init__(self):
-        self.tasks = deque()  # type: deque[TaskData]
+    __slots__ = ('tasks', 'level')
 
-    def push(self, task):
-        self.tasks.append(task)
+    def __init__(self, level: Level = None):
+        self.tasks = {}  # type: dict[TaskData, None]  # 保持插入顺序, 并支持 O(1) 删除
+        self.level = level
+
+    def push(self, task: TaskData):
+        self.tasks[task] = None
+        task.slot = self
+        self.level.count += 1
+
+    def remove(self, task: TaskData):
+        if task.slot is self:
+            del self.tasks[task]
+            task.slot = None
+            self.level.count -= 1
 
     def pop(self):
-        return self.tasks.popleft()
+        task = next(iter(self.tasks))
+        self.remove(task)
+        return task
+
+    def pop_all(self):
+        tasks, self.tasks = self.tasks, {}
+        self.level.count -= len(tasks)
+        for task in tasks:
+            task.slot = None
+        return tasks
 
     def __len__(self):
         return len(self.tasks)
 
 
 class WheelCore:
-    def __init__(self, slots: int, granularity_ms: int):
-        self.slots: list[Slot] = [Slot() for i in range(slots)]  # 创建 slots 个槽
+    """
+    分层时间轮
+
+    第 0 层每个槽对应一个 tick (granularity_ms), 第 k 层每个槽对应 slots**k 个 tick;
+    任务按到期的 tick 放入能容纳它的最低层, 上层的槽在下层转完一圈时向下层迁移 (cascade);
+    超出所有层范围的任务放在最高层, 并记录需要等待的圈数 (round)
+
+    添加和取消任务都是 O(1), 每个 tick 的开销与任务总数无关
+    """
+
+    def __init__(self, slots: int, granularity_ms: int, levels: int = 4, start_time: int = None):
+        if slots < 2:
+            raise ValueError("slots must be at least 2")
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+
+        self.size = slots
         self.granularity_ms = granularity_ms or 1000
-        self.current_slot = 0
-        self.last_update_time = None
-        self.cancel_tasks = set()
+        self.levels = [Level(slots, slots ** i) for i in range(levels)]
+        self._lower_levels = self.levels[:-1]
+        self.slots: list[Slot] = self.levels[0].slots
+        self.start_time = get_current_ms() if start_time is None else start_time
+        self.ticks = 0  # 已经处理过的 tick 数
+        self.dispatcher = None  # type: Callable[[TaskData], object] | None  # 自定义任务的执行方式, 默认直接调用
 
-    def add_task(self, task: TaskData):
-        ticks = task.delay // self.granularity_ms
-        slot = (self.current_slot + ticks) % len(self)
-        task.round = ticks // len(self)
+    @property
+    def current_slot(self):
+        return self.ticks % self.size
+
+    @property
+    def last_update_time(self):
+        return self.tick_to_time(self.ticks)
 
-        self.slots[slot].push(task)
+    @property
+    def pending(self):
+        return sum(level.count for level in self.levels)
+
+    def tick_to_time(self, tick):
+        return self.start_time + tick * self.granularity_ms
+
+    def _place(self, task: TaskData):
+        size, expire = self.size, task.expire
+        delta = expire - self.ticks
+
+        for level in self._lower_levels:
+            if delta < level.span * size:
+                level.slots[(expire // level.span) % size].push(task)
+                return
+
+        top = self.levels[-1]
+        block, current = expire // top.span, self.ticks // top.span
+        index = block % size
+        first = current + ((index - current) % size or size)  # 该槽下一次被处理时所在的块
+        task.round = (block - first) // size
+        top.slots[index].push(task)
+
+    def add_task(self, task: TaskData):
+        expire = -(-(task.start_time + task.delay - self.start_time) // self.granularity_ms)
+        if expire <= self.ticks:  # 已经过期的任务在下一个 tick 执行
+            expire = self.ticks + 1
+        task.expire = expire
+        task.round = 0
+        self._place(task)
+
+    def remove_task(self, task: TaskData):
+        if task.slot is not None:
+            task.slot.remove(task)
+
+    def _cascade(self, slot: Slot):
+        is_top = slot.level is self.levels[-1]
+        for task in slot.pop_all():
+            if is_top and task.round > 0:
+                task.round -= 1
+                slot.push(task)
+            else:
+                self._place(task)
 
     def process_slot(self, slot: Slot):
         errors = []
-        count = 0
-        length = len(slot)
-        while count < length:
-            task = slot.pop()  # 获取一个任务
-
-            if task.id in self.cancel_tasks or not task.is_vaild:
-                self.cancel_tasks.remove(task.id)
-                length -= 1  # 减去一个任务
+        is_top = slot.level is self.levels[-1]
+        for task in slot.pop_all():
+            if is_top and task.round > 0:
+                task.round -= 1
+                slot.push(task)
                 continue
 
-            if task.activity:
-                if task.is_expired:
-                    # Run task
-                    try:
-                        task()
-                    except Exception as e:
-                        errors.append(e)
+            if not task.is_vaild:
+                continue
 
-                    if task.type == TaskType.cycle:
-                        task.start_time = get_current_ms()  # 重新设置开始时间
-                        slot.push(task)
+            if not task.activity:  # 暂停的任务不执行, 推迟一个周期后再检查
+                task.start_time = self.last_update_time
+                self.add_task(task)
+                continue
 
+            try:
+                if self.dispatcher is None:
+                    task()
                 else:
-                    slot.push(task)  # 未超时的任务重新加入槽
-            # else:
-            # 暂停的任务不处理
+                    self.dispatcher(task)
+            except Exception as e:
+                errors.append(e)
 
-            count += 1  # 记得统计处理次数
+            if task.type == TaskType.cycle and task.is_vaild and task.slot is None:
+                task.start_time = self.last_update_time  # 重新设置开始时间
+                self.add_task(task)
 
         return errors
 
-    def advance(self):
-        current_time = get_current_ms()
+    def _tick(self):
+        self.ticks += 1
+        ticks, size = self.ticks, self.size
+
+        # 从高层到低层迁移到达边界的槽
+        if not ticks % size:
+            cascades = []
+            for level in self.levels[1:]:
+                if ticks % level.span:
+                    break
+                cascades.append(level.slots[(ticks // level.span) % size])
+            for slot in reversed(cascades):
+                self._cascade(slot)
+
+        return self.process_slot(self.slots[ticks % size])
+
+    def advance(self, current_time: int = None):
+        if current_time is None:
+            current_time = get_current_ms()
+
         # 计算需要推进的槽数
-        ticks = (current_time - self.last_update_time) // self.granularity_ms
+        target = (current_time - self.start_time) // self.granularity_ms
+        size, slots, level0 = self.size, self.slots, self.levels[0]
         total_errors = []
 
-        for i in range(ticks):
-            index = (self.current_slot + i) % len(self)
-            errors = self.process_slot(self.slots[index])
-            total_errors.extend(errors)
+        while self.ticks < target:
+            if not level0.count:  # 第 0 层为空时, 直接跳到下一次迁移
+                if not self.pending:
+                    self.ticks = target
+                    break
+                boundary = (self.ticks // size + 1) * size
+                if boundary > target:
+                    self.ticks = target
+                    break
+                self.ticks = boundary - 1
+
+            ticks = self.ticks + 1
+            if ticks % size and not slots[ticks % size].tasks:  # 快速跳过空槽
+                self.ticks = ticks
+                continue
 
-        self.last_update_time = current_time
+            errors = self._tick()
+            if errors:
+                total_errors.extend(errors)
 
         if total_errors:
             raise MultiError(*total_errors)  # 一次性抛出所有错误
 
+    def next_tick(self):
+        """
+        下一个可能有任务需要处理的 tick, 没有任务时返回 None
+        """
+        if not self.pending:
+            return None
+
+        size, ticks = self.size, self.ticks
+        result = None
+
+        level0 = self.levels[0]
+        if level0.count:
+            for tick in range(ticks + 1, ticks + size + 1):
+                if level0.slots[tick % size].tasks:
+                    result = tick
+                    break
+
+        for level in self.levels[1:]:
+            if not level.count:
+                continue
+            block = ticks // level.span
+            for b in range(block + 1, block + size + 1):
+                if level.slots[b % size].tasks:
+                    tick = b * level.span
+                    result = tick if result is None else min(result, tick)
+                    break
+
+        return result
+
+    def next_time(self):
+        """
+        下一个可能有任务需要处理的时间 (ms), 没有任务时返回 None
+        """
+        tick = self.next_tick()
+        return None if tick is None else self.tick_to_time(tick)
+
     def __len__(self):
         return len(self.slots)
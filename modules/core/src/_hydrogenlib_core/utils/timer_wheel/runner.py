@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import Executor
+
+from .core import get_current_ms, MultiError, TaskData
+from .wheel import Wheel, MultiWheel
+from ..histogram import Histogram
+
+
+class AsyncWheelRunner:
+    """
+    在 asyncio 事件循环中驱动 Wheel / MultiWheel
+
+    - 休眠到下一个可能有任务到期的槽, 而不是按固定间隔轮询
+    - 协程函数回调会作为 asyncio.Task 调度, 不阻塞时间轮
+    - sync_in_executor 为 True 时, 普通回调交给 executor (None 为事件循环的默认 executor) 执行
+    - lag 记录实际唤醒时间相对计划时间的延迟 (ms), durations 记录回调耗时 (ms)
+    - 回调抛出的异常交给事件循环的异常处理器
+
+    通过 runner.add_task 添加的任务可以提前唤醒休眠中的循环;
+    直接向时间轮添加任务时, 需要调用 runner.wake()
+    """
+
+    def __init__(self, wheel: Wheel | MultiWheel, sync_in_executor=False, executor: Executor = None):
+        self.wheel = wheel
+        self.sync_in_executor = sync_in_executor
+        self.executor = executor
+
+        self.lag = Histogram()
+        self.durations = Histogram()
+
+        self._loop = None  # type: asyncio.AbstractEventLoop | None
+        self._main_task = None  # type: asyncio.Task | None
+        self._waiter = None  # type: asyncio.Future | None
+        self._when = None  # 计划的唤醒时间 (ms)
+        self._callbacks = set()  # 正在运行的回调 (asyncio.Task / Future)
+
+    @property
+    def _cores(self):
+        return [w.core for w in getattr(self.wheel, 'wheels', [self.wheel])]
+
+    @property
+    def running(self):
+        return self._main_task is not None and not self._main_task.done()
+
+    def start(self):
+        """
+        在当前运行的事件循环中启动
+        """
+        if self.running:
+            raise RuntimeError("AsyncWheelRunner is already running")
+
+        self._loop = asyncio.get_running_loop()
+        for core in self._cores:
+            core.dispatcher = self._dispatch
+        self._main_task = self._loop.create_task(self._run())
+        return self._main_task
+
+    async def stop(self, wait=True):
+        """
+        停止运行
+        :param wait: 是否等待正在运行的回调结束
+        """
+        if self._main_task is not None:
+            self._main_task.cancel()
+            try:
+                await self._main_task
+            except asyncio.CancelledError:
+                pass
+            self._main_task = None
+
+        for core in self._cores:
+            core.dispatcher = None
+
+        if wait and self._callbacks:
+            await asyncio.gather(*self._callbacks, return_exceptions=True)
+
+    def add_task(self, callback, args=(), kwargs=None, delay=None, id=None, cycle=False):
+        task = self.wheel.add_task(callback, args, kwargs, delay, id, cycle)
+        if self._when is None or task.start_time + task.delay() < self._when:
+            self.wake()
+        return task
+
+    def wake(self):
+        """
+        唤醒循环, 重新计算下一次唤醒时间
+        """
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _run(self):
+        loop = self._loop
+        while True:
+            when = self._when = self.wheel.next_time()
+            self._waiter = loop.create_future()
+            handle = None
+            if when is not None:
+                handle = loop.call_later(max(0, when - get_current_ms()) / 1000, self.wake)
+
+            try:
+                await self._waiter
+            finally:
+                if handle is not None:
+                    handle.cancel()
+                self._waiter = None
+
+            now = get_current_ms()
+            if when is not None and now >= when:
+                self.lag.observe(now - when)
+
+            try:
+                self.wheel.advance(now)
+            except MultiError as e:
+                for error in e:
+                    self._report(error)
+
+    def _report(self, error):
+        self._loop.call_exception_handler({
+            'message': 'Exception in timer wheel callback',
+            'exception': error,
+        })
+
+    def _track(self, future):
+        self._callbacks.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future):
+        self._callbacks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self._report(future.exception())
+
+    def _call(self, task: TaskData):
+        start = time.perf_counter()
+        try:
+            return task()
+        finally:
+            self.durations.observe((time.perf_counter() - start) * 1000)
+
+    async def _await(self, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.durations.observe((time.perf_counter() - start) * 1000)
+
+    def _dispatch(self, task: TaskData):
+        if inspect.iscoroutinefunction(task.callback):
+            self._track(self._loop.create_task(self._await(task())))
+        elif self.sync_in_executor:
+            self._track(self._loop.run_in_executor(self.executor, self._call, task))
+        else:
+            result = self._call(task)
+            if inspect.isawaitable(result):
+                self._track(asyncio.ensure_future(self._await(result)))
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
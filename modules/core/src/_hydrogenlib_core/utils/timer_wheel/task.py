@@ -1,11 +1,13 @@
+import dataclasses as dc
 from copy import deepcopy
 
-from .core import TaskData, TaskType
+from .core import TaskData, TaskType, WheelCore
 
 
 class Task:
-    def __init__(self, task_data: TaskData):
+    def __init__(self, task_data: TaskData, core: WheelCore = None):
         self._data = task_data
+        self._core = core
 
     @property
     def id(self):
@@ -19,13 +21,18 @@ class Task:
 
     def cancel(self):
         self._data.is_vaild = False
+        if self._data.slot is not None:
+            self._data.slot.remove(self._data)  # O(1) 移除
 
     def is_canceled(self):
-        return self._data.is_vaild
+        return not self._data.is_vaild
 
     def delay(self, delay: int = None):
         if delay is not None:
             self._data.delay = delay
+            if self._core is not None and self._data.slot is not None:  # 重新安排
+                self._core.remove_task(self._data)
+                self._core.add_task(self._data)
         else:
             return self._data.delay
 
@@ -33,6 +40,10 @@ class Task:
     def start_time(self):
         return self._data.start_time
 
+    @property
+    def round(self):
+        return self._data.round
+
     def type(self, tp: TaskType = None):
         if tp is not None:
             self._data.type = tp
@@ -40,4 +51,4 @@ class Task:
             return self._data.type
 
     def export(self):
-        return deepcopy(self._data)
+        return deepcopy(dc.replace(self._data, slot=None))
@@ -1,20 +1,34 @@
-import warnings
-
-from .core import get_current_ms, TaskType, TaskData, WheelCore
+from .core import get_current_ms, MultiError, TaskType, TaskData, WheelCore
 from .task import Task
 
 
 class Wheel:
+    """
+    分层时间轮
+
+    :param slots: 每层的槽数
+    :param granularity_ms: 每个 tick 的时长 (ms)
+    :param levels: 层数, 前 levels 层可以覆盖 slots**levels 个 tick, 更长的延时通过圈数 (round) 处理
+    """
+
     @property
     def current_slot(self):
-        return self.current_slot
+        return self.core.current_slot
 
     @property
     def slots_length(self):
         return len(self.core)
 
-    def __init__(self, slots: int, granularity_ms: int):
-        self.core = WheelCore(slots, granularity_ms)
+    @property
+    def granularity_ms(self):
+        return self.core.granularity_ms
+
+    @property
+    def pending(self):
+        return self.core.pending
+
+    def __init__(self, slots: int, granularity_ms: int, levels: int = 4):
+        self.core = WheelCore(slots, granularity_ms, levels)
 
     def add_task(self, callback, args=(), kwargs=None, delay=None, id=None, cycle=False):
         if kwargs is None:
@@ -23,29 +37,58 @@ class Wheel:
         data = TaskData(
             callback, args, kwargs,
             id,
-            get_current_ms(), delay,
+            get_current_ms(), delay or 0,
             True, 0,
             TaskType.cycle if cycle else TaskType.single
         )
         self.core.add_task(
             data
         )
-        return Task(data)
+        return Task(data, self.core)
+
+    def cancel(self, task: Task):
+        task.cancel()
 
-    def advance(self):
-        self.core.advance()
+    def next_time(self):
+        """
+        下一个可能有任务到期的时间 (ms), 没有任务时返回 None
+        """
+        return self.core.next_time()
+
+    def advance(self, current_time: int = None):
+        self.core.advance(current_time)
 
 
 class MultiWheel:
+    """
+    兼容旧接口: Wheel 已经是分层时间轮, 任意延时都可以交给粒度最小的轮处理,
+    不再需要按 "粒度能否整除延时" 挑选时间轮
+    """
+
     def __init__(self, *wheels):
         self.wheels = sorted(wheels, key=lambda w: w.core.granularity_ms)  # 按粒度排序(升序)
 
     def add_task(self, callback, args=(), kwargs=None, delay=None, id=None, cycle=False):
-        for wheel in reversed(self.wheels):
-            if delay % wheel.core.granularity_ms == 0:
-                return wheel.add_task(callback, args, kwargs, delay, id, cycle)
-
-        wheel = self.wheels[0]  # 取时间粒度最小的轮
-        warnings.warn("The task delay is not divisible by the wheel granularity, the task will be added to the wheel "
-                      "with the smallest granularity.")
-        return wheel.add_task(callback, args, kwargs, delay, id, cycle)
+        return self.wheels[0].add_task(callback, args, kwargs, delay, id, cycle)  # 取时间粒度最小的轮
+
+    @property
+    def pending(self):
+        return sum(wheel.pending for wheel in self.wheels)
+
+    def next_time(self):
+        times = [t for t in (wheel.next_time() for wheel in self.wheels) if t is not None]
+        return min(times) if times else None
+
+    def advance(self, current_time: int = None):
+        if current_time is None:
+            current_time = get_current_ms()
+
+        errors = []
+        for wheel in self.wheels:
+            try:
+                wheel.advance(current_time)
+            except MultiError as e:
+                errors.extend(e.errors)
+
+        if errors:
+            raise MultiError(*errors)
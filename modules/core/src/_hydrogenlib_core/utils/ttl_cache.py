@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    带过期时间的键值存储
+
+    - 读取时惰性检查过期时间
+    - 过期时间按 resolution 分桶索引, 主动过期 (expire_step) 只处理已经整体过期的桶,
+      每一步处理的条目数有上限, 可以由后台线程 (start_expiry) 或 asyncio 任务 (start_expiry_async) 周期执行
+    - max_entries > 0 时按 LRU 淘汰
+    - 所有操作都是线程安全的, get_many / set_many / delete_many 只获取一次锁
+    """
+
+    def __init__(self, default_ttl=None, max_entries=0, resolution=0.1, clock=time.monotonic):
+        """
+        :param default_ttl: 默认的存活时间 (秒), None 表示不过期
+        :param max_entries: 最大条目数, 0 表示不限制
+        :param resolution: 过期索引的桶宽 (秒), 主动过期最多比过期时间晚一个桶宽
+        :param clock: 时钟函数
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.clock = clock
+
+        self._data = OrderedDict() if max_entries else {}
+        self._deadlines = {}  # key -> 过期时间, 只包含会过期的键
+        self._buckets = {}  # 桶编号 -> 键列表 (可能包含已经失效的条目)
+        self._bucket_heap = []  # 桶编号的最小堆
+        self._lock = threading.Lock()
+
+        self._expiry_thread = None
+        self._expiry_stop = threading.Event()
+
+        self.hits = self.misses = self.expired = self.evicted = 0
+
+    # 内部方法, 调用时需要持有锁
+    def _index(self, key, deadline):
+        self._deadlines[key] = deadline
+        bucket = int(deadline // self.resolution)
+        keys = self._buckets.get(bucket)
+        if keys is None:
+            keys = self._buckets[bucket] = []
+            heapq.heappush(self._bucket_heap, bucket)
+        keys.append(key)
+
+    def _set(self, key, value, ttl, now):
+        data = self._data
+        if key in data:
+            if self.max_entries:
+                data.move_to_end(key)
+        elif self.max_entries and len(data) >= self.max_entries:
+            old, _ = data.popitem(last=False)
+            self._deadlines.pop(old, None)
+            self.evicted += 1
+        data[key] = value
+
+        if ttl is None:
+            self._deadlines.pop(key, None)
+        else:
+            self._index(key, now + ttl)
+
+    def _get(self, key, now):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return _MISSING
+        deadline = self._deadlines.get(key)
+        if deadline is not None and deadline <= now:
+            del self._data[key]
+            del self._deadlines[key]
+            self.expired += 1
+            self.misses += 1
+            return _MISSING
+        if self.max_entries:
+            self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _delete(self, key, now):
+        """
+        删除键, 返回键删除前是否未过期
+        """
+        if self._data.pop(key, _MISSING) is _MISSING:
+            return False
+        deadline = self._deadlines.pop(key, None)
+        return deadline is None or deadline > now
+
+    def _ttl(self, ttl):
+        return self.default_ttl if ttl is _MISSING else ttl
+
+    # 单个键
+    def set(self, key, value, ttl=_MISSING):
+        """
+        :param ttl: 存活时间 (秒), 默认为 default_ttl, None 表示不过期
+        """
+        ttl = self._ttl(ttl)
+        with self._lock:
+            self._set(key, value, ttl, self.clock())
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get(key, self.clock())
+        return default if value is _MISSING else value
+
+    def pop(self, key, default=_MISSING):
+        with self._lock:
+            now = self.clock()
+            value = self._get(key, now)
+            if value is not _MISSING:
+                self._delete(key, now)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+
+    def delete(self, key):
+        """
+        删除键, 返回键是否存在且未过期
+        """
+        with self._lock:
+            return self._delete(key, self.clock())
+
+    def ttl(self, key):
+        """
+        剩余的存活时间, 不过期的键为 None, 不存在时抛出 KeyError
+        """
+        with self._lock:
+            now = self.clock()
+            if self._get(key, now) is _MISSING:
+                raise KeyError(key)
+            deadline = self._deadlines.get(key)
+        return None if deadline is None else deadline - now
+
+    def touch(self, key, ttl=_MISSING):
+        """
+        重新设置存活时间, 返回键是否存在
+        """
+        ttl = self._ttl(ttl)
+        with self._lock:
+            now = self.clock()
+            if self._get(key, now) is _MISSING:
+                return False
+            if ttl is None:
+                self._deadlines.pop(key, None)
+            else:
+                self._index(key, now + ttl)
+            return True
+
+    # 批量操作
+    def get_many(self, keys) -> dict:
+        """
+        返回存在且未过期的键
+        """
+        result = {}
+        with self._lock:
+            now = self.clock()
+            for key in keys:
+                value = self._get(key, now)
+                if value is not _MISSING:
+                    result[key] = value
+        return result
+
+    def set_many(self, items, ttl=_MISSING):
+        """
+        :param items: 字典或 (键, 值) 序列
+        """
+        ttl = self._ttl(ttl)
+        if isinstance(items, dict):
+            items = items.items()
+        with self._lock:
+            now = self.clock()
+            for key, value in items:
+                self._set(key, value, ttl, now)
+
+    def delete_many(self, keys) -> int:
+        with self._lock:
+            now = self.clock()
+            return sum(self._delete(key, now) for key in keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._deadlines.clear()
+            self._buckets.clear()
+            self._bucket_heap.clear()
+
+    # 主动过期
+    def expire_step(self, limit=1000) -> tuple[int, bool]:
+        """
+        处理最多 limit 个已经整体过期的桶中的条目
+        :return: (删除的键数, 是否还有待处理的过期桶)
+        """
+        removed = processed = 0
+        with self._lock:
+            now = self.clock()
+            heap, buckets, deadlines, data = self._bucket_heap, self._buckets, self._deadlines, self._data
+            while heap and (heap[0] + 1) * self.resolution <= now:
+                keys = buckets[heap[0]]
+                while keys and processed < limit:
+                    key = keys.pop()
+                    processed += 1
+                    deadline = deadlines.get(key)
+                    if deadline is not None and deadline <= now:
+                        del deadlines[key]
+                        del data[key]
+                        removed += 1
+                if keys:
+                    break
+                del buckets[heapq.heappop(heap)]
+            pending = bool(heap) and (heap[0] + 1) * self.resolution <= now
+            self.expired += removed
+        return removed, pending
+
+    def expire(self, limit=1000, budget=0.025) -> int:
+        """
+        重复 expire_step 直到没有过期的桶或用完 budget 秒, 每一步之间释放锁
+        """
+        deadline = time.perf_counter() + budget
+        total = 0
+        while True:
+            removed, pending = self.expire_step(limit)
+            total += removed
+            if not pending or time.perf_counter() >= deadline:
+                return total
+
+    def purge(self) -> int:
+        """
+        删除所有已过期的键, 包括还未整体过期的桶中的键
+        """
+        with self._lock:
+            now = self.clock()
+            expired = [key for key, deadline in self._deadlines.items() if deadline <= now]
+            for key in expired:
+                self._delete(key, now)
+            self.expired += len(expired)
+        self.expire(budget=float('inf'))  # 清理索引
+        return len(expired)
+
+    def _expiry_loop(self, interval, limit, budget):
+        while not self._expiry_stop.wait(interval):
+            self.expire(limit, budget)
+
+    def start_expiry(self, interval=0.1, limit=1000, budget=0.025):
+        """
+        启动后台主动过期线程
+        """
+        if self._expiry_thread is not None:
+            return
+        self._expiry_stop.clear()
+        self._expiry_thread = threading.Thread(
+            target=self._expiry_loop, args=(interval, limit, budget), daemon=True, name="TTLCache-expiry")
+        self._expiry_thread.start()
+
+    def stop_expiry(self):
+        if self._expiry_thread is None:
+            return
+        self._expiry_stop.set()
+        self._expiry_thread.join()
+        self._expiry_thread = None
+
+    async def run_expiry(self, interval=0.1, limit=1000, budget=0.005):
+        """
+        在事件循环中周期执行主动过期, 每一轮最多占用 budget 秒
+        """
+        while True:
+            self.expire(limit, budget)
+            await asyncio.sleep(interval)
+
+    def start_expiry_async(self, interval=0.1, limit=1000, budget=0.005) -> asyncio.Task:
+        """
+        在当前事件循环中创建主动过期任务, 取消任务即可停止
+        """
+        return asyncio.get_running_loop().create_task(self.run_expiry(interval, limit, budget))
+
+    # 映射接口
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._get(key, self.clock())
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if not self.delete(key):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            deadline = self._deadlines.get(key)
+            return value is not _MISSING and (deadline is None or deadline > self.clock())
+
+    def __len__(self):
+        """
+        条目数, 可能包含已过期但还未被清理的键
+        """
+        return len(self._data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop_expiry()
@@ -2,6 +2,7 @@ import os
 from enum import Enum
 
 import pyaes
+from _hydrogenlib_core.utils.object_pool.buffer_pool import buffer_pool
 
 from .methods import split, pad, unpad
 
@@ -19,7 +20,10 @@ def generate(size: int = 16):
 
 
 def split_and_pad(text: bytes, size: int = 16):
-    return [pad(i, size) for i in split(text, size)]
+    blocks = split(text, size)
+    if blocks:
+        blocks[-1] = pad(blocks[-1], size)
+    return blocks
 
 
 def bytes_join(args):
@@ -64,19 +68,27 @@ class Aes:
 
         self._generate_aes_object()
 
+    def _crypt_into(self, func, data, out, size):
+        """
+        逐块处理 data 的前 size 个字节 (16 的倍数), 结果写入 out 的同一位置
+        """
+        for i in range(0, size, 16):
+            out[i:i + 16] = func(bytes(data[i:i + 16]))
+
     def decrypt(self, ciphertext: bytes) -> bytes:
         """
         解密
         :param ciphertext: 原始密文
         :return: bytes
         """
-        ciphertext_list = split(ciphertext)
-        plaintext_list = [self._aes.decrypt(i) for i in ciphertext_list]
+        if not ciphertext:
+            return b''
 
-        if plaintext_list:
-            plaintext_list[-1] = unpad(plaintext_list[-1])
-
-        return bytes_join(plaintext_list)
+        plaintext = bytearray(len(ciphertext))
+        self._crypt_into(self._aes.decrypt, ciphertext, plaintext, len(ciphertext))
+        last = len(plaintext) - 16
+        plaintext[last:] = unpad(plaintext[last:])
+        return bytes(plaintext)
 
     def encrypt(self, text: bytes):
         """
@@ -84,7 +96,65 @@ class Aes:
         :param text: 明文
         :return: bytes
         """
-        plaintext_list = split_and_pad(text)
-        cipertext_list = [self._aes.encrypt(i) for i in plaintext_list]
-
-        return bytes_join(cipertext_list)
+        full = len(text) - len(text) % 16
+        ciphertext = bytearray(full + (16 if full < len(text) else 0))
+        self._crypt_into(self._aes.encrypt, text, ciphertext, full)
+        if full < len(text):
+            ciphertext[full:] = self._aes.encrypt(pad(text[full:]))
+        return bytes(ciphertext)
+
+    def encrypt_stream(self, src, dst, chunk_size=65536):
+        """
+        从 src 读取明文, 加密后写入 dst, 结果与 encrypt(src.read()) 相同
+        读写使用缓冲区池中的缓冲区, 不会为每一块数据分配新的 bytes
+        :param src: 支持 readinto 的二进制流
+        :param dst: 二进制流
+        :param chunk_size: 每次读取的大小, 会向下取整到 16 的倍数
+        """
+        chunk_size = max(16, chunk_size - chunk_size % 16)
+        with buffer_pool.borrow(chunk_size + 16) as buffer, buffer_pool.borrow(chunk_size + 16) as out:
+            pending = 0  # 缓冲区开头还未处理的字节数 (不足一块)
+            while True:
+                n = src.readinto(buffer[pending:chunk_size + pending])
+                if not n:
+                    break
+                n += pending
+                full = n - n % 16
+                self._crypt_into(self._aes.encrypt, buffer, out, full)
+                dst.write(out[:full])
+                pending = n - full
+                buffer[:pending] = buffer[full:n]
+
+            if pending:
+                dst.write(self._aes.encrypt(pad(buffer[:pending])))
+
+    def decrypt_stream(self, src, dst, chunk_size=65536):
+        """
+        从 src 读取密文, 解密后写入 dst, 结果与 decrypt(src.read()) 相同
+        :param src: 支持 readinto 的二进制流
+        :param dst: 二进制流
+        :param chunk_size: 每次读取的大小, 会向下取整到 16 的倍数
+        """
+        chunk_size = max(16, chunk_size - chunk_size % 16)
+        with buffer_pool.borrow(chunk_size + 16) as buffer, buffer_pool.borrow(chunk_size + 16) as out:
+            pending = 0
+            last = None  # 最后一块需要去除填充, 在读到结尾之前暂不写出
+            while True:
+                n = src.readinto(buffer[pending:chunk_size + pending])
+                if not n:
+                    break
+                n += pending
+                full = n - n % 16
+                if full:
+                    self._crypt_into(self._aes.decrypt, buffer, out, full)
+                    if last is not None:
+                        dst.write(last)
+                    dst.write(out[:full - 16])
+                    last = bytes(out[full - 16:full])
+                pending = n - full
+                buffer[:pending] = buffer[full:n]
+
+            if pending:
+                raise ValueError("Ciphertext length must be a multiple of 16")
+            if last is not None:
+                dst.write(unpad(last))
@@ -11,7 +11,7 @@ def _pkcs7_pad(data: bytes, block_size: int) -> bytes:
         return data
     padding_length = block_size - len(data) % block_size
     padding = bytes([padding_length]) * padding_length
-    return data + padding
+    return bytes(data) + padding
 
 
 def _pkcs7_unpad(padded_data: bytes, block_size: int = 16) -> bytes:
@@ -32,15 +32,11 @@ def _pkcs7_unpad(padded_data: bytes, block_size: int = 16) -> bytes:
 
 
 def split(text, size=16):
-    if len(text) % size == 0:
-        return [text[i:i + size] for i in range(0, len(text), size)]
-    res_lenght = ((len(text) // size) + 1) * size
-    add_lenght = res_lenght - len(text)
-    text = pad(text, res_lenght)
-    ls = split(text, size)
-    ls[-1] = ls[-1][:add_lenght]
-    # print(ls)
-    return ls
+    """
+    按 size 切分数据, 最后一块可能不足 size
+    传入 memoryview 时, 切分得到的块不会复制数据
+    """
+    return [text[i:i + size] for i in range(0, len(text), size)]
 
 
 def pad(text: bytes, size=16):
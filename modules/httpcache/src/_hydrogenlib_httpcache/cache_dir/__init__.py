@@ -13,7 +13,7 @@ class _CacheFiles:
     content: Path
     hash: str
 
-    __slots__ = ('_url', '_lihf', '_cd')
+    __slots__ = ('_url', '_lihf', '_cd', '_lazy_hash', '_lazy_index', '_lazy_content', '_lazy_cacheinfo')
 
     def __init__(self, cache_directory: CacheDirectory, url, lihf=None):
         self._url = url
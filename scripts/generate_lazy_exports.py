@@ -0,0 +1,76 @@
+"""
+生成 modules/core/re-import.py 的惰性导出表
+
+按原来的星号导入顺序导入每个子模块, 收集它的导出名称 (__all__ 或不以下划线开头的名称, 模块对象除外),
+同名时后导入的模块优先, 与星号导入一致; 同一个对象被多个子模块导出时记在最先导出它的子模块下, 使访问时导入的模块尽量少
+
+用法: python -m scripts.generate_lazy_exports (在项目根目录运行, 需要可以导入 _hydrogenlib_core)
+"""
+import importlib
+from pathlib import Path
+from types import ModuleType
+
+PACKAGE = '_hydrogenlib_core'
+
+# 星号导入的顺序, 新的子模块加在最后
+SUBMODULES = [
+    'typefunc', 'utils', 'hash', 'json', 'data_structures', 'fsutil', 'std_extends',
+    'threading_methods', 'async_methods', 'atexit', 'const', 'dataclasses_methods',
+    'decorators', 'descriptor', 'environ_parser', 'import_plus', 'io_addons', 'network',
+    'nio', 'output_methods', 'process', 'sys_plus', 'time_', 'trasyncio', 'parallel',
+]
+
+TEMPLATE = '''\
+# 由 scripts/generate_lazy_exports.py 生成, 不要手动修改
+# 名称在第一次访问时才导入所在的子模块 (PEP 562)
+from _hydrogenlib_core.import_plus import lazy_exports
+
+_EXPORTS = {{
+{table}}}
+
+__all__ = [name for names in _EXPORTS.values() for name in names]
+__getattr__, __dir__ = lazy_exports(globals(), _EXPORTS)
+'''
+
+
+def public_names(module):
+    names = getattr(module, '__all__', None)
+    if names is None:
+        names = [name for name in vars(module) if not name.startswith('_')]
+    return [name for name in names if not isinstance(getattr(module, name), ModuleType)]
+
+
+def collect():
+    exported = {}  # 模块名 -> {名称: 对象}
+    final = {}  # 名称 -> 星号导入后的对象
+    for submodule in SUBMODULES:
+        name = f'{PACKAGE}.{submodule}'
+        module = importlib.import_module(name)
+        exported[name] = {attr: getattr(module, attr) for attr in public_names(module)}
+        final.update(exported[name])
+
+    table = {name: [] for name in exported}
+    for attr, value in final.items():
+        owner = next(name for name, objs in exported.items() if attr in objs and objs[attr] is value)
+        table[owner].append(attr)
+    return {name: sorted(attrs) for name, attrs in table.items() if attrs}
+
+
+def render(table):
+    lines = []
+    for module, names in table.items():
+        lines.append(f'    {module!r}: (\n')
+        lines.extend(f'        {name!r},\n' for name in names)
+        lines.append('    ),\n')
+    return TEMPLATE.format(table=''.join(lines))
+
+
+def main():
+    target = Path(__file__).parent.parent / 'modules' / 'core' / 're-import.py'
+    table = collect()
+    target.write_text(render(table), encoding='utf-8')
+    print(f"{target}: {sum(map(len, table.values()))} names from {len(table)} modules")
+
+
+if __name__ == '__main__':
+    main()